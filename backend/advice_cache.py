@@ -0,0 +1,50 @@
+"""
+Gemini advice cache - in-process LRU with TTL in front of the shared cache tier that survives restarts
+"""
+import os
+import json
+import hashlib
+
+from shared_cache import TieredCache
+
+ADVICE_CACHE_SIZE = int(os.getenv("ADVICE_CACHE_SIZE", "2048"))
+ADVICE_CACHE_TTL = int(os.getenv("ADVICE_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class AdviceCache:
+    """Two-tier cache for generated advice keyed by the canonical profile that produced it.
+
+    L2 is the shared cache tier, so advice generated by one worker is served
+    by all others on the host.
+    """
+
+    def __init__(self, max_size=ADVICE_CACHE_SIZE, ttl=ADVICE_CACHE_TTL, backend=None):
+        self.ttl = ttl
+        self.tiers = TieredCache('advice', max_size, ttl, backend)
+
+    @staticmethod
+    def make_key(user_skills, role_title, gaps, career_type, temperature, model):
+        canonical = json.dumps([
+            sorted(set(s.strip().lower() for s in user_skills or [])),
+            (role_title or '').strip().lower(),
+            sorted(g.strip().lower() for g in gaps or []),
+            career_type or '',
+            round(float(temperature), 3),
+            model
+        ], separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.tiers.get(key)
+
+    def set(self, key, value):
+        self.tiers.set(key, value)
+
+    def stats(self):
+        stats = self.tiers.stats()
+        # Every hit is a Gemini call we did not have to make
+        stats['saved_api_calls'] = stats['l1_hits'] + stats['l2_hits']
+        return stats
+
+
+advice_cache = AdviceCache()
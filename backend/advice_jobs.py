@@ -0,0 +1,85 @@
+"""
+Background AI advice jobs - lets /api/analyze return immediately and hand advice over later
+"""
+import os
+import uuid
+import sqlite3
+import logging
+import threading
+import concurrent.futures
+
+from shared_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(__file__)
+_JOBS_DB = os.getenv("ADVICE_JOBS_DB", os.path.join(_ROOT, 'data', 'advice_jobs.db'))
+
+ADVICE_JOB_WORKERS = int(os.getenv("ADVICE_JOB_WORKERS", "4"))
+ADVICE_JOB_TTL = int(os.getenv("ADVICE_JOB_TTL", "900"))
+
+
+class AdviceJobs:
+    """Runs advice generation on a small thread pool.
+
+    Job state is mirrored to SQLite so a follow-up request that lands on a
+    different worker process can still pick up the result.
+    """
+
+    def __init__(self, path=_JOBS_DB, max_workers=ADVICE_JOB_WORKERS, ttl=ADVICE_JOB_TTL):
+        self.ttl = ttl
+        self.store = DiskCache(path, table='advice_jobs')
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='advice')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _save(self, job_id, record):
+        try:
+            self.store.set(job_id, record, self.ttl)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist advice job {job_id}: {e}")
+
+    def _run(self, job_id, fn, args, kwargs):
+        try:
+            advice = fn(*args, **kwargs)
+            # None means no AI advice came back; the client keeps the advice it already shows
+            self._save(job_id, {'status': 'ready', 'advice': advice} if advice is not None else {'status': 'failed'})
+            return advice
+        except Exception as e:
+            logger.error(f"Advice job {job_id} failed: {e}")
+            self._save(job_id, {'status': 'failed'})
+            raise
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def submit(self, fn, *args, **kwargs):
+        """Start fn(*args, **kwargs) in the background and return its job id"""
+        job_id = uuid.uuid4().hex
+        self._save(job_id, {'status': 'pending'})
+        with self._lock:
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def wait(self, job_id, timeout):
+        """Wait up to timeout seconds for a job started in this process; None if not done in time"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is None:
+            record = self.get(job_id)
+            return record.get('advice') if record else None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    def get(self, job_id):
+        """Current job record ({'status': ..., 'advice': ...}) or None if unknown/expired"""
+        try:
+            return self.store.get(job_id)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read advice job {job_id}: {e}")
+            return None
+
+
+advice_jobs = AdviceJobs()
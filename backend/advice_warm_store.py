@@ -0,0 +1,214 @@
+"""
+Pre-generated advice for popular (role, skill gaps, career type) combinations, plus the analyze signature log that ranks them
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import atexit
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(__file__)
+_WARM_DB = os.getenv("ADVICE_WARM_DB", os.path.join(_ROOT, 'data', 'advice_warm.db'))
+
+# Warm advice older than this is ignored and regenerated by the next warm-up run
+WARM_ADVICE_MAX_AGE = int(os.getenv("ADVICE_WARM_MAX_AGE", str(7 * 24 * 3600)))
+# Signature counts are kept in memory and written in one transaction this often (seconds)
+SIGNATURE_FLUSH_INTERVAL = float(os.getenv("ADVICE_SIGNATURE_FLUSH_INTERVAL", "5"))
+# Distinct pending signatures that trigger an early flush
+SIGNATURE_FLUSH_MAX_PENDING = 1000
+
+
+def signature(role_title, gaps, career_type):
+    """Canonical (role, gaps, career type) tuple; gap order does not matter"""
+    return (
+        (role_title or '').strip().lower(),
+        tuple(sorted(g.strip().lower() for g in gaps or [])),
+        career_type or 'tech'
+    )
+
+
+class AdviceWarmStore:
+    """SQLite store of zlib-compressed advice texts keyed by signature hash.
+
+    The same database logs how often each signature is seen by /api/analyze
+    so the offline warm-up job (warm_advice.py) knows what to pre-generate.
+    Those counts are buffered in memory and written by a background thread
+    every SIGNATURE_FLUSH_INTERVAL seconds, so analyze never waits on SQLite.
+    """
+
+    def __init__(self, path=_WARM_DB, max_age=WARM_ADVICE_MAX_AGE, flush_interval=SIGNATURE_FLUSH_INTERVAL):
+        self.path = path
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self._initialized = False
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'errors': 0}
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._flusher = None
+        self._flusher_pid = None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS advice (
+                    key BLOB PRIMARY KEY,
+                    role TEXT NOT NULL,
+                    gaps TEXT NOT NULL,
+                    career_type TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    advice BLOB NOT NULL,
+                    created REAL NOT NULL
+                ) WITHOUT ROWID;
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS signatures (
+                    key BLOB PRIMARY KEY,
+                    role TEXT NOT NULL,
+                    gaps TEXT NOT NULL,
+                    career_type TEXT NOT NULL,
+                    hits INTEGER NOT NULL,
+                    last_seen REAL NOT NULL
+                ) WITHOUT ROWID;
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def make_key(sig):
+        # 16-byte digest keeps both tables compact
+        return hashlib.blake2b(json.dumps(sig).encode('utf-8'), digest_size=16).digest()
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _fresh_row(self, sig, sources):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT source, advice, created FROM advice WHERE key = ?;",
+                               (self.make_key(sig),)).fetchone()
+        finally:
+            conn.close()
+        if row is None or row[0] not in sources or time.time() - row[2] > self.max_age:
+            return None
+        return row
+
+    def get(self, role_title, gaps, career_type, sources=('gemini',)):
+        """Stored advice for this combination if it is fresh and came from one of `sources`, else None"""
+        try:
+            row = self._fresh_row(signature(role_title, gaps, career_type), sources)
+        except sqlite3.Error as e:
+            logger.error(f"Warm advice lookup failed: {e}")
+            self._count('errors')
+            return None
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return zlib.decompress(row[1]).decode('utf-8')
+
+    def put(self, role_title, gaps, career_type, advice, source):
+        sig = signature(role_title, gaps, career_type)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO advice (key, role, gaps, career_type, source, advice, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?);",
+                    (self.make_key(sig), role_title, json.dumps(list(gaps)), sig[2], source,
+                     zlib.compress(advice.encode('utf-8'), 9), time.time()))
+        finally:
+            conn.close()
+
+    def has_fresh(self, role_title, gaps, career_type, source):
+        """Whether fresh advice from `source` is stored (does not count towards hit stats)"""
+        return self._fresh_row(signature(role_title, gaps, career_type), (source,)) is not None
+
+    def record_signature(self, role_title, gaps, career_type):
+        """Count one /api/analyze result in memory; the background flusher writes it out"""
+        sig = signature(role_title, gaps, career_type)
+        with self._pending_lock:
+            entry = self._pending.get(sig)
+            if entry is None:
+                entry = self._pending[sig] = [role_title, list(gaps), 0, 0.0]
+            entry[2] += 1
+            entry[3] = time.time()
+            pending = len(self._pending)
+        self._ensure_flusher()
+        if pending >= SIGNATURE_FLUSH_MAX_PENDING:
+            self._flush_wanted.set()
+
+    def _ensure_flusher(self):
+        # Also restarts the thread in a forked worker, where it does not survive
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._pending_lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='signature-flush', daemon=True)
+            self._flusher_pid = pid
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wanted.wait(self.flush_interval)
+            self._flush_wanted.clear()
+            self.flush()
+
+    def flush(self):
+        """Write the buffered signature counts in one transaction; never raises"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        rows = [(self.make_key(sig), role_title, json.dumps(gaps), sig[2], hits, last_seen)
+                for sig, (role_title, gaps, hits, last_seen) in pending.items()]
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO signatures (key, role, gaps, career_type, hits, last_seen) VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET hits = hits + excluded.hits, last_seen = excluded.last_seen;",
+                        rows)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not log {len(rows)} analyze signatures: {e}")
+
+    def top_signatures(self, limit=50):
+        """Most frequent logged combinations as (role title, gaps, career type, hits)"""
+        self.flush()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT role, gaps, career_type, hits FROM signatures ORDER BY hits DESC, last_seen DESC LIMIT ?;",
+                (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [(role, json.loads(gaps), career_type, hits) for role, gaps, career_type, hits in rows]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['pending_signatures'] = len(self._pending)
+        return stats
+
+
+advice_warm_store = AdviceWarmStore()
+atexit.register(advice_warm_store.flush)
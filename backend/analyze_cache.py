@@ -0,0 +1,83 @@
+"""
+Response caches for the deterministic part of /api/analyze (role ranking, skill gaps and learning plan) and for resume analyses
+"""
+import os
+import hashlib
+import threading
+
+from shared_cache import TieredCache, make_key
+
+ANALYZE_CACHE_SIZE = int(os.getenv("ANALYZE_CACHE_SIZE", "1024"))
+ANALYZE_CACHE_TTL = int(os.getenv("ANALYZE_CACHE_TTL", "600"))
+RESUME_CACHE_SIZE = int(os.getenv("RESUME_CACHE_SIZE", "256"))
+RESUME_CACHE_TTL = int(os.getenv("RESUME_CACHE_TTL", str(24 * 3600)))
+
+
+class AnalyzeCache:
+    """Role rankings keyed by catalog versions, career type, domain and the sorted canonical skill set.
+
+    AI advice is not part of the entry: it depends on Gemini availability and
+    has its own caches (advice_cache, advice_warm_store). Entries are shared
+    between responses and must not be modified. A new role or resource
+    catalog version changes every key, so stale rankings are never served.
+    """
+
+    def __init__(self, max_size=ANALYZE_CACHE_SIZE, ttl=ANALYZE_CACHE_TTL, backend=None):
+        self.tiers = TieredCache('analyze', max_size, ttl, backend)
+        self._lock = threading.Lock()
+        self._clears = 0
+
+    @staticmethod
+    def make_key(user_skills, career_type, domain, catalog_versions):
+        return make_key(
+            list(catalog_versions),
+            career_type or 'tech',
+            '' if domain in (None, '', 'general') else domain,
+            sorted(set(user_skills))
+        )
+
+    def get(self, key):
+        return self.tiers.get(key)
+
+    def set(self, key, value):
+        self.tiers.set(key, value)
+
+    def clear(self):
+        self.tiers.clear()
+        with self._lock:
+            self._clears += 1
+
+    def stats(self):
+        stats = self.tiers.stats()
+        stats['hits'] = stats['l1_hits'] + stats['l2_hits']
+        stats['clears'] = self._clears
+        return stats
+
+
+class ResumeAnalysisCache:
+    """Full resume analyses keyed by a digest of the extracted text and the career type.
+
+    Re-submitting the same resume (from any worker) skips the analyzer and
+    the duplicate index. Entries are shared and must not be modified.
+    """
+
+    def __init__(self, max_size=RESUME_CACHE_SIZE, ttl=RESUME_CACHE_TTL, backend=None):
+        self.tiers = TieredCache('resume', max_size, ttl, backend)
+
+    @staticmethod
+    def make_key(resume_text, career_type):
+        digest = hashlib.blake2b(resume_text.encode('utf-8'), digest_size=16).hexdigest()
+        return make_key(digest, career_type or 'tech')
+
+    def get(self, key):
+        return self.tiers.get(key)
+
+    def set(self, key, value):
+        self.tiers.set(key, value)
+
+    def stats(self):
+        return self.tiers.stats()
+
+
+analyze_cache = AnalyzeCache()
+resume_analysis_cache = ResumeAnalysisCache()
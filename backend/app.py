@@ -1,12 +1,14 @@
 import os
 import sys
 import json
-import logging
+import socket
 import time
+import hmac
 import requests
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, Response, g, request, jsonify, send_from_directory, stream_with_context, has_request_context
 from flask_cors import CORS
 from dotenv import load_dotenv
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 
 from database import init_db, get_roles, add_role
 from resume_analysis_helpers import (
@@ -18,23 +20,113 @@ from professional_resume_analyzer import (
     extract_detailed_achievements, extract_detailed_projects, extract_internships,
     analyze_work_impact, extract_leadership_experience, generate_professional_summary
 )
+from resume_dedup import resume_index, resume_signature, SIMILAR_THRESHOLD
+from profile_store import save_profile, find_candidates
+import gemini_client
+from async_gemini import async_gemini
+from gemini_context import context_cache, SYSTEM_INSTRUCTIONS
+from chat_router import chat_router, FAQ_SOURCES
+from intent_matcher import fallback_intents
+from knowledge_base import knowledge_base
+from resource_catalog import resource_catalog
+from role_catalog import role_catalog, ACTION_PLAN
+from resume_extract import resume_extractor, CappedSpool, ExtractionError, MAX_FILE_BYTES as MAX_RESUME_FILE_BYTES
+from request_body import body_limit, format_size, iter_records
+from advice_jobs import advice_jobs
+from advice_cache import advice_cache
+from analyze_cache import analyze_cache, resume_analysis_cache
+from advice_warm_store import advice_warm_store
+import metrics
+from metrics import stage, fallbacks
+from profiling import request_profiler
+from logging_setup import configure_logging, assign_request_id, logging_pipeline
+from prompt_builder import (
+    PromptBuilder, PROMPT_BUDGETS, RESPONSE_GUIDELINES, compact_history, format_skill_list, prompt_stats,
+    truncate_to_tokens
+)
 
 import psycopg2
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
-
 # Load environment variables from .env file
 load_dotenv()
 
+# Set up logging (JSON lines written by a background thread; see logging_setup)
+configure_logging()
+
 # Define paths for structured project
 BACKEND_PATH = os.path.dirname(os.path.abspath(__file__))
 FRONTEND_PATH = os.path.abspath(os.path.join(BACKEND_PATH, '..', 'frontend'))
 
 # Correct Flask app initialization for structured folders
+class CappedRequest(Request):
+    """Request with a per-endpoint body limit that spools uploaded files to a temp file"""
+
+    @property
+    def max_content_length(self):
+        # Werkzeug enforces this on every body read, including chunked bodies without a Content-Length
+        return body_limit(self.endpoint)
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return CappedSpool(MAX_RESUME_FILE_BYTES)
+
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.request_class = CappedRequest
 CORS(app, origins=['http://localhost:5000', 'http://127.0.0.1:5000'])
 
+@app.before_request
+def start_request_timer():
+    assign_request_id(request.headers.get('X-Request-ID'))
+    metrics.start_request()
+
+@app.after_request
+def add_server_timing(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    return metrics.finish_request(response)
+
+def is_admin():
+    """True when the request carries the backend API key in X-Admin-Key (admin is disabled without a key)"""
+    supplied = request.headers.get('X-Admin-Key', '')
+    return bool(API_KEY) and hmac.compare_digest(supplied.encode('utf-8'), API_KEY.encode('utf-8'))
+
+@app.before_request
+def start_profiling():
+    """Profile API requests flagged by an admin (X-Profile: 1 or ?profile=1) and 1 in PROFILE_SAMPLE_EVERY others"""
+    if not request.path.startswith('/api/') or request.path.startswith('/api/admin/'):
+        return
+    flagged = (request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1') and is_admin()
+    trigger = request_profiler.trigger_for(flagged)
+    if trigger:
+        g.profile_session = request_profiler.start(trigger)
+
+@app.after_request
+def finish_profiling(response):
+    # Streamed bodies are produced after this point, so only their setup is profiled
+    session = g.pop('profile_session', None)
+    if session is not None:
+        profile_id = request_profiler.stop(session, method=request.method, path=request.path,
+                                           endpoint=request.endpoint, status=response.status_code)
+        if session.trigger == 'request':
+            response.headers['X-Profile-Id'] = profile_id
+    return response
+
+@app.teardown_request
+def abandon_profiling(exc):
+    # Only still set when the request raised before after_request ran
+    session = g.pop('profile_session', None)
+    if session is not None:
+        request_profiler.discard(session)
+
+@app.before_request
+def reject_oversized_body():
+    """Answer 413 from the Content-Length header before any of the body is read"""
+    limit = request.max_content_length
+    if request.content_length is not None and request.content_length > limit:
+        return jsonify({'error': f'Request body is limited to {format_size(limit)} for this endpoint'}), 413
+
+@app.errorhandler(RequestEntityTooLarge)
+def body_too_large(e):
+    return jsonify({'error': e.description}), 413
+
 # Database setup
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
@@ -48,6 +140,12 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "AIzaSyBvOkBwL7iMx9zF8nE3qR2sT5uY7w
 # Simple API Key for backend access
 API_KEY = os.getenv("BACKEND_API_KEY")
 
+# Resumes accepted by one /api/resume/batch request
+RESUME_BATCH_MAX_ITEMS = int(os.getenv("RESUME_BATCH_MAX_ITEMS", "100"))
+
+# How long /api/analyze waits for Gemini advice before answering with the deterministic advice (0 = no limit)
+ADVICE_LATENCY_BUDGET_MS = int(os.getenv("ADVICE_LATENCY_BUDGET_MS", "0"))
+
 # UPDATED SYNONYMS
 SYNONYMS = {
     'js': 'javascript',
@@ -88,84 +186,49 @@ def normalize_skills(text):
         for skill in skills if skill
     )) # <-- Corrected line with closing parentheses
 
+def canonical_skill(skill):
+    """Canonical skill ID used for matching and for the profile skill index"""
+    s = skill.lower().strip()
+    return SYNONYMS.get(s, s)
+
 def score_role(user_skills, role):
-    required = role.get('requiredSkills', [])
-    total_weight = sum(item.get('weight', 1) for item in required)
+    # Catalog roles carry their canonical skills and total weight precomputed
+    entry = role_catalog.entry(role)
+    if entry is not None:
+        required, total_weight = entry['skills'], entry['total_weight']
+    else:
+        required = [(canonical_skill(item['skill']), item.get('weight', 1), item['skill'])
+                    for item in role.get('requiredSkills', [])]
+        total_weight = sum(weight for _, weight, _ in required)
     matched_weight = 0
     matched_list = []
     missing_skills = []
 
-    normalized_required = [SYNONYMS.get(item['skill'].lower(), item['skill'].lower()) for item in required]
-
-    for item in required:
-        skill = SYNONYMS.get(item['skill'].lower(), item['skill'].lower())
+    for skill, weight, name in required:
         if skill in user_skills:
-            matched_weight += item.get('weight', 1)
-            matched_list.append(item['skill'])
+            matched_weight += weight
+            matched_list.append(name)
         else:
-            missing_skills.append(item['skill'])
+            missing_skills.append(name)
 
     score = round((matched_weight / total_weight) * 100, 2) if total_weight else 0
     return { 'score': score, 'matchedList': matched_list, 'missing': missing_skills }
 
 def plan_for_gaps(gaps):
-    plan = {
-        'week1': 'Focus on foundational skills. Aim to spend 60-90 minutes daily on learning and practice.',
-        'week2': 'Start a mini-project to apply your new skills. This will help you build a portfolio.'
-    }
-    return plan
+    return ACTION_PLAN
 
-# UPDATED RESOURCES
 def resources_for_skill(skill):
-    s = skill.lower()
-    links = {
-        'python': [
-            {'title': 'Google: Crash Course on Python', 'url': 'https://grow.google/certificates/python/'},
-            {'title': 'freeCodeCamp: Python', 'url': 'https://www.freecodecamp.org/learn/'}
-        ],
-        'sql': [
-            {'title': 'Mode SQL Tutorial', 'url': 'https://mode.com/sql-tutorial/'},
-            {'title': 'Kaggle: Intro to SQL', 'url': 'https://www.kaggle.com/learn/intro-to-sql'}
-        ],
-        'javascript': [
-            {'title': 'MDN Web Docs: JavaScript Guide', 'url': 'https://developer.mozilla.org/docs/Web/JavaScript/Guide'}
-        ],
-        'react': [
-            {'title': 'React Official Docs (Tutorial)', 'url': 'https://react.dev/learn'}
-        ],
-        'google cloud': [
-            {'title': 'Google Cloud Skills Boost', 'url': 'https://www.cloudskillsboost.google/'}
-        ],
-        # Civil Services & Non-Tech Additions
-        'indian polity & constitution': [
-            {'title': 'Vision IAS: Indian Polity Notes', 'url': 'https://visionias.in/resources/'},
-            {'title': 'Book: Indian Polity by M. Laxmikanth', 'url': 'https://www.amazon.in/Indian-Polity-M-Laxmikanth/dp/9352603630'}
-        ],
-        'current affairs': [
-            {'title': 'The Hindu - Newspaper', 'url': 'https://www.thehindu.com/'},
-            {'title': 'Insights on India - Daily Current Affairs', 'url': 'https://www.insightsonindia.com/current-affairs/'}
-        ],
-        'financial modeling': [
-            {'title': 'Coursera: Business and Financial Modeling', 'url': 'https://www.coursera.org/specializations/wharton-business-financial-modeling'}
-        ],
-        'brand strategy': [
-            {'title': 'HubSpot Academy: Brand Building', 'url': 'https://academy.hubspot.com/courses/brand-building'}
-        ],
-        'general studies': [
-            {'title': 'NCERT Books Online', 'url': 'https://ncert.nic.in/textbook.php'},
-            {'title': 'Vision IAS: General Studies Notes', 'url': 'https://visionias.in/resources/'}
-        ],
-        'banking awareness': [
-            {'title': 'Bankersadda: Banking Awareness', 'url': 'https://www.bankersadda.com/'},
-            {'title': 'Oliveboard: Banking Knowledge', 'url': 'https://www.oliveboard.in/'}
-        ],
-        'quantitative aptitude': [
-            {'title': 'IndiaBix: Quantitative Aptitude', 'url': 'https://www.indiabix.com/aptitude/questions-and-answers/'},
-            {'title': 'Khan Academy: Math', 'url': 'https://www.khanacademy.org/math'}
-        ]
-    }
-    # Fallback for skills without specific links
-    return links.get(s, [{'title': f'Search for "{skill}" courses on Coursera/Udemy', 'url': 'https://www.coursera.org/'}])
+    """Learning links for a skill from the resource catalog (search links for unknown skills)"""
+    if not resource_catalog.loaded:
+        init_resource_catalog()
+    return resource_catalog.resources_for(skill)
+
+def init_resource_catalog():
+    """Index the curated learning resources and every skill of the role catalog"""
+    try:
+        resource_catalog.build(get_roles(''))
+    except Exception as e:
+        app.logger.error(f"Resource catalog init failed: {e}")
 
 def format_professional_response(response):
     """Format AI response for better readability and professionalism"""
@@ -185,24 +248,70 @@ def format_professional_response(response):
     
     return response
 
-def get_gemini_response(prompt, max_tokens=500, temperature=0.7):
+def get_gemini_response(prompt, max_tokens=500, temperature=0.7, priority='normal', instruction=None):
     """Enhanced Gemini API function with professional response formatting"""
+    response = request_gemini_text(prompt, max_tokens, temperature, priority, instruction)
+    if response is None:
+        fallbacks.inc('gemini_response')
+        return get_enhanced_fallback_response(prompt)
+    return response
+
+def request_gemini_text(prompt, max_tokens=500, temperature=0.7, priority='normal', instruction=None):
+    """Call Gemini and return the formatted text, or None when no usable answer came back.
+
+    priority ('high', 'normal', 'low') decides how long the call may queue for quota.
+    instruction names the static system instruction (see gemini_context) the prompt relies on.
+    """
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key or api_key == "your_gemini_api_key_here" or len(api_key) < 20:
-        return get_enhanced_fallback_response(prompt)
+        return None
     
-    endpoint = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
-    
-    # Enhanced payload with professional response guidelines
-    enhanced_prompt = f"""{prompt}
-
-Please provide a professional, well-structured response that:
-- Uses clear, concise language
-- Provides specific, actionable advice
-- Includes relevant examples where appropriate
-- Maintains a helpful and encouraging tone
-- Formats information in an organized manner
-- Avoids unnecessary filler words or phrases"""
+    payload = build_gemini_payload(prompt, max_tokens, temperature, instruction)
+
+    try:
+        # Identical in-flight prompts share one upstream call; stop waiting if the browser goes away
+        data = async_gemini.generate_content(
+            payload, api_key, priority=priority, instruction=instruction,
+            cancelled=client_disconnected if has_request_context() else None)
+        raw_response = gemini_client.extract_text(data)
+        if raw_response:
+            # Post-process response for better formatting
+            return format_professional_response(raw_response)
+        
+        return None
+        
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 429:
+            app.logger.warning("Rate limit hit, using fallback response")
+            return None
+        app.logger.error(f"Gemini API HTTP error: {e}")
+        return None
+    except Exception as e:
+        app.logger.error(f"Gemini API call failed: {e}")
+        return None
+
+def client_disconnected():
+    """Best-effort check whether the client of the current request has hung up.
+
+    Only possible when the WSGI server exposes the socket (gunicorn does);
+    otherwise we assume the client is still there.
+    """
+    sock = request.environ.get('gunicorn.socket')
+    if sock is None:
+        return False
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+def build_gemini_payload(prompt, max_tokens=500, temperature=0.7, instruction=None):
+    """generateContent payload; the response guidelines are appended unless the system instruction has them"""
+    if instruction:
+        enhanced_prompt = prompt
+    else:
+        enhanced_prompt = f"{prompt}\n\n{RESPONSE_GUIDELINES}"
     
     payload = {
         "contents": [{"parts": [{"text": enhanced_prompt}]}],
@@ -225,31 +334,19 @@ Please provide a professional, well-structured response that:
             }
         ]
     }
+    return payload
 
-    try:
-        response = requests.post(endpoint, json=payload, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        if 'candidates' in data and data['candidates']:
-            content = data['candidates'][0].get('content', {})
-            parts = content.get('parts', [])
-            if parts:
-                raw_response = parts[0].get('text', 'No response generated.')
-                # Post-process response for better formatting
-                return format_professional_response(raw_response)
-        
-        return get_enhanced_fallback_response(prompt)
-        
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 429:
-            app.logger.warning("Rate limit hit, using fallback response")
-            return get_enhanced_fallback_response(prompt)
-        app.logger.error(f"Gemini API HTTP error: {e}")
-        return get_enhanced_fallback_response(prompt)
-    except Exception as e:
-        app.logger.error(f"Gemini API call failed: {e}")
-        return get_enhanced_fallback_response(prompt)
+def stream_gemini_text(prompt, max_tokens=500, temperature=0.7, priority='normal', instruction=None):
+    """Yield formatted Gemini text chunks as they are generated; raises if the call fails"""
+    api_key = os.getenv("GEMINI_API_KEY")
+    payload = build_gemini_payload(prompt, max_tokens, temperature, instruction)
+    if instruction:
+        chunks = context_cache.stream_generate_content(payload, instruction, api_key, priority=priority)
+    else:
+        chunks = gemini_client.stream_generate_content(payload, api_key, priority=priority)
+    for chunk in chunks:
+        # Same bullet normalisation as format_professional_response, applied per chunk
+        yield chunk.replace('•', '\n• ').replace('*', '\n• ')
 
 def is_gemini_available():
     """Utility: determine if Gemini API key is configured and likely valid."""
@@ -313,8 +410,21 @@ def generate_skill_based_advice(user_skills, top_role, gaps, career_type='tech')
 
     return "\n".join(lines)
 
-def simple_chat_engine(message, context=None):
-    """[FIXED] Local, conversational engine with better general responses."""
+# Replies for the small-talk intents chat_router answers locally
+LOCAL_INTENT_REPLIES = {
+    'greeting': "Hello there! How can I help you with your career goals today? You can also ask me general questions.",
+    'identity': "I'm CareerPath AI, a friendly assistant designed to help you with career advice, learning paths, and more.",
+    'joke': "Why don't scientists trust atoms? Because they make up everything!",
+    'thanks': "You're welcome! Feel free to ask if you need anything else for your career plans.",
+    'goodbye': "Goodbye, and good luck with your career journey! Come back anytime you need guidance.",
+    'capabilities': "I can suggest career paths that fit your skills, point out skill gaps, build learning plans with resources, review your resume and help you prepare for interviews or government exams. What would you like to start with?"
+}
+
+def simple_chat_engine(message, context=None, intent=None):
+    """[FIXED] Local, conversational engine with better general responses.
+
+    intent, when chat_router already classified the message, selects the reply directly.
+    """
     ctx = context or {}
     career_type = ctx.get('careerType', 'tech')
     skills = ctx.get('skills', [])
@@ -322,14 +432,16 @@ def simple_chat_engine(message, context=None):
 
     if not lower:
         return "Could you please repeat that?"
+    if intent in LOCAL_INTENT_REPLIES:
+        return LOCAL_INTENT_REPLIES[intent]
 
     # General conversation handlers
     if any(g in lower for g in ["hello", "hi", "hey"]):
-        return "Hello there! How can I help you with your career goals today? You can also ask me general questions."
+        return LOCAL_INTENT_REPLIES['greeting']
     if any(q in lower for q in ["who are you", "what are you"]):
-        return "I'm CareerPath AI, a friendly assistant designed to help you with career advice, learning paths, and more."
+        return LOCAL_INTENT_REPLIES['identity']
     if any(j in lower for j in ["joke", "funny"]):
-        return "Why don't scientists trust atoms? Because they make up everything!"
+        return LOCAL_INTENT_REPLIES['joke']
 
     # Career-specific handlers
     if any(k in lower for k in ["career", "job", "role", "path", "opportunity"]):
@@ -347,27 +459,101 @@ def simple_chat_engine(message, context=None):
     return "That's an interesting question! My primary expertise is in career guidance. Can I help you with creating a learning plan, finding resources for a skill, or preparing for an interview?"
 
 
-def get_gemini_advice(user_skills, top_role, gaps, career_type='tech'):
-    """[FIXED] Generates highly personalized advice based on user skills and target role."""
-    
-    prompt = f"""You are an expert career coach. A user has provided their skills and has been matched with a top career goal. Provide personalized, actionable advice.
+def advice_cache_key(user_skills, top_role, gaps, career_type='tech'):
+    return advice_cache.make_key(user_skills, top_role['title'], gaps, career_type, 0.6, gemini_client.GEMINI_MODEL)
+
+def get_gemini_advice(user_skills, top_role, gaps, career_type='tech', priority='high', fallback=True):
+    """[FIXED] Generates highly personalized advice based on user skills and target role.
 
-**User Profile:**
-* **Current Skills:** {', '.join(user_skills) if user_skills else 'Not specified'}
-* **Target Career:** {top_role['title']}
-* **Identified Skill Gaps:** {', '.join(gaps) if gaps else 'None'}
+    With fallback=False returns None instead of the offline text when Gemini gives no answer.
+    """
+    
+    # Students sharing the same (skills, role, gaps) get the same advice - serve repeats from cache
+    role_title = top_role['title']
+    cache_key = advice_cache_key(user_skills, top_role, gaps, career_type)
+    cached = advice_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # The coach persona and report structure live in the cached 'advice' system instruction
+    prompt, _ = (PromptBuilder('advice')
+        .add('profile', f"""**User Profile:**
+* **Current Skills:** {format_skill_list(user_skills)}
+* **Target Career:** {role_title}
+* **Identified Skill Gaps:** {format_skill_list(gaps, limit=8) if gaps else 'None'}""", required=True)
+        .build())
+
+    # Analyze advice takes precedence over chat for the shared Gemini quota
+    advice = request_gemini_text(prompt, max_tokens=500, temperature=0.6, priority=priority, instruction='advice')
+    if advice is None:
+        fallbacks.inc('advice_gemini_failed')
+        # Fallback text is never cached so the next request retries Gemini
+        return get_enhanced_fallback_response(prompt) if fallback else None
+    advice_cache.set(cache_key, advice)
+    return advice
+
+def rank_roles(user_skills, career_type, interest):
+    """Best roles, skill gaps and learning plan for a skill set - the cacheable part of /api/analyze.
+
+    Returns None when no role matches the career type and domain.
+    """
+    # Enhanced: Filter roles by career type and domain
+    with stage('get_roles'):
+        roles = get_roles_by_type_and_domain(career_type, interest)
+    
+    # Debug logging
+    app.logger.debug("Career type: %s, Domain: %s, Found roles: %d", career_type, interest, len(roles))
+    
+    if not roles:
+        return None
+
+    cache_key = analyze_cache.make_key(user_skills, career_type, interest,
+                                       (role_catalog.version, resource_catalog.version))
+    with stage('cache'):
+        cached = analyze_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    with stage('score'):
+        user_skill_set = set(user_skills)
+        scored_roles = []
+        for role in roles:
+            scored_roles.append((role, score_role(user_skill_set, role)))
+        
+        scored_roles.sort(key=lambda r: r[1]['score'], reverse=True)
+        
+        top_roles = [{**role, **score_data} for role, score_data in scored_roles[:3]]
+        top_role = top_roles[0] if top_roles else None
+        gaps = top_role['missing'][:5] if top_role else []
 
-**Your Task:**
-Generate a concise, encouraging, and structured advisory report with the following sections:
+    # Shared, precomputed plan fragments from the role catalog
+    with stage('resources'):
+        learning_plan = role_catalog.learning_plan(scored_roles[0][0], gaps) if top_role else []
+        if learning_plan is None:
+            learning_plan = [{'category': skill.title(), 'resources': resources_for_skill(skill)} for skill in gaps]
 
-1.  **Analysis:** A brief opening statement confirming the user's profile and goal.
-2.  **Leverage Your Strengths:** Explain how the user's CURRENT skills (pick 2-3 of the most relevant) are valuable for the '{top_role['title']}' role and how they can be highlighted.
-3.  **Bridge Your Skill Gaps:** Create a clear, step-by-step plan to learn the most critical skill gaps. For each gap, suggest a type of learning resource (e.g., "an interactive online course," "a hands-on project").
-4.  **Actionable Next Steps:** Provide 3-4 bullet points for what the user should do in the next 30 days.
+    # Ensure all properties are properly structured for frontend
+    formatted_roles = []
+    for role in top_roles:
+        formatted_role = {
+            'title': role.get('title', 'Unknown Role'),
+            'description': role.get('description', 'No description available'),
+            'score': role.get('score', 0),
+            'skills': role.get('matchedList', [])[:5],  # Limit to 5 skills for display
+            'missing': role.get('missing', [])
+        }
+        formatted_roles.append(formatted_role)
 
-Maintain a positive and motivational tone.
-"""
-    return get_gemini_response(prompt, max_tokens=500, temperature=0.6)
+    ranking = {
+        'topRole': top_role,
+        'bestRoles': formatted_roles,
+        'skillGaps': gaps,
+        'learningPlan': learning_plan,
+        'actionPlan': plan_for_gaps(gaps)
+    }
+    with stage('cache'):
+        analyze_cache.set(cache_key, ranking)
+    return ranking
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
@@ -375,13 +561,15 @@ def analyze():
     mode = data.get('mode', 'quick')
     interest = data.get('domain', '')
     career_type = data.get('careerType', 'tech')  # New: get career type
+    advice_mode = data.get('adviceMode', 'sync')  # 'deferred' returns immediately and generates AI advice in the background
     
     # FIX: The 'resume' mode should be handled like the 'quick' mode after skills are extracted by the frontend.
     if mode in ['quick', 'resume']:
         user_skills_raw = data.get('skills', '')
         if not user_skills_raw:
             return jsonify({'error': 'No skills provided'}), 400
-        user_skills = normalize_skills(user_skills_raw)
+        with stage('skills'):
+            user_skills = normalize_skills(user_skills_raw)
     elif mode == 'detailed':
         skills_data = data.get('skills', [])
         if not skills_data:
@@ -390,71 +578,75 @@ def analyze():
     else:
         return jsonify({'error': 'Invalid mode specified'}), 400
 
-    # Enhanced: Filter roles by career type and domain
-    roles = get_roles_by_type_and_domain(career_type, interest)
-    
-    # Debug logging
-    app.logger.debug(f"Career type: {career_type}, Domain: {interest}, Found roles: {len(roles)}")
-    
-    if not roles:
+    ranking = rank_roles(user_skills, career_type, interest)
+    if ranking is None:
         return jsonify({'error': f'No roles found for {career_type} careers with domain {interest}.'}), 404
-
-    scored_roles = []
-    for role in roles:
-        score_data = score_role(user_skills, role)
-        scored_roles.append({**role, **score_data})
-    
-    scored_roles.sort(key=lambda r: r['score'], reverse=True)
-    
-    top_roles = scored_roles[:3]
-    top_role = top_roles[0] if top_roles else None
-
-    learning_plan = []
-    if top_role:
-        for skill in top_role['missing'][:5]:
-            learning_plan.append({
-                'skill': skill,
-                'resources': resources_for_skill(skill)
-            })
+    top_role = ranking['topRole']
 
     ai_advice = ""
+    advice_id = None
     if top_role:
-        if is_gemini_available():
-            ai_advice = get_gemini_advice(user_skills, top_role, top_role['missing'][:5], career_type)
-        else:
-            ai_advice = generate_skill_based_advice(user_skills, top_role, top_role['missing'][:5], career_type)
-
-    # Ensure all properties are properly structured for frontend
-    formatted_roles = []
-    for role in top_roles:
-        formatted_role = {
-            'title': role.get('title', 'Unknown Role'),
-            'description': role.get('description', 'No description available'),
-            'score': role.get('score', 0),
-            'skills': role.get('matchedList', [])[:5],  # Limit to 5 skills for display
-            'missing': role.get('missing', [])
-        }
-        formatted_roles.append(formatted_role)
-
-    # Format learning plan properly
-    formatted_learning_plan = []
-    for item in learning_plan:
-        if isinstance(item, dict) and 'skill' in item:
-            formatted_learning_plan.append({
-                'category': item['skill'].title(),
-                'resources': item.get('resources', [])
-            })
+        with stage('advice'):
+            gaps = ranking['skillGaps']
+            # Feeds warm_advice.py, which pre-generates advice for the most common combinations
+            advice_warm_store.record_signature(top_role['title'], gaps, career_type)
+            gemini_available = is_gemini_available()
+            # Pre-generated Gemini advice is served before making a live API call
+            warm_advice = advice_warm_store.get(top_role['title'], gaps, career_type) if gemini_available else None
+            if not gemini_available:
+                fallbacks.inc('advice_offline')
+                ai_advice = generate_skill_based_advice(user_skills, top_role, gaps, career_type)
+            elif warm_advice is not None:
+                ai_advice = warm_advice
+            elif advice_mode == 'deferred':
+                # Cached Gemini advice is ready now - only a miss needs a background job
+                ai_advice = advice_cache.get(advice_cache_key(user_skills, top_role, gaps, career_type))
+                if ai_advice is None:
+                    # fallback=False: a failed Gemini call marks the job failed instead of handing over canned text
+                    advice_id = advice_jobs.submit(get_gemini_advice, user_skills, top_role, gaps, career_type,
+                                                   fallback=False)
+                    ai_advice = generate_skill_based_advice(user_skills, top_role, gaps, career_type)
+            elif ADVICE_LATENCY_BUDGET_MS > 0:
+                advice_id = advice_jobs.submit(get_gemini_advice, user_skills, top_role, gaps, career_type,
+                                               fallback=False)
+                ai_advice = advice_jobs.wait(advice_id, ADVICE_LATENCY_BUDGET_MS / 1000.0)
+                if ai_advice:
+                    advice_id = None
+                else:
+                    # Over budget (or Gemini failed): answer now with the skill-based advice; a job that is
+                    # still running stays collectable via /api/analyze/advice/<id>
+                    fallbacks.inc('advice_over_budget')
+                    ai_advice = generate_skill_based_advice(user_skills, top_role, gaps, career_type)
+                    if (advice_jobs.get(advice_id) or {}).get('status') == 'failed':
+                        advice_id = None
+            else:
+                ai_advice = get_gemini_advice(user_skills, top_role, gaps, career_type)
 
     response_data = {
-        'bestRoles': formatted_roles,
+        'bestRoles': ranking['bestRoles'],
         'userSkills': user_skills if user_skills else [],
-        'skillGaps': top_role['missing'][:5] if top_role and 'missing' in top_role else [],
-        'learningPlan': formatted_learning_plan,
-        'actionPlan': plan_for_gaps(top_role['missing'][:5] if top_role and 'missing' in top_role else []),
+        'skillGaps': ranking['skillGaps'],
+        'learningPlan': ranking['learningPlan'],
+        'actionPlan': ranking['actionPlan'],
         'aiAdvice': ai_advice if ai_advice else 'Complete your assessment to get personalized AI advice.',
-        'careerType': career_type
+        'careerType': career_type,
+        'adviceStatus': 'pending' if advice_id else 'ready'
     }
+    if advice_id:
+        response_data['adviceId'] = advice_id
     
+    with stage('render'):
+        return jsonify(response_data)
+
+@app.route('/api/analyze/advice/<advice_id>', methods=['GET'])
+def analyze_advice(advice_id):
+    """Follow-up for deferred AI advice started by /api/analyze"""
+    record = advice_jobs.get(advice_id)
+    if record is None:
+        return jsonify({'error': 'Unknown or expired advice id'}), 404
+    response_data = {'adviceId': advice_id, 'adviceStatus': record['status']}
+    if record.get('advice'):
+        response_data['aiAdvice'] = record['advice']
     return jsonify(response_data)
 
 @app.route('/api/chat', methods=['POST'])
@@ -469,35 +661,27 @@ def chat():
         if not message:
             return jsonify({'error': 'No message provided'}), 400
         
-        career_type = context.get('careerType', 'general')
-        skills = context.get('skills', [])
-
-        if is_gemini_available():
-            # Build conversation history for context
-            history_context = ""
-            for msg in chat_history[-3:]: # Use last 3 messages
-                history_context += f"User: {msg.get('user', '')}\nAssistant: {msg.get('assistant', '')}\n"
-
-            # A more conversational prompt
-            chat_prompt = f"""You are a friendly, conversational AI assistant named CareerPath AI. Your primary goal is to be helpful and engaging. You have special expertise in career counseling.
-
-Here is some context about the user (use it only if their question is related to careers):
-- Career Focus: {career_type}
-- User Skills: {', '.join(skills)}
-
-Recent conversation history:
-{history_context}
-
-Now, please provide a natural and helpful response to the user's latest message: "{message}"
-If the user asks a general question (e.g., about jokes, weather, facts), answer it naturally. Do not force career advice into every response.
-"""
-            ai_response = get_gemini_response(chat_prompt, max_tokens=300, temperature=0.8)
-        else:
-            # Use the improved local chat engine
-            ai_response = simple_chat_engine(message, context)
+        started = time.perf_counter()
+        # Small talk and FAQs are answered locally even when Gemini is available
+        with stage('route'):
+            route, intent, _, ai_response = chat_router.route(message, faq=lambda text: faq_answer(text, context))
+        if route == 'llm' and is_gemini_available():
+            with stage('gemini'):
+                chat_prompt = build_chat_prompt(message, context, chat_history)
+                ai_response = request_gemini_text(chat_prompt, max_tokens=300, temperature=0.8, priority='low',
+                                                  instruction='chat')
+            if ai_response is None:
+                fallbacks.inc('chat_gemini_failed')
+        if ai_response is None:
+            # Answer from the local knowledge base / chat engine
+            route = 'local'
+            with stage('local'):
+                ai_response = offline_chat_answer(message, context, intent)
+        chat_router.record_latency(route, time.perf_counter() - started)
         
         return jsonify({
             'response': ai_response,
+            'source': 'gemini' if route == 'llm' else 'local',
             'timestamp': time.time()
         })
         
@@ -508,56 +692,118 @@ If the user asks a general question (e.g., about jokes, weather, facts), answer
             'timestamp': time.time()
         })
 
+def build_chat_prompt(message, context, chat_history):
+    """Conversational prompt for /api/chat within the chat input budget.
+
+    Older turns are folded into a short summary and only the last couple of
+    turns are kept (capped); the latest message goes last on a "User:" line.
+    The persona and reply rules are sent separately as the 'chat' system instruction.
+    """
+    career_type = context.get('careerType', 'general')
+    summary, recent = compact_history(chat_history)
+
+    prompt, _ = (PromptBuilder('chat')
+        .add('context', f"User context (use only if the question is career related): career focus {career_type}; "
+                        f"skills {format_skill_list(context.get('skills', []))}", priority=3)
+        .add('summary', f"Earlier the user asked about: {summary}" if summary else '', priority=4)
+        .add('recent', f"Recent conversation:\n{recent}" if recent else '', priority=2)
+        .add('message', f"User: {truncate_to_tokens(message, PROMPT_BUDGETS['chat'] // 2)}", required=True)
+        .build())
+    return prompt
+
+def init_knowledge_base():
+    """Load (or build and persist) the offline retrieval index over guides, roles and resources"""
+    try:
+        if not resource_catalog.loaded:
+            init_resource_catalog()
+        knowledge_base.load_or_build(roles=get_roles(''), resources=resource_catalog.curated_resources())
+    except Exception as e:
+        app.logger.error(f"Knowledge base init failed: {e}")
+        knowledge_base.mark_failed()
+
+def faq_answer(message, context, sources=FAQ_SOURCES):
+    """(cosine score, answer) from the knowledge base; chat_router answers short questions with it as FAQs"""
+    if knowledge_base.build_due():
+        init_knowledge_base()
+    return knowledge_base.scored_answer(message, career_type=(context or {}).get('careerType'), sources=sources)
+
+def offline_chat_answer(message, context, intent=None):
+    """Chat answer without Gemini: small talk from the chat engine, questions from the knowledge base"""
+    if intent is None:
+        _, answer = faq_answer(message, context, sources=None)
+        if answer:
+            return answer
+    return simple_chat_engine(message, context, intent)
+
+def sse_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def chunk_text(text, words_per_chunk=4):
+    """Split a finished answer into small chunks so local answers stream like model output"""
+    words = text.split(' ')
+    for i in range(0, len(words), words_per_chunk):
+        chunk = ' '.join(words[i:i + words_per_chunk])
+        yield chunk if i + words_per_chunk >= len(words) else chunk + ' '
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Streaming variant of /api/chat - forwards tokens to the browser as Server-Sent Events"""
+    data = request.get_json(silent=True) or {}
+    message = data.get('message', '')
+    context = data.get('context', {})
+    chat_history = data.get('chatHistory', [])
+
+    if not message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    route, intent, _, answer = chat_router.route(message, faq=lambda text: faq_answer(text, context))
+
+    def generate():
+        started = time.perf_counter()
+        if route == 'llm' and is_gemini_available():
+            sent_any = False
+            try:
+                chat_prompt = build_chat_prompt(message, context, chat_history)
+                for chunk in stream_gemini_text(chat_prompt, max_tokens=300, temperature=0.8, priority='low',
+                                                    instruction='chat'):
+                    sent_any = True
+                    yield sse_event('token', {'text': chunk})
+            except Exception as e:
+                app.logger.error(f"Gemini streaming failed: {e}")
+                if sent_any:
+                    # Part of the answer is already on screen; end it rather than append a second answer
+                    yield sse_event('error', {'message': 'The response was interrupted.'})
+            if sent_any:
+                chat_router.record_latency('llm', time.perf_counter() - started)
+                yield sse_event('done', {'source': 'gemini', 'timestamp': time.time()})
+                return
+            fallbacks.inc('chat_gemini_failed')
+
+        # FAQ answer or local knowledge base / chat engine, served through the same stream
+        for chunk in chunk_text(answer or offline_chat_answer(message, context, intent)):
+            yield sse_event('token', {'text': chunk})
+        chat_router.record_latency('faq' if answer else 'local', time.perf_counter() - started)
+        yield sse_event('done', {'source': 'local', 'timestamp': time.time()})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 
 def get_roles_by_type_and_domain(career_type, domain):
-    """Enhanced function to filter roles by career type and domain"""
-    all_roles = get_roles('')  # Get all roles
-    
-    if not all_roles:
-        return []
-    
-    filtered_roles = []
-    
-    for role in all_roles:
-        role_tags = role.get('tags', [])
-        
-        # Filter by career type first
-        career_match = False
-        
-        if career_type == 'tech':
-            # Tech roles: exclude roles tagged with 'nontech' or 'government'
-            if not any(tag in role_tags for tag in ['nontech', 'government']):
-                career_match = True
-        elif career_type == 'nontech':
-            # Non-tech roles: include roles tagged with 'nontech' or traditional business domains
-            if any(tag in role_tags for tag in ['nontech', 'healthcare', 'finance', 'education', 'marketing', 'hr', 'consulting', 'operations', 'legal']):
-                career_match = True
-        elif career_type == 'government':
-            # Government roles: include roles tagged with 'government' or specific government domains
-            # Expanded matching criteria for better coverage
-            government_tags = ['government', 'ias', 'banking', 'railway', 'defense', 'ssc', 'psu', 'judiciary', 'teaching', 
-                             'upsc', 'civil', 'public', 'administrative', 'clerk', 'officer', 'exam', 'competitive',
-                             'central', 'state', 'municipal', 'local', 'service', 'commission']
-            if any(tag in role_tags for tag in government_tags):
-                career_match = True
-            # Also match if role title contains government-related keywords
-            role_title_lower = role.get('title', '').lower()
-            government_keywords = ['government', 'civil', 'public', 'administrative', 'clerk', 'officer', 
-                                 'ias', 'ips', 'bank', 'railway', 'defense', 'ssc', 'upsc', 'psu', 'nabard', 'rbi']
-            if any(keyword in role_title_lower for keyword in government_keywords):
-                career_match = True
-        
-        # If career type matches, then check domain
-        if career_match:
-            if domain and domain != 'general':
-                # Domain specified - must match exactly
-                if domain in role_tags:
-                    filtered_roles.append(role)
-            else:
-                # No domain specified - include all career type matches
-                filtered_roles.append(role)
-    
-    return filtered_roles
+    """Enhanced function to filter roles by career type and domain (see role_catalog.role_career_types)"""
+    if not role_catalog.loaded:
+        init_role_catalog()
+    return role_catalog.roles_for(career_type, domain)
+
+def init_role_catalog():
+    """Load the roles and precompute their scoring data and learning-plan fragments"""
+    try:
+        role_catalog.load(get_roles(''), canonical_skill, resources_for_skill)
+    except Exception as e:
+        app.logger.error(f"Role catalog init failed: {e}")
 
 @app.route('/health')
 def health():
@@ -565,9 +811,72 @@ def health():
         'status': 'healthy',
         'timestamp': time.time(),
         'version': '2.0.0',
-        'features': ['skill_assessment', 'career_roadmap', 'ai_insights', 'multi_career_types']
+        'features': ['skill_assessment', 'career_roadmap', 'ai_insights', 'multi_career_types'],
+        'caches': cache_stats(),
+        'resources': resource_catalog.stats(),
+        'roles': role_catalog.stats(),
+        'gemini': {
+            'client': async_gemini.stats(),
+            'circuit': gemini_client.gemini_breaker.snapshot(),
+            'rate_limit': gemini_client.gemini_limiter.stats(),
+            'prompts': prompt_stats.snapshot(),
+            'context_cache': context_cache.stats()
+        },
+        'chat_router': chat_router.stats(),
+        'profiling': request_profiler.stats(),
+        'logging': logging_pipeline.stats()
     })
 
+def cache_stats():
+    return {
+        'advice': advice_cache.stats(),
+        'warm_advice': advice_warm_store.stats(),
+        'analyze': analyze_cache.stats(),
+        'resume': resume_analysis_cache.stats()
+    }
+
+def cache_lookup_counts():
+    """{(cache, result): count} - result is l1_hit, l2_hit, hit (single-tier caches) or miss"""
+    counts = {}
+    for name, stats in cache_stats().items():
+        if 'l1_hits' in stats:
+            counts[(name, 'l1_hit')] = stats['l1_hits']
+            counts[(name, 'l2_hit')] = stats['l2_hits']
+        else:
+            counts[(name, 'hit')] = stats['hits']
+        counts[(name, 'miss')] = stats['misses']
+    return counts
+
+metrics.registry.gauge('careerpath_cache_hit_ratio', 'Hit rate of each response cache since start', ('cache',),
+                       lambda: {(name,): stats['hit_rate'] for name, stats in cache_stats().items()})
+metrics.registry.gauge('careerpath_cache_lookups', 'Cache lookups since start by result', ('cache', 'result'),
+                       cache_lookup_counts)
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    if not is_admin():
+        return jsonify({'error': 'Admin key required'}), 403
+    return jsonify({'profiles': request_profiler.summaries(), 'stats': request_profiler.stats()})
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Top functions and allocation sites of a stored profile; ?format=pstats downloads the raw pstats dump"""
+    if not is_admin():
+        return jsonify({'error': 'Admin key required'}), 403
+    record = request_profiler.get(profile_id)
+    if record is None:
+        return jsonify({'error': 'Unknown or expired profile id'}), 404
+    if request.args.get('format') == 'pstats':
+        return Response(record['pstats'], mimetype='application/octet-stream', headers={
+            'Content-Disposition': f'attachment; filename="{profile_id}.pstats"'
+        })
+    return jsonify({key: value for key, value in record.items() if key != 'pstats'})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint; every worker reports its own series"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 # Serve React app
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -597,65 +906,19 @@ def generate_chat_response(message, context):
     if top_role:
         context_info += f"Top career match: {top_role}. "
     
-    # Enhanced conversational prompt based on career type
-    if career_type == 'government':
-        prompt = f"""You are a friendly, knowledgeable AI career advisor specializing in government careers and civil services in India. {context_info}
-        
-        User question: {message}
-        
-        Respond as a conversational mentor who:
-        - Provides detailed, step-by-step guidance
-        - Shares specific resources, books, and study materials
-        - Gives practical exam preparation strategies
-        - Explains career paths in government service
-        - Offers motivation and encouragement
-        - Answers questions about UPSC, SSC, Banking, Railway, Defense, PSU jobs
-        - Provides current affairs guidance and study tips
-        - Explains interview preparation and personality development
-        
-        Be conversational, encouraging, and provide specific actionable advice. Include relevant resources, timelines, and detailed explanations. Keep responses comprehensive but engaging (300-400 words)."""
-        
-    elif career_type == 'nontech':
-        prompt = f"""You are a friendly, experienced AI career advisor for non-technical careers. {context_info}
-        
-        User question: {message}
-        
-        Respond as a conversational mentor who:
-        - Provides detailed industry insights and career paths
-        - Shares specific skills to develop and certifications to pursue
-        - Explains networking strategies and professional development
-        - Offers guidance on transitioning between industries
-        - Discusses salary expectations and growth opportunities
-        - Provides specific resources, courses, and learning paths
-        - Answers questions about business, finance, marketing, HR, healthcare, education, etc.
-        
-        Be conversational, practical, and provide specific actionable advice. Include relevant resources, timelines, and detailed explanations. Keep responses comprehensive but engaging (300-400 words)."""
-        
-    else:
-        prompt = f"""You are a friendly, experienced AI career advisor for technology careers. {context_info}
-        
-        User question: {message}
-        
-        Respond as a conversational mentor who:
-        - Provides detailed technical guidance and learning paths
-        - Shares specific technologies to learn and project ideas
-        - Explains industry trends and emerging technologies
-        - Offers portfolio building and networking strategies
-        - Discusses salary expectations and career progression
-        - Provides specific resources, courses, and coding challenges
-        - Answers questions about software development, data science, AI/ML, cloud, etc.
-        
-        Be conversational, technical but accessible, and provide specific actionable advice. Include relevant resources, project ideas, and detailed explanations. Keep responses comprehensive but engaging (300-400 words)."""
+    # The mentor persona for each career type is a cached system instruction; only the question varies
+    instruction = f"mentor_{career_type}" if f"mentor_{career_type}" in SYSTEM_INSTRUCTIONS else 'mentor_tech'
+    prompt = f"""{context_info}
+
+User question: {message}"""
     
     # Try Gemini API first
     if GEMINI_API_KEY and GEMINI_API_KEY != "your_gemini_api_key_here" and len(GEMINI_API_KEY) > 20:
         try:
-            endpoint = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
             payload = {"contents": [{"parts": [{"text": prompt}]}]}
-            response = requests.post(endpoint, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', "I'm here to help!")
+            data = context_cache.generate_content(payload, instruction, GEMINI_API_KEY,
+                                                  model=gemini_client.GEMINI_CHAT_MODEL, priority='low')
+            return gemini_client.extract_text(data) or "I'm here to help!"
         except Exception as e:
             app.logger.error(f"Gemini API error: {e}")
     
@@ -668,34 +931,7 @@ def generate_chat_response(message, context):
 
 def get_fallback_response(message, career_type='tech'):
     """Enhanced fallback responses based on career type"""
-    message_lower = message.lower()
-    
-    if career_type == 'government':
-        if any(word in message_lower for word in ['exam', 'upsc', 'ssc', 'banking', 'preparation']):
-            return "For government exam preparation, I recommend creating a structured study plan, focusing on current affairs daily, and practicing previous year questions. Which specific exam are you preparing for?"
-        elif any(word in message_lower for word in ['career', 'path', 'job']):
-            return "Government careers offer excellent job security and growth opportunities. Popular options include IAS/IPS through UPSC, banking through IBPS/SBI, and various PSU positions. What area interests you most?"
-        elif any(word in message_lower for word in ['study', 'preparation', 'strategy']):
-            return "Effective government exam preparation requires consistent daily study, current affairs reading, and regular mock tests. Focus on your strengths while gradually improving weak areas."
-    elif career_type == 'nontech':
-        if any(word in message_lower for word in ['career', 'transition', 'change']):
-            return "Non-tech career transitions often involve leveraging transferable skills and gaining industry-specific knowledge. Consider professional certifications and networking within your target industry."
-        elif any(word in message_lower for word in ['skill', 'develop', 'improve']):
-            return "For non-tech careers, focus on developing both hard skills (industry-specific) and soft skills (communication, leadership). Professional certifications can significantly boost your credibility."
-        elif any(word in message_lower for word in ['finance', 'marketing', 'hr', 'consulting']):
-            return "These are excellent non-tech career paths! Each has specific skill requirements and growth trajectories. Would you like detailed guidance for any particular field?"
-    else:  # tech careers
-        if any(word in message_lower for word in ['career', 'path', 'direction']):
-            return "I can help you explore tech career paths! Based on your skills, I can suggest roles that match your background. What specific technology area interests you most?"
-        elif any(word in message_lower for word in ['skill', 'learn', 'develop']):
-            return "For tech careers, I recommend focusing on both technical skills and problem-solving abilities. What specific technologies are you looking to learn?"
-        elif any(word in message_lower for word in ['programming', 'coding', 'development']):
-            return "Programming is a great career path! Popular areas include web development, mobile apps, data science, AI/ML, and cloud computing. What type of development interests you?"
-        elif any(word in message_lower for word in ['data science', 'machine learning', 'ai']):
-            return "Data science and AI are exciting fields! Key skills include Python, statistics, machine learning algorithms, and data visualization. Would you like specific learning recommendations?"
-    
-    # Default response
-    return "I'm here to help with your career journey! I can assist with career advice, skill development, job market insights, exam preparation, and much more. What would you like to explore?"
+    return fallback_intents.respond('basic', message, career_type)
 
 def get_enhanced_fallback_response(prompt_or_message, career_type='tech', context=None):
     """Professional fallback responses with comprehensive career guidance"""
@@ -716,313 +952,196 @@ def get_enhanced_fallback_response(prompt_or_message, career_type='tech', contex
     else:
         message = str(prompt_or_message)
     
-    message_lower = message.lower()
-    skills = context.get('skills', []) if context else []
-    
-    # Handle simple greetings and general conversation
-    greetings = ['hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening']
-    if any(greeting in message_lower for greeting in greetings):
-        return "**Welcome to Your Career Advisory Session**\n\nI'm your professional AI career consultant, equipped with expertise across technology, non-technical, and government sectors. I provide:\n\n• **Personalized Career Guidance** - Tailored advice based on your skills and goals\n• **Industry Insights** - Current market trends and opportunities\n• **Skill Development Plans** - Strategic learning roadmaps\n• **Exam Preparation Support** - Comprehensive preparation strategies\n• **Professional Development** - Career advancement strategies\n\nHow may I assist you with your career objectives today?"
-    
-    # Handle general questions
-    if any(word in message_lower for word in ['how are you', 'what can you do', 'help me']):
-        return "**Professional Career Advisory Services**\n\nI specialize in providing comprehensive career guidance across multiple domains:\n\n**🔧 Technology Careers:**\n• Software development, data science, AI/ML, cloud computing\n• Technical skill assessments and learning roadmaps\n• Industry certifications and project portfolio guidance\n\n**💼 Non-Technical Careers:**\n• Business, finance, marketing, healthcare, education\n• Professional certifications and networking strategies\n• Industry transition and skill development plans\n\n**🏛️ Government & Civil Services:**\n• UPSC, SSC, banking, railway, defense examinations\n• Comprehensive preparation strategies and study materials\n• Career progression in public service\n\nWhat specific career area would you like to explore?"
-    
-    # Government career responses
-    if career_type == 'government':
-        if any(word in message_lower for word in ['upsc', 'civil services', 'ias', 'ips']):
-            return """🎯 **UPSC Civil Services Preparation Guide**
-
-**Phase 1: Foundation (Months 1-6)**
-- **NCERT Books**: Complete 6th to 12th standard NCERTs for all subjects
-- **Current Affairs**: Read The Hindu daily, make notes
-- **Prelims Practice**: Start with previous year papers
-- **CSAT**: Focus on quantitative aptitude and logical reasoning
-
-**Phase 2: Mains Preparation (Months 7-12)**
-- **Optional Subject**: Choose based on your background and interest
-- **Answer Writing**: Practice daily, join test series
-- **Essay Writing**: Practice on diverse topics
-- **Ethics Paper**: Study case studies and examples
-
-**Phase 3: Interview (Months 13-15)**
-- **Mock Interviews**: Join coaching or online platforms
-- **Personality Development**: Work on communication skills
-- **Current Affairs**: Stay updated with recent developments
-
-**📚 Essential Resources:**
-- NCERT Books (6th-12th)
-- The Hindu newspaper
-- Vision IAS current affairs
-- Previous year question papers
-- Test series from coaching institutes
-
-**💡 Pro Tips:**
-- Consistency is key - study 8-10 hours daily
-- Make your own notes
-- Practice answer writing regularly
-- Stay motivated and focused
-
-Would you like specific guidance on any particular exam or subject?"""
-
-        elif any(word in message_lower for word in ['banking', 'sbi', 'ibps', 'po', 'clerk']):
-            return """🏦 **Banking Career Preparation Guide**
-
-**Popular Banking Exams:**
-- **SBI PO/Clerk**: State Bank of India
-- **IBPS PO/Clerk**: Institute of Banking Personnel Selection
-- **RBI Grade B**: Reserve Bank of India
-- **NABARD**: National Bank for Agriculture and Rural Development
-
-**📚 Syllabus & Preparation:**
-1. **Quantitative Aptitude** (40% weightage)
-   - Number systems, percentages, ratios
-   - Data interpretation, time & work
-   - Practice: R.S. Aggarwal, Arun Sharma
-
-2. **English Language** (30% weightage)
-   - Grammar, vocabulary, comprehension
-   - Reading comprehension, cloze test
-   - Practice: Wren & Martin, Norman Lewis
-
-3. **Reasoning Ability** (30% weightage)
-   - Logical reasoning, puzzles
-   - Coding-decoding, blood relations
-   - Practice: R.S. Aggarwal, Kiran's book
-
-4. **General Awareness**
-   - Banking awareness, current affairs
-   - Economic news, RBI policies
-   - Practice: Banking awareness books, newspapers
-
-**⏰ Study Plan:**
-- **Daily**: 6-8 hours of focused study
-- **Weekly**: Take mock tests
-- **Monthly**: Analyze performance and improve weak areas
-
-**📖 Recommended Books:**
-- Quantitative Aptitude: R.S. Aggarwal
-- English: Wren & Martin + Norman Lewis
-- Reasoning: R.S. Aggarwal + Kiran's
-- Banking Awareness: Arihant publications
-
-**💼 Career Growth:**
-- Clerk → Officer → Manager → AGM → DGM
-- Salary: ₹25,000 - ₹80,000+ per month
-- Job security and excellent benefits
-
-Need help with any specific banking exam preparation?"""
-
-        elif any(word in message_lower for word in ['ssc', 'cgl', 'chsl', 'mts']):
-            return """📋 **SSC (Staff Selection Commission) Preparation Guide**
-
-**SSC Exams Overview:**
-- **SSC CGL**: Combined Graduate Level (Officer posts)
-- **SSC CHSL**: Combined Higher Secondary Level (Clerk posts)
-- **SSC MTS**: Multi-Tasking Staff
-- **SSC CPO**: Central Police Organization
-
-**📚 CGL Syllabus & Strategy:**
-1. **General Intelligence & Reasoning** (50 questions)
-   - Analogies, similarities, differences
-   - Spatial visualization, problem solving
-   - Practice: R.S. Aggarwal, Kiran's book
-
-2. **General Awareness** (50 questions)
-   - Current affairs, history, geography
-   - Science, economics, polity
-   - Practice: Lucent GK, newspapers
-
-3. **Quantitative Aptitude** (50 questions)
-   - Arithmetic, algebra, geometry
-   - Trigonometry, statistics
-   - Practice: R.S. Aggarwal, Arun Sharma
-
-4. **English Comprehension** (50 questions)
-   - Grammar, vocabulary, comprehension
-   - One-word substitution, idioms
-   - Practice: Wren & Martin, Norman Lewis
-
-**⏰ Tier 2 Preparation:**
-- **Quantitative Abilities**: Advanced math
-- **English Language**: Essay, précis, letter writing
-- **Statistics**: For Statistical Investigator posts
-- **General Studies**: For Assistant Audit Officer posts
-
-**📖 Essential Resources:**
-- **Books**: R.S. Aggarwal (Math), Lucent GK, Wren & Martin
-- **Online**: SSC official website, mock test platforms
-- **Current Affairs**: The Hindu, Pratiyogita Darpan
-
-**💡 Success Tips:**
-- Solve previous year papers (last 5 years)
-- Take regular mock tests
-- Focus on accuracy over speed initially
-- Make short notes for revision
-
-**🎯 Career Opportunities:**
-- Income Tax Inspector
-- Assistant Audit Officer
-- Statistical Investigator
-- Assistant Section Officer
-- Various ministries and departments
-
-Which SSC exam are you targeting? I can provide specific guidance!"""
-
-        else:
-            return "I'm here to help you with government careers in India! Whether you're interested in civil services (UPSC), banking exams (SBI/IBPS), SSC positions, railway jobs, defense services, or PSU careers, I can provide detailed guidance on exam preparation, study strategies, and career paths. What specific government career or exam interests you?"
-
-    # Non-tech career responses
-    elif career_type == 'nontech':
-        if any(word in message_lower for word in ['business', 'management', 'mba']):
-            return """💼 **Business & Management Career Guide**
-
-**🎓 MBA Preparation & Career Paths:**
-
-**Top MBA Specializations:**
-- **Finance**: Investment banking, corporate finance, financial analysis
-- **Marketing**: Brand management, digital marketing, sales
-- **Operations**: Supply chain, logistics, process improvement
-- **Human Resources**: Talent acquisition, organizational development
-- **Consulting**: Management consulting, strategy consulting
-
-**📚 MBA Entrance Exams:**
-- **CAT**: Common Admission Test (IIMs)
-- **XAT**: Xavier Aptitude Test (XLRI)
-- **SNAP**: Symbiosis National Aptitude Test
-- **MAT**: Management Aptitude Test
-- **CMAT**: Common Management Admission Test
-
-**💡 Career Progression:**
-- **Entry Level**: Management Trainee, Analyst
-- **Mid Level**: Manager, Senior Manager
-- **Senior Level**: Director, VP, C-Suite
-
-**📖 Essential Skills:**
-- Leadership and team management
-- Strategic thinking and problem solving
-- Communication and presentation skills
-- Data analysis and decision making
-- Networking and relationship building
-
-**💰 Salary Expectations:**
-- **Entry Level**: ₹6-12 LPA
-- **Mid Level**: ₹12-25 LPA
-- **Senior Level**: ₹25-50+ LPA
-
-**🎯 Industry Options:**
-- Consulting (McKinsey, BCG, Bain)
-- Banking & Finance (Goldman Sachs, JP Morgan)
-- Technology (Google, Microsoft, Amazon)
-- FMCG (Unilever, P&G, Nestle)
-- Healthcare, Education, Real Estate
-
-**📚 Recommended Resources:**
-- **Books**: How to Crack CAT, Arun Sharma
-- **Online**: Coursera, edX for business courses
-- **Networking**: LinkedIn, industry events
-
-Which business field interests you most? I can provide specific guidance!"""
-
-        elif any(word in message_lower for word in ['marketing', 'digital marketing', 'social media']):
-            return """📱 **Marketing & Digital Marketing Career Guide**
-
-**🎯 Marketing Career Paths:**
-
-**Traditional Marketing:**
-- Brand Management
-- Product Marketing
-- Market Research
-- Advertising & PR
-- Sales & Business Development
-
-**Digital Marketing:**
-- Social Media Marketing
-- SEO/SEM Specialist
-- Content Marketing
-- Email Marketing
-- Performance Marketing
-- Marketing Analytics
-
-**📚 Essential Skills:**
-- **Technical**: Google Analytics, Facebook Ads, SEO tools
-- **Creative**: Content creation, graphic design basics
-- **Analytical**: Data analysis, ROI measurement
-- **Communication**: Copywriting, presentation skills
-
-**🎓 Certifications to Pursue:**
-- **Google**: Google Analytics, Google Ads, Digital Marketing
-- **Facebook**: Facebook Blueprint
-- **HubSpot**: Content Marketing, Inbound Marketing
-- **Hootsuite**: Social Media Marketing
-- **SEMrush**: SEO and SEM
-
-**💼 Career Progression:**
-- **Entry**: Marketing Coordinator, Social Media Manager
-- **Mid**: Marketing Manager, Digital Marketing Manager
-- **Senior**: Marketing Director, CMO
-
-**💰 Salary Ranges:**
-- **Entry Level**: ₹3-6 LPA
-- **Mid Level**: ₹6-15 LPA
-- **Senior Level**: ₹15-30+ LPA
-
-**📖 Learning Resources:**
-- **Courses**: Coursera, Udemy, Google Digital Garage
-- **Books**: "Digital Marketing" by Dave Chaffey
-- **Tools**: Google Analytics, SEMrush, Hootsuite
-- **Practice**: Start your own blog or social media accounts
-
-**🎯 Industry Opportunities:**
-- E-commerce (Amazon, Flipkart)
-- Technology (Google, Facebook, Microsoft)
-- FMCG (Unilever, P&G)
-- Startups and agencies
-- Freelancing and consulting
-
-**💡 Pro Tips:**
-- Build a portfolio with real campaigns
-- Stay updated with latest trends
-- Network with industry professionals
-- Start with free tools and gradually upgrade
-
-Which aspect of marketing interests you most? I can provide detailed guidance!"""
-
-        else:
-            return "I'm here to help you explore non-technical career opportunities! Whether you're interested in business and management, finance, marketing, human resources, healthcare, education, or other traditional industries, I can provide guidance on career paths, required skills, certifications, and growth opportunities. What specific non-tech field interests you?"
-
-    # Tech career responses
-    else:
-        if any(word in message_lower for word in ['web development', 'frontend', 'backend', 'full stack']):
-            return "Web development is a great career choice! You can specialize in frontend (user interfaces), backend (server-side), or full-stack development. Key skills include HTML, CSS, JavaScript, and frameworks like React or Angular. Would you like specific guidance on any particular area of web development?"
-
-        elif any(word in message_lower for word in ['data science', 'machine learning', 'ai', 'analytics']):
-            return "Data science and AI are exciting fields! Career paths include Data Analyst, Data Scientist, ML Engineer, and AI Research Scientist. Key skills include Python, statistics, machine learning, and SQL. The field offers excellent growth opportunities with salaries ranging from 4-50+ LPA. Would you like specific guidance on any particular area?"
-        else:
-            return "I can help you explore various tech career paths including web development, data science, mobile development, cloud computing, cybersecurity, and more. What specific technology area interests you most?"
-
-    return "I'm here to help with your career journey! Ask me about career paths, skill development, exam preparation, or industry insights. What would you like to know?"
+    # Greetings and general questions apply to every career type; the rest are per type (data/fallback_intents.json)
+    return fallback_intents.respond('enhanced', message, career_type)
 
 @app.route('/api/resume/analyze', methods=['POST'])
 def analyze_resume():
     """API endpoint for comprehensive resume analysis"""
+    # Outside the try so an oversized body still answers 413
+    data = request.get_json(silent=True) or {}
     try:
-        data = request.json
         resume_text = data.get('text', '')
         career_type = data.get('careerType', 'tech')
         
         if not resume_text:
             return jsonify({'error': 'No resume text provided'}), 400
         
-        # Perform deep holistic analysis
-        analysis_result = perform_deep_resume_analysis(resume_text, career_type)
-        
-        return jsonify(analysis_result)
+        return jsonify(analyze_resume_text(resume_text, career_type, data.get('profileId')))
         
     except Exception as e:
         app.logger.error(f"Resume analysis error: {e}")
         return jsonify({'error': 'Failed to analyze resume'}), 500
 
+@app.route('/api/resume/upload', methods=['POST'])
+def upload_resume():
+    """Multipart resume upload (field 'file': PDF, DOCX or TXT) - extracts the text and analyzes it"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No resume file provided'}), 400
+    career_type = request.form.get('careerType', 'tech')
+
+    try:
+        resume_text = resume_extractor.extract(upload.stream, upload.filename)
+    except ExtractionError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    try:
+        analysis_result = analyze_resume_text(resume_text, career_type, request.form.get('profileId'))
+    except Exception as e:
+        app.logger.error(f"Resume analysis error: {e}")
+        return jsonify({'error': 'Failed to analyze resume'}), 500
+    # The analysis may be the cached entry shared with other requests; add the upload fields to a copy
+    analysis_result = dict(analysis_result, fileName=upload.filename, extractedChars=len(resume_text))
+    return jsonify(analysis_result)
+
+def analyze_resume_text(resume_text, career_type, profile_id=None):
+    """Analysis for a resume's text, reusing the stored analysis of an identical or near-duplicate resume"""
+    # The exact same text was analyzed recently (by this or another worker)
+    with stage('cache'):
+        cache_key = resume_analysis_cache.make_key(resume_text, career_type)
+        cached = resume_analysis_cache.get(cache_key)
+    if cached is not None:
+        analysis_result = dict(cached)
+        analysis_result['duplicateOf'] = {'resumeId': cached['resumeId'], 'similarity': 1.0}
+        if profile_id:
+            store_analyzed_profile(profile_id, analysis_result, career_type)
+        return analysis_result
+
+    # Reuse the analysis of a near-duplicate resume (copy-pasted / template) if we have one
+    with stage('dedup'):
+        # Computed once; add() below reuses it for a new resume
+        signature = resume_signature(resume_text)
+        duplicate = resume_index.find_duplicate(resume_text, career_type, signature=signature)
+    if duplicate:
+        analysis_result = duplicate['analysis']
+        analysis_result['resumeId'] = duplicate['resumeId']
+        analysis_result['duplicateOf'] = {
+            'resumeId': duplicate['resumeId'],
+            'similarity': duplicate['similarity']
+        }
+        # A template resume submitted under a new profile still counts as that candidate
+        if profile_id:
+            store_analyzed_profile(profile_id, analysis_result, career_type)
+        return analysis_result
+    
+    # Perform deep holistic analysis
+    with stage('analysis'):
+        analysis_result = perform_deep_resume_analysis(resume_text, career_type)
+    with stage('store'):
+        analysis_result['resumeId'] = resume_index.add(resume_text, career_type, analysis_result, signature)
+        store_analyzed_profile(profile_id or analysis_result['resumeId'], analysis_result, career_type)
+        # A copy, so callers may add fields to the result they get back
+        resume_analysis_cache.set(cache_key, dict(analysis_result))
+    return analysis_result
+
+@app.route('/api/resume/batch', methods=['POST'])
+def batch_analyze_resumes():
+    """Analyze many resumes sent as NDJSON (one {"text", "careerType", "profileId"} object per line) or a JSON array.
+
+    Records are parsed and analyzed one at a time and every result is streamed
+    back as its own NDJSON line, so memory stays bounded by the largest single
+    resume instead of the whole batch.
+    """
+    default_career_type = request.args.get('careerType', 'tech')
+    records = iter_records(request.stream, request.mimetype)
+
+    def generate():
+        analyzed = failed = 0
+        try:
+            for index, record in enumerate(records):
+                if index >= RESUME_BATCH_MAX_ITEMS:
+                    yield json.dumps({'index': index, 'error': f'Batches are limited to {RESUME_BATCH_MAX_ITEMS} resumes'}) + '\n'
+                    break
+                resume_text = record.get('text', '') if isinstance(record, dict) else ''
+                if not resume_text:
+                    failed += 1
+                    yield json.dumps({'index': index, 'error': 'No resume text provided'}) + '\n'
+                    continue
+                try:
+                    analysis_result = analyze_resume_text(
+                        resume_text, record.get('careerType', default_career_type), record.get('profileId'))
+                except Exception as e:
+                    app.logger.error(f"Batch resume analysis error (record {index}): {e}")
+                    failed += 1
+                    yield json.dumps({'index': index, 'error': 'Failed to analyze resume'}) + '\n'
+                    continue
+                analyzed += 1
+                yield json.dumps({'index': index, 'analysis': analysis_result}) + '\n'
+        except HTTPException as e:
+            # Malformed or oversized record: report it and stop reading the body
+            yield json.dumps({'error': e.description, 'status': e.code}) + '\n'
+        yield json.dumps({'done': True, 'analyzed': analyzed, 'failed': failed}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/resume/similar', methods=['POST'])
+def find_similar_resumes():
+    """Find stored resumes that are near-duplicates of the given text"""
+    try:
+        data = request.json
+        resume_text = data.get('text', '')
+        if not resume_text:
+            return jsonify({'error': 'No resume text provided'}), 400
+        
+        threshold = float(data.get('threshold', SIMILAR_THRESHOLD))
+        limit = min(int(data.get('limit', 10)), 100)
+        matches = resume_index.find_similar(resume_text, threshold=threshold, limit=limit,
+                                            career_type=data.get('careerType'))
+        
+        return jsonify({'matches': matches, 'count': len(matches)})
+        
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid threshold or limit'}), 400
+    except Exception as e:
+        app.logger.error(f"Similar resume lookup error: {e}")
+        return jsonify({'error': 'Failed to search resumes'}), 500
+
+def store_analyzed_profile(profile_id, analysis_result, career_type):
+    """Persist an analyzed profile so recruiters can reverse-match it against roles"""
+    try:
+        save_profile(
+            profile_id,
+            [canonical_skill(skill) for skill in analysis_result.get('skills', [])],
+            analysis_result.get('experienceLevel'),
+            analysis_result.get('profileStrength', {}).get('score', 0),
+            career_type
+        )
+    except Exception as e:
+        app.logger.error(f"Failed to store profile {profile_id}: {e}")
+
+@app.route('/api/roles/<title>/candidates', methods=['GET'])
+def role_candidates(title):
+    """Top-N stored profiles for a role, ranked by weighted skill overlap"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 500))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    if not role_catalog.loaded:
+        init_role_catalog()
+    role = role_catalog.by_title(title)
+    if not role:
+        return jsonify({'error': f'Role "{title}" not found'}), 404
+
+    entry = role_catalog.entry(role)
+    weighted_skills = {}
+    for skill_id, weight, _ in entry['skills']:
+        weighted_skills[skill_id] = weighted_skills.get(skill_id, 0) + weight
+
+    try:
+        # Only profiles analyzed for one of the role's career tracks are ranked
+        candidates = find_candidates(weighted_skills, limit=limit, career_types=sorted(entry['career_types']))
+    except Exception as e:
+        app.logger.error(f"Candidate lookup failed for {title}: {e}")
+        return jsonify({'error': 'Failed to find candidates'}), 500
+
+    return jsonify({
+        'role': role.get('title'),
+        'candidates': candidates,
+        'count': len(candidates)
+    })
+
 def perform_deep_resume_analysis(resume_text, career_type):
     """Perform comprehensive holistic resume analysis"""
     
@@ -1212,6 +1331,24 @@ def extract_work_experience_from_resume(text):
     
     return list(set(work_experience))[:3]
 
+@app.route('/api/resources', methods=['GET'])
+def get_resources():
+    """Learning resources for ?skill= (exact, alias, prefix or fuzzy match)"""
+    skill = request.args.get('skill', '').strip()
+    if not skill:
+        return jsonify({'error': 'Missing skill parameter'}), 400
+    if not resource_catalog.loaded:
+        init_resource_catalog()
+    entry, match = resource_catalog.lookup(skill)
+    if entry is None:
+        return jsonify({'query': skill, 'match': None, 'skill': None, 'resources': resources_for_skill(skill)})
+    return jsonify({
+        'query': skill,
+        'match': match,
+        'skill': {'id': entry['id'], 'name': entry['name'], 'curated': entry['curated']},
+        'resources': entry['resources']
+    })
+
 @app.route('/api/add_role', methods=['POST'])
 def handle_add_role():
     role_data = request.json
@@ -1219,6 +1356,9 @@ def handle_add_role():
         return jsonify({'error': 'Invalid role data'}), 400
     try:
         add_role(role_data)
+        resource_catalog.add_role_skills(role_data)
+        role_catalog.invalidate()
+        analyze_cache.clear()
         return jsonify({'message': 'Role added successfully'}), 201
     except Exception as e:
         app.logger.error(f"Failed to add role: {e}")
@@ -1237,6 +1377,9 @@ if __name__ == '__main__':
         init_db()
     except Exception as e:
         app.logger.error(f"Database init raised: {e}")
+    init_resource_catalog()
+    init_role_catalog()
+    init_knowledge_base()
 
-    print('Starting Flask app on http://localhost:5000/', flush=True)
+    app.logger.info('Starting Flask app on http://localhost:5000/')
     app.run(host='localhost', port=5000, debug=True)
\ No newline at end of file
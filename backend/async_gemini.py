@@ -0,0 +1,144 @@
+"""
+Asyncio front end for Gemini calls - global concurrency limit and single-flight coalescing of identical prompts
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import functools
+import threading
+import concurrent.futures
+
+import gemini_client
+from gemini_context import context_cache
+
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+WAIT_TIMEOUT = float(os.getenv("GEMINI_WAIT_TIMEOUT", "45"))
+CANCEL_POLL_INTERVAL = 0.25
+
+
+class RequestCancelled(Exception):
+    """The caller went away (e.g. the browser disconnected) before Gemini answered"""
+
+
+class AsyncGeminiClient:
+    """Runs Gemini calls on a private event loop thread.
+
+    Identical (model, payload) requests that overlap in time share one
+    upstream call: the first caller starts it, later callers wait on the
+    same task. A waiter that is cancelled only detaches itself; the shared
+    call is cancelled once nobody is waiting for it, so queued calls behind
+    the concurrency limit never reach Gemini. The HTTP request itself runs
+    on the pooled session from gemini_client, so retries and keep-alive
+    are unchanged.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'upstream_calls': 0, 'coalesced': 0, 'cancelled': 0}
+
+    def _ensure_loop(self):
+        pid = os.getpid()
+        if self._loop is None or self._pid != pid:
+            with self._start_lock:
+                if self._loop is None or self._pid != pid:
+                    loop = asyncio.new_event_loop()
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix='gemini')
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    self._inflight = {}
+                    self._waiters = {}
+                    threading.Thread(target=loop.run_forever, name='gemini-loop', daemon=True).start()
+                    self._loop, self._pid = loop, pid
+        return self._loop
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['in_flight'] = len(self._inflight) if self._loop else 0
+        stats['max_concurrency'] = self.max_concurrency
+        return stats
+
+    @staticmethod
+    def request_key(model, payload, instruction=None):
+        return hashlib.sha256(json.dumps([model, instruction, payload], sort_keys=True).encode('utf-8')).hexdigest()
+
+    async def _fetch(self, payload, api_key, model, timeout, priority, instruction):
+        if instruction:
+            call = functools.partial(context_cache.generate_content, payload, instruction, api_key, model, timeout,
+                                     priority)
+        else:
+            call = functools.partial(gemini_client.generate_content, payload, api_key, model, timeout, priority)
+        async with self._semaphore:
+            self._count('upstream_calls')
+            return await self._loop.run_in_executor(self._executor, call)
+
+    async def _join(self, key, payload, api_key, model, timeout, priority, instruction):
+        task = self._inflight.get(key)
+        if task is None:
+            # The first caller's priority decides how long the shared call may queue for quota
+            task = self._loop.create_task(self._fetch(payload, api_key, model, timeout, priority, instruction))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self._count('coalesced')
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.pop(task) - 1
+            if remaining:
+                self._waiters[task] = remaining
+            elif not task.done():
+                self._count('cancelled')
+                task.cancel()
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def generate_content_async(self, payload, api_key, model=gemini_client.GEMINI_MODEL, timeout=None,
+                                     priority='normal', instruction=None):
+        """Coroutine API for callers already running on this client's loop"""
+        self._count('requests')
+        key = self.request_key(model, payload, instruction)
+        return await self._join(key, payload, api_key, model, timeout, priority, instruction)
+
+    def generate_content(self, payload, api_key, model=gemini_client.GEMINI_MODEL, timeout=None,
+                         priority='normal', cancelled=None, wait_timeout=WAIT_TIMEOUT, instruction=None):
+        """Blocking API for request threads.
+
+        instruction names a static system instruction from gemini_context,
+        sent by cached-content handle when possible. cancelled is an optional
+        callable polled while waiting; when it returns True the wait is
+        abandoned and RequestCancelled is raised.
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self.generate_content_async(payload, api_key, model, timeout, priority, instruction), loop)
+
+        deadline = time.monotonic() + wait_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                return future.result(timeout=min(remaining, CANCEL_POLL_INTERVAL) if cancelled else remaining)
+            except concurrent.futures.TimeoutError:
+                if cancelled and cancelled():
+                    future.cancel()
+                    raise RequestCancelled('Client disconnected while waiting for Gemini')
+                if time.monotonic() >= deadline:
+                    future.cancel()
+                    raise TimeoutError(f'Gemini did not answer within {wait_timeout}s')
+
+
+async_gemini = AsyncGeminiClient()
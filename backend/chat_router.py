@@ -0,0 +1,134 @@
+"""
+Local intent router for /api/chat - answers small talk with the deterministic engine, FAQs from the knowledge base
+and sends the rest to Gemini
+"""
+import os
+import re
+import threading
+from collections import deque
+
+ROUTER_ENABLED = os.getenv("CHAT_ROUTER", "1").lower() not in ("0", "false", "no")
+# Share of the message's meaningful words an intent must explain before we answer locally
+CONFIDENCE_THRESHOLD = float(os.getenv("CHAT_ROUTER_THRESHOLD", "0.6"))
+# Anything longer is a real question even if it opens with "hi"
+MAX_LOCAL_WORDS = int(os.getenv("CHAT_ROUTER_MAX_WORDS", "10"))
+# Cosine similarity (before the career type boost) above which a short question is answered as an FAQ;
+# open questions like "what is docker" or "java or python" score below 0.3 against the guides
+FAQ_THRESHOLD = float(os.getenv("CHAT_ROUTER_FAQ_THRESHOLD", "0.4"))
+# Knowledge base passages curated as answers; role and resource passages only back offline answers
+FAQ_SOURCES = ('guide',)
+
+# Intents the local engine answers as well as Gemini would
+LOCAL_INTENTS = {
+    'greeting': [r'hi+', r'hello+', r'hey+', r'hiya', r'greetings', r'good (?:morning|afternoon|evening)', r'namaste'],
+    'identity': [r'who are you', r'what are you', r"what(?:'s| is) your name", r'are you (?:a )?(?:bot|human|ai)'],
+    'joke': [r'(?:tell|say) (?:me )?(?:a |another )?joke', r'jokes?', r'something funny', r'make me laugh'],
+    'thanks': [r'thanks?(?: you)?(?: so much| a lot)?', r'thx', r'ty', r'cheers', r'appreciate it'],
+    'goodbye': [r'bye', r'goodbye', r'see (?:you|ya)(?: later)?', r'good night', r'take care'],
+    'capabilities': [r'what can you do', r'how can you help(?: me)?', r'what do you do', r'help'],
+}
+
+# Words that carry no intent of their own and are ignored when scoring coverage
+FILLER_WORDS = {
+    'a', 'an', 'the', 'so', 'ok', 'okay', 'oh', 'well', 'please', 'pls', 'there', 'again', 'very', 'much',
+    'buddy', 'friend', 'bot', 'ai', 'careerpath', 'and', 'um', 'hmm', 'yo', 'me'
+}
+
+_WORD = re.compile(r"[a-z']+")
+
+
+def _compile(patterns):
+    return re.compile(r'\b(?:' + '|'.join(patterns) + r')\b')
+
+
+class ChatRouter:
+    """Keyword-pattern intent classifier with routing metrics.
+
+    Confidence is the share of meaningful words in the message covered by
+    the best intent's patterns, so "hi" scores 1.0 while "hi, how do I
+    become a data engineer" scores low. Short messages that are not small
+    talk can still be answered locally when the FAQ lookup (the knowledge
+    base) finds a close enough passage; everything else goes to the LLM.
+    """
+
+    def __init__(self, intents=LOCAL_INTENTS, threshold=CONFIDENCE_THRESHOLD, max_words=MAX_LOCAL_WORDS,
+                 faq_threshold=FAQ_THRESHOLD, enabled=ROUTER_ENABLED):
+        self.threshold = threshold
+        self.max_words = max_words
+        self.faq_threshold = faq_threshold
+        self.enabled = enabled
+        self._patterns = {intent: _compile(patterns) for intent, patterns in intents.items()}
+        self._lock = threading.Lock()
+        self._routes = {'local': 0, 'faq': 0, 'llm': 0}
+        self._intents = {intent: 0 for intent in intents}
+        self._latencies = {route: deque(maxlen=500) for route in self._routes}
+
+    def _words(self, text):
+        return [w for w in _WORD.findall(text) if w not in FILLER_WORDS]
+
+    def classify(self, message):
+        """Return (intent, confidence) for the best local intent, or (None, 0.0)"""
+        text = (message or '').lower()
+        words = self._words(text)
+        if not words or len(words) > self.max_words:
+            return None, 0.0
+
+        best, best_score = None, 0.0
+        for intent, pattern in self._patterns.items():
+            # Filler inside a match ("thank you so much") is not in the denominator either
+            covered = sum(len(self._words(m.group(0))) for m in pattern.finditer(text))
+            if not covered:
+                continue
+            score = min(1.0, covered / len(words))
+            if score > best_score:
+                best, best_score = intent, score
+        return best, round(best_score, 2)
+
+    def route(self, message, faq=None):
+        """Return (route, intent, confidence, answer) where route is 'local', 'faq' or 'llm'.
+
+        `faq(message)` returns (score, answer) from the knowledge base; it is
+        only asked for short messages that are not small talk, and `answer`
+        is set only for the 'faq' route.
+        """
+        intent, confidence = self.classify(message) if self.enabled else (None, 0.0)
+        route, answer = 'llm', None
+        if intent and confidence >= self.threshold:
+            route = 'local'
+        elif faq is not None and self.enabled and 0 < len(self._words((message or '').lower())) <= self.max_words:
+            score, answer = faq(message)
+            if answer and score >= self.faq_threshold:
+                route, intent, confidence = 'faq', None, round(score, 2)
+            else:
+                answer = None
+        with self._lock:
+            self._routes[route] += 1
+            if route == 'local':
+                self._intents[intent] += 1
+        return route, intent, confidence, answer
+
+    def record_latency(self, route, seconds):
+        with self._lock:
+            self._latencies[route].append(seconds)
+
+    def stats(self):
+        with self._lock:
+            routes = dict(self._routes)
+            intents = dict(self._intents)
+            latencies = {route: sorted(values) for route, values in self._latencies.items()}
+        total = sum(routes.values())
+        return {
+            'enabled': self.enabled,
+            'threshold': self.threshold,
+            'faq_threshold': self.faq_threshold,
+            'routes': routes,
+            'local_share': round((routes['local'] + routes['faq']) / total, 3) if total else 0.0,
+            'intents': intents,
+            'median_latency_ms': {
+                route: round(values[len(values) // 2] * 1000, 1) if values else None
+                for route, values in latencies.items()
+            }
+        }
+
+
+chat_router = ChatRouter()
@@ -0,0 +1,127 @@
+"""
+Circuit breaker with adaptive timeouts for upstream API calls
+"""
+import time
+import threading
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Failures and latency breaches (successful calls slower than
+    latency_threshold) both count towards failure_threshold. Once open, calls
+    fail fast for reset_timeout seconds, after which up to half_open_probes
+    calls are let through; a successful probe closes the circuit, a failed
+    one re-opens it.
+
+    Successful call latencies are kept in a sliding window and used to derive
+    an adaptive read timeout from the recent p95.
+    """
+
+    def __init__(self, name, failure_threshold=5, latency_threshold=10.0, reset_timeout=30.0,
+                 half_open_probes=1, window=100, min_samples=20, timeout_multiplier=2.0,
+                 min_timeout=5.0, max_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.min_samples = min_samples
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._stats = {'calls': 0, 'failures': 0, 'latency_breaches': 0, 'rejected': 0, 'opened': 0}
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def before_call(self):
+        """Reserve a call slot or raise CircuitOpenError"""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._probes_in_flight >= self.half_open_probes):
+                self._stats['rejected'] += 1
+                raise CircuitOpenError(f'{self.name} circuit is {state}; failing fast')
+            if state == HALF_OPEN:
+                self._probes_in_flight += 1
+            self._stats['calls'] += 1
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._stats['opened'] += 1
+
+    def record_success(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            if self.latency_threshold and latency > self.latency_threshold:
+                self._stats['latency_breaches'] += 1
+                self._register_failure()
+                return
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probes_in_flight = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._stats['failures'] += 1
+            self._register_failure()
+
+    def _register_failure(self):
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._trip()
+
+    def _p95(self):
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def adaptive_timeout(self):
+        """Read timeout derived from recent p95 latency, clamped to [min_timeout, max_timeout]"""
+        with self._lock:
+            p95 = self._p95()
+        if p95 is None:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_multiplier))
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def snapshot(self):
+        with self._lock:
+            state = self._current_state()
+            p95 = self._p95()
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'state': state,
+                'consecutive_failures': self._failures,
+                'p95_latency': round(p95, 3) if p95 is not None else None,
+                'retry_in': round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1) if state == OPEN else 0
+            })
+        snapshot['adaptive_timeout'] = round(self.adaptive_timeout(), 2)
+        return snapshot
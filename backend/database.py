@@ -1,9 +1,12 @@
 import os
 import json
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS")
@@ -48,7 +51,7 @@ def _write_roles_to_file(roles):
 def init_db():
     # Attempt to initialize Postgres; if unavailable, skip and rely on JSON file
     if not _HAS_PG:
-        print('psycopg2 not installed; skipping DB init and using JSON fallback.')
+        logger.warning('psycopg2 not installed; skipping DB init and using JSON fallback.')
         return
     try:
         conn = _get_db_connection()
@@ -67,18 +70,18 @@ def init_db():
         if cursor.fetchone()[0] == 0:
             roles_data = _load_roles_from_file()
             if roles_data:
-                print('Populating database with initial data...')
+                logger.info('Populating database with initial data...')
                 for role in roles_data:
                     try:
                         add_role(role)
                     except Exception as e:
-                        print(f'Failed to add role {role.get("title")} to DB: {e}')
-                print('Database population complete.')
+                        logger.error(f'Failed to add role {role.get("title")} to DB: {e}')
+                logger.info('Database population complete.')
 
         cursor.close()
         conn.close()
     except Exception as e:
-        print(f'Postgres init failed, falling back to JSON file. Error: {e}')
+        logger.warning(f'Postgres init failed, falling back to JSON file. Error: {e}')
 
 def get_roles(interest=None):
     # Try DB first; on any failure, return roles from JSON file
@@ -102,7 +105,7 @@ def get_roles(interest=None):
                 roles.append(role_data)
             return roles
         except Exception as e:
-            print(f'Postgres read failed, using JSON fallback. Error: {e}')
+            logger.warning(f'Postgres read failed, using JSON fallback. Error: {e}')
 
     # JSON fallback
     roles = _load_roles_from_file()
@@ -125,7 +128,7 @@ def add_role(role_data):
             conn.close()
             return
         except Exception as e:
-            print(f'Postgres insert failed, falling back to JSON file. Error: {e}')
+            logger.warning(f'Postgres insert failed, falling back to JSON file. Error: {e}')
 
     # JSON append fallback
     roles = _load_roles_from_file() or []
@@ -0,0 +1,180 @@
+"""
+Shared Gemini HTTP client - one pooled keep-alive session per worker with split timeouts and jittered retries
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import CircuitBreaker
+from metrics import gemini_responses
+from rate_limiter import gemini_limiter, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta").rstrip('/')
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+GEMINI_CHAT_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini-1.5-flash")
+
+# Connection pool size is per worker process
+POOL_SIZE = int(os.getenv("GEMINI_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "30"))
+
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "8"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Shared by every Gemini call site in this worker
+gemini_breaker = CircuitBreaker(
+    'gemini',
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+    latency_threshold=float(os.getenv("GEMINI_BREAKER_LATENCY", "10")),
+    reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET", "30")),
+    min_timeout=float(os.getenv("GEMINI_ADAPTIVE_MIN_TIMEOUT", "5")),
+    max_timeout=READ_TIMEOUT
+)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use (and again after a fork)"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'Connection': 'keep-alive'})
+                _session, _session_pid = session, pid
+    return _session
+
+
+def _backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(BACKOFF_MAX, float(retry_after))
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def post(path, payload, api_key, timeout=None, stream=False, params=None):
+    """POST to a Gemini API path, retrying connection errors, 429 and 5xx responses.
+
+    Read timeouts are not retried - the request may still be running upstream
+    and a retry would only double the wait. Unless a timeout is given, the read
+    timeout adapts to recent p95 latency. Raises requests exceptions (or
+    CircuitOpenError) on failure.
+    """
+    url = f"{GEMINI_API_BASE}/{path}"
+    params = dict(params or {}, key=api_key)
+    timeout = timeout or (CONNECT_TIMEOUT, gemini_breaker.adaptive_timeout())
+    session = get_session()
+
+    for attempt in range(MAX_RETRIES + 1):
+        # Raises CircuitOpenError while Gemini is known to be down, so callers fall back immediately
+        gemini_breaker.before_call()
+        started = time.monotonic()
+        try:
+            response = session.post(url, params=params, json=payload, timeout=timeout, stream=stream)
+        except requests.exceptions.RequestException as e:
+            gemini_breaker.record_failure()
+            gemini_responses.inc('timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection_error')
+            if not isinstance(e, requests.exceptions.ConnectionError) or attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt)
+            logger.warning(f"Gemini connection error ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+            continue
+
+        gemini_responses.inc(str(response.status_code))
+        if response.status_code in RETRY_STATUSES:
+            gemini_breaker.record_failure()
+            if attempt < MAX_RETRIES:
+                delay = _backoff_delay(attempt, response)
+                logger.warning(f"Gemini returned {response.status_code}; retrying in {delay:.2f}s")
+                response.close()
+                time.sleep(delay)
+                continue
+        else:
+            gemini_breaker.record_success(time.monotonic() - started)
+
+        response.raise_for_status()
+        return response
+
+
+def estimate_payload_tokens(payload):
+    """Estimated input + output tokens of a generateContent payload, for the rate limiter"""
+    contents = payload.get('contents', []) + [payload.get('systemInstruction', {})]
+    text = ''.join(
+        part.get('text', '')
+        for content in contents
+        for part in content.get('parts', [])
+    )
+    return estimate_tokens(text) + payload.get('generationConfig', {}).get('maxOutputTokens', 256)
+
+
+def generate_content(payload, api_key, model=GEMINI_MODEL, timeout=None, priority='normal'):
+    """Call models/<model>:generateContent and return the decoded JSON body.
+
+    Draws from the shared quota buckets first; raises RateLimitExceeded if
+    the caller's priority cannot get quota within its bounded wait.
+    """
+    estimated = estimate_payload_tokens(payload)
+    gemini_limiter.acquire(estimated, priority)
+    response = post(f"models/{model}:generateContent", payload, api_key, timeout=timeout)
+    data = response.json()
+    actual = data.get('usageMetadata', {}).get('totalTokenCount')
+    if actual:
+        gemini_limiter.reconcile(estimated, actual)
+    return data
+
+
+def stream_generate_content(payload, api_key, model=GEMINI_MODEL, timeout=None, priority='normal'):
+    """Call models/<model>:streamGenerateContent over SSE and yield text chunks as they arrive.
+
+    Closing the generator (e.g. when the browser disconnects) closes the
+    upstream response so Gemini stops generating for us.
+    """
+    gemini_limiter.acquire(estimate_payload_tokens(payload), priority)
+    response = post(f"models/{model}:streamGenerateContent", payload, api_key,
+                    timeout=timeout, stream=True, params={'alt': 'sse'})
+    # SSE is UTF-8 by definition; without a charset in Content-Type requests would decode as ISO-8859-1
+    response.encoding = 'utf-8'
+    try:
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            try:
+                data = json.loads(line[5:].strip())
+            except ValueError:
+                continue
+            text = extract_text(data)
+            if text:
+                yield text
+    finally:
+        response.close()
+
+
+def extract_text(data):
+    """First candidate's text from a generateContent response, or None"""
+    candidates = data.get('candidates') or []
+    if not candidates:
+        return None
+    parts = candidates[0].get('content', {}).get('parts', [])
+    if not parts:
+        return None
+    return parts[0].get('text')
@@ -0,0 +1,252 @@
+"""
+Static system instructions for Gemini, registered once per model as cached content and referenced by handle
+"""
+import os
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import requests
+
+import gemini_client
+from circuit_breaker import CircuitOpenError
+from prompt_builder import RESPONSE_GUIDELINES
+from rate_limiter import estimate_tokens
+from shared_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(__file__)
+_CONTEXT_DB = os.getenv("GEMINI_CONTEXT_DB", os.path.join(_ROOT, 'data', 'gemini_context.db'))
+
+CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "1").lower() not in ("0", "false", "no")
+CONTEXT_TTL = int(os.getenv("GEMINI_CONTEXT_TTL", "3600"))
+# Re-register this many seconds (at most a tenth of the handle's lifetime) before it expires
+REFRESH_MARGIN = 60
+# After a failed registration (e.g. model without caching support) send instructions inline for a while
+RETRY_AFTER = int(os.getenv("GEMINI_CONTEXT_RETRY_AFTER", "600"))
+# Gemini refuses to cache content below a per-model minimum (see min_cache_tokens); smaller
+# instructions always travel inline without a registration attempt. Setting GEMINI_CONTEXT_MIN_TOKENS
+# replaces the per-model table, e.g. 0 to register every instruction with gemini_stub.py.
+MIN_CACHE_TOKENS = os.getenv("GEMINI_CONTEXT_MIN_TOKENS")
+# generateContent answers with one of these when a handle expired, was deleted or is not ours
+STALE_STATUSES = {403, 404}
+
+_MENTOR_BASE = """Respond as a conversational mentor. Be encouraging and give specific, actionable advice with relevant resources, timelines and detailed explanations. Keep responses comprehensive but engaging (300-400 words)."""
+
+SYSTEM_INSTRUCTIONS = {
+    'advice': f"""You are an expert career coach. The user message contains a profile matched with a top career goal. Provide personalized, actionable advice as a concise, structured advisory report with these sections:
+1.  **Analysis:** A brief opening statement confirming the user's profile and goal.
+2.  **Leverage Your Strengths:** How 2-3 of the most relevant CURRENT skills help in the target role and how to highlight them.
+3.  **Bridge Your Skill Gaps:** A step-by-step plan for the most critical gaps, with a type of learning resource for each (e.g. an interactive course, a hands-on project).
+4.  **Actionable Next Steps:** 3-4 bullet points for the next 30 days.
+
+{RESPONSE_GUIDELINES}""",
+    'chat': f"""You are CareerPath AI, a friendly, conversational assistant with special expertise in career counseling. Reply naturally to the user's latest message, using the user context only if the question is career related. Answer general questions (jokes, facts) directly; do not force career advice into every response.
+
+{RESPONSE_GUIDELINES}""",
+    'mentor_government': f"""You are a friendly, knowledgeable AI career advisor specializing in government careers and civil services in India. {_MENTOR_BASE} Cover step-by-step exam preparation strategies, books and study materials, UPSC, SSC, Banking, Railway, Defense and PSU career paths, current affairs and interview preparation.""",
+    'mentor_nontech': f"""You are a friendly, experienced AI career advisor for non-technical careers. {_MENTOR_BASE} Cover industry insights and career paths, skills and certifications, networking, transitions between industries, salary expectations, and business, finance, marketing, HR, healthcare and education roles.""",
+    'mentor_tech': f"""You are a friendly, experienced AI career advisor for technology careers. {_MENTOR_BASE} Stay technical but accessible: cover learning paths, technologies and project ideas, industry trends, portfolio building, salary expectations, and software development, data science, AI/ML and cloud roles.""",
+}
+
+
+def min_cache_tokens(model):
+    """Smallest instruction, in tokens, that Gemini will cache for a model"""
+    if MIN_CACHE_TOKENS:
+        return int(MIN_CACHE_TOKENS)
+    if '1.5' in model:
+        return 32768
+    return 4096 if 'pro' in model else 1024
+
+
+def _parse_expire_time(value, default):
+    """Epoch seconds for an RFC 3339 expireTime such as 2024-05-01T12:00:00.123456Z"""
+    try:
+        return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+class ContextCache:
+    """Maps (instruction, model) to a cachedContents handle.
+
+    Handles are registered lazily, shared with other workers through SQLite
+    and re-registered shortly before they expire. Only instructions of at
+    least min_tokens (by default the model's minimum) are registered;
+    whenever no handle can be had the instruction travels inline as
+    systemInstruction, so callers always get an equivalent request.
+    """
+
+    def __init__(self, path=_CONTEXT_DB, enabled=CONTEXT_CACHE_ENABLED, ttl=CONTEXT_TTL,
+                 min_tokens=None):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.store = DiskCache(path, table='cached_contents')
+        self._handles = {}
+        self._unsupported = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'registered': 0, 'reused': 0, 'inline': 0, 'refreshed': 0, 'stale': 0, 'failed': 0}
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    @staticmethod
+    def _key(name, model):
+        return f'{name}:{model}'
+
+    def _register(self, name, model, api_key):
+        body = {
+            'model': f'models/{model}',
+            'displayName': f'careerpath-{name}',
+            'systemInstruction': {'parts': [{'text': SYSTEM_INSTRUCTIONS[name]}]},
+            'ttl': f'{self.ttl}s'
+        }
+        data = gemini_client.post('cachedContents', body, api_key).json()
+        now = time.time()
+        expires = _parse_expire_time(data.get('expireTime'), now + self.ttl)
+        refresh_at = expires - min(REFRESH_MARGIN, (expires - now) / 10)
+        return {'handle': data['name'], 'expires': expires, 'refresh_at': refresh_at}
+
+    def handle_for(self, name, model, api_key):
+        """Cached-content handle for an instruction, or None if it has to be sent inline"""
+        if not self.enabled or not api_key:
+            return None
+        min_tokens = self.min_tokens if self.min_tokens is not None else min_cache_tokens(model)
+        if estimate_tokens(SYSTEM_INSTRUCTIONS[name]) < min_tokens:
+            return None
+        key = self._key(name, model)
+        now = time.time()
+        if self._unsupported.get(model, 0) > now:
+            return None
+
+        entry = self._handles.get(key)
+        if entry and entry['refresh_at'] > now:
+            self._count('reused')
+            return entry['handle']
+
+        with self._lock:
+            entry = self._handles.get(key)
+            if entry and entry['refresh_at'] > now:
+                self._count('reused')
+                return entry['handle']
+            # Another worker may already have registered (or refreshed) this instruction
+            try:
+                shared = self.store.get(key)
+            except sqlite3.Error:
+                shared = None
+            if shared and shared['refresh_at'] > now:
+                self._handles[key] = shared
+                self._count('reused')
+                return shared['handle']
+
+            try:
+                entry = self._register(name, model, api_key)
+            except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                logger.warning(f"Could not cache '{name}' instructions for {model}, sending them inline: {e}")
+                self._unsupported[model] = now + RETRY_AFTER
+                self._count('failed')
+                return None
+            except CircuitOpenError as e:
+                # The generate call itself will fail fast the same way
+                logger.warning(f"Skipping context cache registration for {model}: {e}")
+                return None
+
+            self._count('refreshed' if key in self._handles or shared else 'registered')
+            self._handles[key] = entry
+            try:
+                self.store.set(key, entry, max(1, int(entry['expires'] - now)))
+            except sqlite3.Error as e:
+                logger.error(f"Failed to share context cache handle: {e}")
+            logger.info(f"Registered '{name}' instructions for {model} as {entry['handle']}")
+            return entry['handle']
+
+    def invalidate(self, handle):
+        """Forget a handle Gemini no longer accepts so the next call re-registers it"""
+        with self._lock:
+            for key, entry in list(self._handles.items()):
+                if entry['handle'] == handle:
+                    del self._handles[key]
+                    try:
+                        self.store.delete(key)
+                    except sqlite3.Error:
+                        pass
+
+    def apply(self, payload, name, model, api_key):
+        """Copy of payload that references the instruction by handle, or carries it inline"""
+        payload = {k: v for k, v in payload.items() if k not in ('cachedContent', 'systemInstruction')}
+        handle = self.handle_for(name, model, api_key)
+        if handle:
+            payload['cachedContent'] = handle
+        else:
+            self._count('inline')
+            payload['systemInstruction'] = {'parts': [{'text': SYSTEM_INSTRUCTIONS[name]}]}
+        return payload
+
+    @staticmethod
+    def _is_stale(payload, error):
+        """Whether a failed request was rejected because of its cachedContent handle.
+
+        Other 400s (malformed or oversized requests) would fail inline too, so
+        only one that names the cached content counts.
+        """
+        response = error.response
+        if 'cachedContent' not in payload or response is None:
+            return False
+        if response.status_code in STALE_STATUSES:
+            return True
+        return response.status_code == 400 and 'cachedcontent' in response.text.lower().replace(' ', '')
+
+    def _inline_retry(self, payload, name, model):
+        self._count('stale')
+        # The next call registers a fresh handle
+        self.invalidate(payload['cachedContent'])
+        return self.apply(payload, name, model, None)
+
+    def generate_content(self, payload, name, api_key, model=gemini_client.GEMINI_MODEL, timeout=None,
+                         priority='normal'):
+        """gemini_client.generate_content with the named system instruction attached"""
+        request = self.apply(payload, name, model, api_key)
+        try:
+            return gemini_client.generate_content(request, api_key, model, timeout, priority)
+        except requests.exceptions.HTTPError as e:
+            if not self._is_stale(request, e):
+                raise
+            logger.warning(f"Cached content {request['cachedContent']} rejected ({e}); retrying inline")
+            return gemini_client.generate_content(self._inline_retry(request, name, model), api_key, model,
+                                                  timeout, priority)
+
+    def stream_generate_content(self, payload, name, api_key, model=gemini_client.GEMINI_MODEL, timeout=None,
+                                priority='normal'):
+        """gemini_client.stream_generate_content with the named system instruction attached"""
+        request = self.apply(payload, name, model, api_key)
+        try:
+            # A rejected handle raises before the first chunk, so the retry never repeats output
+            chunks = gemini_client.stream_generate_content(request, api_key, model, timeout, priority)
+            first = next(chunks, None)
+        except requests.exceptions.HTTPError as e:
+            if not self._is_stale(request, e):
+                raise
+            logger.warning(f"Cached content {request['cachedContent']} rejected ({e}); streaming inline")
+            chunks = gemini_client.stream_generate_content(self._inline_retry(request, name, model), api_key,
+                                                           model, timeout, priority)
+            first = next(chunks, None)
+        if first is None:
+            return
+        yield first
+        yield from chunks
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['enabled'] = self.enabled
+        stats['handles'] = len(self._handles)
+        return stats
+
+
+context_cache = ContextCache()
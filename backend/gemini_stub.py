@@ -0,0 +1,162 @@
+"""
+Local stand-in for the Gemini REST API, for exercising the client without a real key or quota.
+
+Implements cachedContents registration and generateContent / streamGenerateContent
+(alt=sse). Replies say whether the system instruction arrived by cached handle or
+inline, and unknown or expired handles get a 404 like the real API.
+
+Usage:
+    python gemini_stub.py --port 8089 [--ttl-cap 120] [--min-cache-chars 0]
+    GEMINI_API_KEY=<any 21+ chars> GEMINI_API_BASE=http://127.0.0.1:8089/v1beta python app.py
+
+The app's instructions are shorter than Gemini's minimum cacheable size, so start it with
+GEMINI_CONTEXT_MIN_TOKENS=0 to see them registered.
+"""
+import re
+import json
+import time
+import uuid
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_cached = {}
+_lock = threading.Lock()
+_counts = {'registered': 0, 'generate': 0, 'cached_hits': 0, 'inline': 0, 'rejected': 0}
+
+_GENERATE = re.compile(r'^/v1beta/models/([^/:]+):(generateContent|streamGenerateContent)$')
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    ttl_cap = None
+    min_cache_chars = 0
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message):
+        self._send_json(status, {'error': {'code': status, 'message': message}})
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/v1beta/cachedContents':
+            with _lock:
+                self._send_json(200, {'cachedContents': list(_cached.values()), 'counts': dict(_counts)})
+        else:
+            self._error(404, f'Unknown path {path}')
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        body = self._read_json()
+        if path == '/v1beta/cachedContents':
+            return self._create_cached_content(body)
+        match = _GENERATE.match(path)
+        if not match:
+            return self._error(404, f'Unknown path {path}')
+        self._generate(match.group(1), match.group(2) == 'streamGenerateContent', body)
+
+    def _create_cached_content(self, body):
+        text = ''.join(p.get('text', '') for p in body.get('systemInstruction', {}).get('parts', []))
+        if len(text) < self.min_cache_chars:
+            return self._error(400, f'Cached content is too small: {len(text)} chars, minimum {self.min_cache_chars}')
+        ttl = float(str(body.get('ttl', '3600s')).rstrip('s'))
+        if self.ttl_cap:
+            ttl = min(ttl, self.ttl_cap)
+        expires = time.time() + ttl
+        entry = {
+            'name': f'cachedContents/{uuid.uuid4().hex[:12]}',
+            'model': body.get('model'),
+            'displayName': body.get('displayName', ''),
+            'expireTime': datetime.fromtimestamp(expires, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'usageMetadata': {'totalTokenCount': len(text) // 4},
+            '_expires': expires,
+            '_text': text
+        }
+        with _lock:
+            _cached[entry['name']] = entry
+            _counts['registered'] += 1
+        self._send_json(200, {k: v for k, v in entry.items() if not k.startswith('_')})
+
+    def _generate(self, model, stream, body):
+        handle = body.get('cachedContent')
+        with _lock:
+            _counts['generate'] += 1
+            if handle:
+                entry = _cached.get(handle)
+                if entry is None or entry['_expires'] < time.time() or entry['model'] != f'models/{model}':
+                    _cached.pop(handle, None)
+                    _counts['rejected'] += 1
+                    entry = None
+                else:
+                    _counts['cached_hits'] += 1
+            else:
+                _counts['inline'] += 1
+        if handle and entry is None:
+            return self._error(404, f'CachedContent not found (or expired): {handle}')
+
+        if handle:
+            mode, system_text = f'cached:{handle}', entry['_text']
+        elif body.get('systemInstruction'):
+            mode = 'inline'
+            system_text = ''.join(p.get('text', '') for p in body['systemInstruction'].get('parts', []))
+        else:
+            mode, system_text = 'none', ''
+        prompt = ''.join(p.get('text', '') for c in body.get('contents', []) for p in c.get('parts', []))
+        answer = f'[{mode}] Stub answer to: {prompt[-80:]}'
+        usage = {
+            'promptTokenCount': (len(prompt) + len(system_text)) // 4,
+            'cachedContentTokenCount': len(system_text) // 4 if handle else 0,
+            'candidatesTokenCount': len(answer) // 4
+        }
+        usage['totalTokenCount'] = usage['promptTokenCount'] + usage['candidatesTokenCount']
+
+        if not stream:
+            return self._send_json(200, {
+                'candidates': [{'content': {'parts': [{'text': answer}], 'role': 'model'}}],
+                'usageMetadata': usage
+            })
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = answer.split(' ')
+        for i in range(0, len(words), 3):
+            chunk = ' '.join(words[i:i + 3]) + ('' if i + 3 >= len(words) else ' ')
+            event = f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': chunk}]}}]})}\r\n\r\n"
+            data = event.encode('utf-8')
+            self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+            time.sleep(0.05)
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format, *args):
+        print(f"[gemini-stub] {self.command} {self.path.split('?')[0]} -> {args[1] if len(args) > 1 else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Gemini API stub')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--ttl-cap', type=float, default=None, help='Expire cached contents after at most this many seconds')
+    parser.add_argument('--min-cache-chars', type=int, default=0,
+                        help='Reject cachedContents smaller than this, like the real minimum cacheable size')
+    args = parser.parse_args()
+    GeminiStubHandler.ttl_cap = args.ttl_cap
+    GeminiStubHandler.min_cache_chars = args.min_cache_chars
+    print(f'Gemini stub listening on http://127.0.0.1:{args.port}/v1beta')
+    ThreadingHTTPServer(('127.0.0.1', args.port), GeminiStubHandler).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
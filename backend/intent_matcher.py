@@ -0,0 +1,133 @@
+"""
+Data-driven intent matcher for the offline fallback responses (rules and templates in data/fallback_intents.json)
+"""
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(__file__)
+_INTENTS_FILE = os.getenv("FALLBACK_INTENTS_FILE", os.path.join(_ROOT, 'data', 'fallback_intents.json'))
+
+# Keywords also match their common inflections ("skill" -> "skills", "develop" -> "development")
+_SUFFIXES = r'(?:s|es|ed|ing|er|ers|ment|ments)?'
+
+
+def normalize_career_type(career_type):
+    """The fallback rules only distinguish government, nontech and everything else (tech)"""
+    return career_type if career_type in ('government', 'nontech') else 'tech'
+
+
+def _keyword_pattern(keywords):
+    """Alternation of keywords (longest first, so phrases like "machine learning" win over "learn"), with inflections.
+
+    The match sits in a lookahead, so the scan tries every word start and keywords
+    that overlap ("web development" and "develop") are each found.
+    """
+    alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf'\b(?=(({alternation}){_SUFFIXES})\b)')
+
+
+class _Engine:
+    """One rule set, compiled into a single alternation regex.
+
+    Each keyword maps to the intents that list it. One scan finds the longest
+    keyword at every word start; shorter keywords starting at the same word
+    ("machine" under "machine learning") come from a precomputed prefix list.
+    Within an intent, keywords are taken leftmost-longest without overlap, but
+    a longer keyword of one intent never hides a keyword of another ("web
+    development" vs "develop"). Every matched keyword adds its weight (times
+    its word count, so phrases beat single words) to its intent, and the best
+    eligible intent wins; ties go to the intent listed first in the data file.
+    """
+
+    def __init__(self, spec):
+        self.intents = spec.get('intents', [])
+        self.defaults = spec.get('defaults', {})
+        self._intents_by_keyword = {}
+        for index, intent in enumerate(self.intents):
+            for keyword in intent.get('keywords', []):
+                self._intents_by_keyword.setdefault(keyword.lower(), set()).add(index)
+        self._pattern = _keyword_pattern(self._intents_by_keyword) if self._intents_by_keyword else None
+        self._prefixes = {
+            keyword: [(other, re.compile(rf'{re.escape(other)}{_SUFFIXES}\b'))
+                      for other in sorted(self._intents_by_keyword, key=len, reverse=True)
+                      if other != keyword and keyword.startswith(other)]
+            for keyword in self._intents_by_keyword
+        }
+
+    def _occurrences(self, message):
+        """(start, end, keyword) for every keyword occurrence, longest keyword first at each start"""
+        for m in self._pattern.finditer(message):
+            keyword = m.group(2)
+            yield m.start(), m.end(1), keyword
+            for other, pattern in self._prefixes[keyword]:
+                prefix = pattern.match(message, m.start())
+                if prefix:
+                    yield m.start(), prefix.end(), other
+
+    def match(self, message, career_type):
+        """Return (intent, score) for the best intent, or (None, 0.0)"""
+        if self._pattern is None:
+            return None, 0.0
+        career_type = normalize_career_type(career_type)
+        matched = {}
+        ends = {}
+        for start, end, keyword in self._occurrences(message.lower()):
+            for index in self._intents_by_keyword[keyword]:
+                if start >= ends.get(index, 0):
+                    matched.setdefault(index, set()).add(keyword)
+                    ends[index] = end
+
+        best, best_score = None, 0.0
+        for index in sorted(matched):
+            intent = self.intents[index]
+            types = intent.get('careerTypes', ['*'])
+            if not ('*' in types or career_type in types):
+                continue
+            score = intent.get('weight', 1.0) * sum(len(keyword.split()) for keyword in matched[index])
+            if score > best_score:
+                best, best_score = index, score
+        return (self.intents[best], best_score) if best is not None else (None, 0.0)
+
+    def default(self, career_type):
+        return self.defaults.get(normalize_career_type(career_type)) or self.defaults.get('*', '')
+
+
+class IntentMatcher:
+    """Loads the fallback rule sets and answers messages from their templates"""
+
+    def __init__(self, path=_INTENTS_FILE):
+        self.path = path
+        self.reload()
+
+    def reload(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load fallback intents from {self.path}: {e}")
+            data = {}
+        self.version = data.get('version')
+        self._engines = {name: _Engine(spec) for name, spec in data.get('engines', {}).items()}
+
+    def match(self, engine, message, career_type='tech'):
+        """Best intent id and score for a message, or (None, 0.0)"""
+        rules = self._engines.get(engine)
+        if rules is None:
+            return None, 0.0
+        intent, score = rules.match(message, career_type)
+        return (intent['id'] if intent else None), score
+
+    def respond(self, engine, message, career_type='tech'):
+        """Template response for the best matching intent, else the career type's default"""
+        rules = self._engines.get(engine)
+        if rules is None:
+            return ''
+        intent, _ = rules.match(message, career_type)
+        return intent['response'] if intent else rules.default(career_type)
+
+
+fallback_intents = IntentMatcher()
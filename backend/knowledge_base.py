@@ -0,0 +1,264 @@
+"""
+TF-IDF retrieval over a local career knowledge base, used to answer chat messages offline
+"""
+import os
+import re
+import json
+import math
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(__file__)
+_INDEX_FILE = os.getenv("KNOWLEDGE_INDEX_FILE", os.path.join(_ROOT, 'data', 'knowledge_index.json'))
+_INTENTS_FILE = os.getenv("FALLBACK_INTENTS_FILE", os.path.join(_ROOT, 'data', 'fallback_intents.json'))
+
+INDEX_VERSION = 1
+# Cosine similarity below which a passage is not considered an answer
+MIN_SCORE = float(os.getenv("KNOWLEDGE_MIN_SCORE", "0.12"))
+CAREER_TYPE_BOOST = 1.2
+# Seconds before retrying a failed build; doubles per consecutive failure up to the cap
+BUILD_RETRY_AFTER = float(os.getenv("KNOWLEDGE_BUILD_RETRY_AFTER", "30"))
+BUILD_RETRY_MAX = float(os.getenv("KNOWLEDGE_BUILD_RETRY_MAX", "600"))
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = {
+    'a', 'about', 'after', 'all', 'also', 'am', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been', 'but', 'by',
+    'can', 'could', 'do', 'does', 'for', 'from', 'get', 'give', 'go', 'has', 'have', 'how', 'i', 'if', 'in',
+    'into', 'is', 'it', 'its', 'just', 'know', 'like', 'me', 'more', 'most', 'my', 'need', 'of', 'on', 'or',
+    'our', 'please', 'should', 'so', 'some', 'tell', 'than', 'that', 'the', 'their', 'them', 'then', 'there',
+    'these', 'they', 'this', 'to', 'up', 'us', 'want', 'was', 'we', 'what', 'when', 'which', 'who', 'why',
+    'will', 'with', 'would', 'you', 'your'
+}
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords, plus adjacent-word bigrams for phrases like 'data science'"""
+    words = [w for w in _TOKEN.findall((text or '').lower()) if w not in STOPWORDS]
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+def _clean_heading(line):
+    return re.sub(r'[^\w\s&()/+-]', '', line.replace('**', '')).strip()
+
+
+def passages_from_templates(path=_INTENTS_FILE):
+    """Split each fallback template into its blank-line separated sections"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            engines = json.load(f).get('engines', {})
+    except (OSError, ValueError):
+        return []
+    passages = []
+    for engine in engines.values():
+        for intent in engine.get('intents', []):
+            sections = [s.strip() for s in intent['response'].split('\n\n') if s.strip()]
+            title = _clean_heading(sections[0].split('\n')[0]) if len(sections) > 1 else intent['id'].replace('_', ' ').title()
+            for section in sections[1:] if len(sections) > 1 else sections:
+                # The closing question of a template is not useful on its own
+                if section.endswith('?') and '\n' not in section and len(sections) > 1:
+                    continue
+                passages.append({
+                    'source': 'guide',
+                    'title': title,
+                    'text': section,
+                    'careerTypes': intent.get('careerTypes', ['*'])
+                })
+    return passages
+
+
+def passages_from_roles(roles):
+    passages = []
+    for role in roles or []:
+        skills = [s['skill'] if isinstance(s, dict) else s for s in role.get('requiredSkills', [])]
+        tags = role.get('tags', [])
+        if 'government' in tags:
+            career_types = ['government']
+        elif 'nontech' in tags or 'non-tech' in tags:
+            career_types = ['nontech']
+        else:
+            career_types = ['tech']
+        passages.append({
+            'source': 'role',
+            'title': role.get('title', ''),
+            'text': f"{role.get('description', '').strip()}\nKey skills: {', '.join(skills)}.",
+            'keywords': ' '.join(tags),
+            'careerTypes': career_types
+        })
+    return passages
+
+
+def passages_from_resources(resources):
+    passages = []
+    for skill, links in (resources or {}).items():
+        lines = [f"• {link['title']} - {link['url']}" for link in links]
+        passages.append({
+            'source': 'resource',
+            'title': f'Learning resources: {skill}',
+            'text': '\n'.join(lines),
+            'keywords': f'{skill} learn course study resources',
+            'careerTypes': ['*']
+        })
+    return passages
+
+
+class KnowledgeBase:
+    """Sparse TF-IDF vectors kept as {term: weight} dicts with an inverted index.
+
+    The corpus is a few hundred passages, so plain dicts answer a query in a
+    few milliseconds without NumPy. The built index is saved as JSON along
+    with a fingerprint of its sources and reused until those change.
+    """
+
+    def __init__(self, path=_INDEX_FILE):
+        self.path = path
+        self.docs = []
+        self.idf = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.failures = 0
+        self._retry_at = 0.0
+
+    @staticmethod
+    def fingerprint(passages):
+        blob = json.dumps([INDEX_VERSION, passages], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def _doc_terms(self, doc):
+        # Titles and keywords count double
+        heading = f"{doc['title']} {doc.get('keywords', '')}"
+        return tokenize(doc['text']) + tokenize(heading) * 2
+
+    def _vectorize(self, terms):
+        counts = {}
+        for term in terms:
+            if term in self.idf:
+                counts[term] = counts.get(term, 0) + 1
+        vector = {term: (1 + math.log(n)) * self.idf[term] for term, n in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {term: w / norm for term, w in vector.items()} if norm else {}
+
+    def build(self, passages):
+        started = time.perf_counter()
+        term_lists = [self._doc_terms(doc) for doc in passages]
+        df = {}
+        for terms in term_lists:
+            for term in set(terms):
+                df[term] = df.get(term, 0) + 1
+        n = len(passages)
+        self.idf = {term: math.log((n + 1) / (count + 1)) + 1 for term, count in df.items()}
+        self.docs = [dict(doc, vector=self._vectorize(terms)) for doc, terms in zip(passages, term_lists)]
+        self._index_postings()
+        logger.info(f"Built knowledge index: {n} passages, {len(self.idf)} terms in "
+                    f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _index_postings(self):
+        postings = {}
+        for doc_id, doc in enumerate(self.docs):
+            for term, weight in doc['vector'].items():
+                postings.setdefault(term, []).append((doc_id, weight))
+        self._postings = postings
+        self.loaded = True
+
+    def save(self, fingerprint):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        # A temp file per writer, so workers building at the same time never publish each other's partial output
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.knowledge_index.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': fingerprint, 'idf': self.idf, 'docs': self.docs}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _load(self, fingerprint):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('fingerprint') != fingerprint:
+            return False
+        self.idf = data['idf']
+        self.docs = data['docs']
+        self._index_postings()
+        return True
+
+    def load_or_build(self, roles=None, resources=None):
+        """Load the saved index if its sources are unchanged, otherwise rebuild and save it"""
+        passages = passages_from_templates() + passages_from_roles(roles) + passages_from_resources(resources)
+        fingerprint = self.fingerprint(passages)
+        with self._lock:
+            if self._load(fingerprint):
+                logger.info(f"Loaded knowledge index from {self.path} ({len(self.docs)} passages)")
+                self.failures = 0
+                return
+            self.build(passages)
+            self.failures = 0
+            try:
+                self.save(fingerprint)
+            except OSError as e:
+                logger.error(f"Could not save knowledge index: {e}")
+
+    def build_due(self):
+        """Whether the index still needs loading and no recent failed build is backing off"""
+        return not self.loaded and time.time() >= self._retry_at
+
+    def mark_failed(self):
+        """Back off before the next build attempt after one failed"""
+        self.failures += 1
+        delay = min(BUILD_RETRY_MAX, BUILD_RETRY_AFTER * 2 ** (self.failures - 1))
+        self._retry_at = time.time() + delay
+        logger.warning(f"Knowledge index unavailable, retrying in {delay:.0f}s (failure {self.failures})")
+
+    def _rank(self, query, k, career_type=None, sources=None):
+        """Top-k (ranking score, cosine similarity, doc) triples; the career type boost only affects ranking"""
+        vector = self._vectorize(tokenize(query))
+        scores = {}
+        for term, weight in vector.items():
+            for doc_id, doc_weight in self._postings.get(term, ()):
+                if sources is None or self.docs[doc_id]['source'] in sources:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * doc_weight
+        ranked = []
+        for doc_id, cosine in scores.items():
+            doc = self.docs[doc_id]
+            boost = CAREER_TYPE_BOOST if career_type and career_type in doc.get('careerTypes', ['*']) else 1.0
+            ranked.append((cosine * boost, cosine, doc))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return ranked[:k]
+
+    def search(self, query, k=3, career_type=None, sources=None):
+        """Top-k passages as (score, doc) pairs, best first"""
+        return [(score, doc) for score, _, doc in self._rank(query, k, career_type, sources)]
+
+    def answer(self, query, career_type=None, max_passages=2):
+        """Chat-ready answer built from the best passages, or None if nothing is relevant enough"""
+        return self.scored_answer(query, career_type, max_passages)[1]
+
+    def scored_answer(self, query, career_type=None, max_passages=2, sources=None):
+        """(cosine similarity of the best passage, answer) like answer(), with (0.0, None) when nothing is
+        relevant enough. sources limits the passages used, e.g. ('guide',)."""
+        results = [(score, cosine, doc) for score, cosine, doc
+                   in self._rank(query, max_passages + 2, career_type, sources) if score >= MIN_SCORE]
+        if not results:
+            return 0.0, None
+        parts = []
+        seen_titles = set()
+        for _, _, doc in results:
+            if doc['title'] in seen_titles:
+                continue
+            seen_titles.add(doc['title'])
+            parts.append(f"**{doc['title']}**\n{doc['text']}")
+            if len(parts) >= max_passages:
+                break
+        return results[0][1], '\n\n'.join(parts)
+
+
+knowledge_base = KnowledgeBase()
@@ -0,0 +1,189 @@
+"""
+Non-blocking logging: records go through a queue to a background writer thread, as JSON lines with request IDs
+"""
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Per-logger overrides, e.g. "app=DEBUG,werkzeug=WARNING,gemini_client=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# 'json' (one object per line) or 'text'
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Keep 1 in N DEBUG records per call site (1 = keep all)
+LOG_DEBUG_SAMPLE_EVERY = int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "20"))
+# Records waiting for the writer thread; more than this are dropped rather than blocking a request
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def assign_request_id(incoming=None):
+    """Use the caller's X-Request-ID when it looks sane, otherwise a new one; stored on flask.g"""
+    request_id = incoming if incoming and _REQUEST_ID.match(incoming) else uuid.uuid4().hex[:16]
+    g.request_id = request_id
+    return request_id
+
+
+def current_request_id():
+    if has_request_context():
+        return g.get('request_id', '-')
+    return '-'
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps each record with the request ID while still on the emitting thread"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = current_request_id()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Lets 1 in `every` DEBUG records through per call site; other levels always pass"""
+
+    def __init__(self, every=LOG_DEBUG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG or self.every == 1:
+            return True
+        site = (record.name, record.lineno)
+        with self._lock:
+            seen = self._seen.get(site, 0)
+            self._seen[site] = seen + 1
+            if seen % self.every == 0:
+                return True
+            self.dropped += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the writer falls behind instead of raising"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render message and traceback here; the writer thread must not touch request objects in args
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'thread': record.threadName
+        }
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def parse_levels(spec):
+    """{'logger': level} from "name=LEVEL,..." (bad entries are ignored)"""
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        level = level.strip().upper()
+        if name.strip() and isinstance(logging.getLevelName(level), int):
+            levels[name.strip()] = level
+    return levels
+
+
+class LoggingPipeline:
+    """Root logger -> DroppingQueueHandler -> QueueListener thread -> stderr"""
+
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+        self.sampler = None
+        self._lock = threading.Lock()
+
+    def configure(self, level=LOG_LEVEL, levels=LOG_LEVELS, fmt=LOG_FORMAT, sample_every=LOG_DEBUG_SAMPLE_EVERY,
+                  stream=None):
+        """Install the queue handler on the root logger (replacing its handlers) and start the writer"""
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+            writer = logging.StreamHandler(stream or sys.stderr)
+            writer.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+            self.sampler = DebugSampler(sample_every)
+            self.handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+            self.handler.addFilter(RequestContextFilter())
+            self.handler.addFilter(self.sampler)
+            self.listener = QueueListener(self.handler.queue, writer)
+
+            root = logging.getLogger()
+            for existing in list(root.handlers):
+                root.removeHandler(existing)
+            root.addHandler(self.handler)
+            root.setLevel(level)
+            for name, logger_level in parse_levels(levels).items():
+                logging.getLogger(name).setLevel(logger_level)
+            self.listener.start()
+
+    def restart_writer(self):
+        """The writer thread does not survive fork(); give the child a fresh queue and writer"""
+        if self.listener is not None:
+            self._lock = threading.Lock()
+            self.handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+            self.listener = QueueListener(self.handler.queue, *self.listener.handlers)
+            self.listener.start()
+
+    def shutdown(self):
+        """Flush what is queued and stop the writer"""
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+    def stats(self):
+        return {
+            'queued': self.handler.queue.qsize() if self.handler else 0,
+            'dropped': self.handler.dropped if self.handler else 0,
+            'debug_sampled_out': self.sampler.dropped if self.sampler else 0
+        }
+
+
+logging_pipeline = LoggingPipeline()
+configure_logging = logging_pipeline.configure
+
+atexit.register(logging_pipeline.shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=logging_pipeline.restart_writer)
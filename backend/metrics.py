@@ -0,0 +1,192 @@
+"""
+Per-request stage timers (Server-Timing) and in-process counters/histograms exposed in Prometheus text format
+"""
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# Seconds; covers sub-millisecond cache hits up to slow Gemini calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_label_value(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield (f'{self.name}_bucket', _labels(self.label_names, labels, [('le', _number(bound))]),
+                       cumulative)
+            yield f'{self.name}_sum', _labels(self.label_names, labels), total
+            yield f'{self.name}_count', _labels(self.label_names, labels), count
+
+
+class CallbackGauge:
+    """Gauge whose values are read from `collect()` ({label tuple: value}) at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels, collect):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.collect = collect
+
+    def samples(self):
+        for labels, value in sorted(self.collect().items()):
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, labels, collect):
+        return self.register(CallbackGauge(name, help, labels, collect))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+request_latency = registry.histogram(
+    'careerpath_request_duration_seconds', 'Request latency by endpoint and status', ('endpoint', 'status'))
+stage_latency = registry.histogram(
+    'careerpath_stage_duration_seconds', 'Latency of instrumented request stages', ('endpoint', 'stage'))
+gemini_responses = registry.counter(
+    'careerpath_gemini_responses_total', 'Gemini HTTP attempts by status code (or error kind)', ('status',))
+fallbacks = registry.counter(
+    'careerpath_fallbacks_total', 'Answers served by a local fallback instead of Gemini', ('path',))
+
+
+def start_request():
+    g._request_started = time.perf_counter()
+    g._stage_timings = {}
+
+
+def record_stage(name, seconds):
+    """Add a stage duration to the current request (summed per name) and the stage histogram"""
+    endpoint = 'none'
+    if has_request_context():
+        endpoint = request.endpoint or 'none'
+        timings = g.get('_stage_timings')
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + seconds
+    stage_latency.observe(seconds, endpoint, name)
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one stage of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def finish_request(response):
+    """Record the request latency and add the Server-Timing header for its stages"""
+    started = g.get('_request_started')
+    if started is None:
+        return response
+    total = time.perf_counter() - started
+    request_latency.observe(total, request.endpoint or 'none', str(response.status_code))
+    timings = g.get('_stage_timings')
+    if timings:
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.items()]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+    return response
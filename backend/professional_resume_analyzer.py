@@ -4,6 +4,34 @@ Professional Resume Analyzer - Comprehensive achievement and experience analysis
 import re
 from datetime import datetime
 
+# Pattern bank, compiled once at import instead of going through re's cache on every call.
+# Families that extract a value keep their patterns in priority order: the first pattern
+# that matches anywhere in the line wins. All of them need a digit, so lines without one skip the scan.
+DURATION_PATTERNS = (
+    re.compile(r'\d{4}\s*-\s*\d{4}'),                                # 2023-2024
+    re.compile(r'\d+\s+months?'),                                    # 6 months
+    re.compile(r'\d+\s+years?'),                                     # 2 years
+    re.compile(r'[A-Za-z]{3}\s+\d{4}\s*-\s*[A-Za-z]{3}\s+\d{4}')       # Jan 2023 - Mar 2023
+)
+TEAM_SIZE_PATTERNS = (
+    re.compile(r'team of (\d+)'),
+    re.compile(r'(\d+) members?'),
+    re.compile(r'(\d+)-person team'),
+    re.compile(r'managed (\d+)')
+)
+PERCENT_PATTERN = re.compile(r'(\d+)%')
+MONEY_PATTERN = re.compile(r'\$(\d+(?:,\d+)*)')
+METRIC_NUMBER_PATTERN = re.compile(r'\d+%|\$\d+')
+_DIGIT = re.compile(r'\d')
+
+# Keyword families (plain substring checks are faster than a regex alternation of literals)
+TECHNICAL_ACTIONS = ('developed', 'built', 'created', 'implemented', 'designed', 'optimized')
+TECHNICAL_OBJECTS = ('system', 'application', 'website', 'database', 'algorithm', 'model')
+AWARD_WORDS = ('award', 'recognition', 'honor', 'medal', 'prize', 'winner', 'champion')
+PUBLICATION_WORDS = ('published', 'paper', 'journal', 'conference', 'research')
+METRIC_WORDS = ('increased', 'improved', 'reduced', 'saved')
+SCALE_WORDS = ('million', 'thousand', 'users', 'customers', 'team of', 'managed')
+
 def extract_detailed_achievements(resume_text):
     """Extract all types of achievements from resume"""
     achievements = {
@@ -17,23 +45,24 @@ def extract_detailed_achievements(resume_text):
     lines = resume_text.split('\n')
     
     for line in lines:
-        line_lower = line.lower().strip()
+        line_lower = line.lower()
         
         # Technical achievements
-        if any(word in line_lower for word in ['developed', 'built', 'created', 'implemented', 'designed', 'optimized']):
-            if any(tech in line_lower for tech in ['system', 'application', 'website', 'database', 'algorithm', 'model']):
+        if any(word in line_lower for word in TECHNICAL_ACTIONS):
+            if any(tech in line_lower for tech in TECHNICAL_OBJECTS):
                 achievements['technical'].append(line.strip())
         
         # Awards and recognition
-        if any(word in line_lower for word in ['award', 'recognition', 'honor', 'medal', 'prize', 'winner', 'champion']):
+        if any(word in line_lower for word in AWARD_WORDS):
             achievements['awards'].append(line.strip())
         
         # Publications
-        if any(word in line_lower for word in ['published', 'paper', 'journal', 'conference', 'research']):
+        if any(word in line_lower for word in PUBLICATION_WORDS):
             achievements['publications'].append(line.strip())
         
-        # Performance metrics
-        if re.search(r'\d+%|\$\d+|increased|improved|reduced|saved', line_lower):
+        # Performance metrics (the numeric patterns need a % or $ sign)
+        if any(word in line_lower for word in METRIC_WORDS) or (
+                ('%' in line_lower or '$' in line_lower) and METRIC_NUMBER_PATTERN.search(line_lower)):
             achievements['performance_metrics'].append(line.strip())
     
     return achievements
@@ -117,22 +146,22 @@ def analyze_work_impact(resume_text):
     impact_items = []
     
     # Look for quantifiable achievements
-    percentage_matches = re.findall(r'(\d+)%', resume_text)
+    percentage_matches = PERCENT_PATTERN.findall(resume_text)
     for match in percentage_matches:
         if int(match) > 10:  # Significant percentage improvements
             impact_score += 2
             impact_items.append(f"{match}% improvement/increase")
     
     # Look for monetary impact
-    money_matches = re.findall(r'\$(\d+(?:,\d+)*)', resume_text)
+    money_matches = MONEY_PATTERN.findall(resume_text)
     for match in money_matches:
         impact_score += 3
         impact_items.append(f"${match} financial impact")
     
     # Look for scale indicators
-    scale_words = ['million', 'thousand', 'users', 'customers', 'team of', 'managed']
-    for word in scale_words:
-        if word in resume_text.lower():
+    text_lower = resume_text.lower()
+    for word in SCALE_WORDS:
+        if word in text_lower:
             impact_score += 1
             impact_items.append(f"Scale: {word}")
     
@@ -168,17 +197,11 @@ def extract_leadership_experience(resume_text):
 def extract_duration_from_line(line):
     """Extract duration information from a line"""
     # Look for patterns like "2023-2024", "6 months", "Jan 2023 - Mar 2023"
-    duration_patterns = [
-        r'\d{4}\s*-\s*\d{4}',
-        r'\d+\s+months?',
-        r'\d+\s+years?',
-        r'[A-Za-z]{3}\s+\d{4}\s*-\s*[A-Za-z]{3}\s+\d{4}'
-    ]
-    
-    for pattern in duration_patterns:
-        match = re.search(pattern, line)
-        if match:
-            return match.group()
+    if _DIGIT.search(line):
+        for pattern in DURATION_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                return match.group()
     
     return "Duration not specified"
 
@@ -197,17 +220,12 @@ def extract_company_from_line(line):
 def extract_team_size(line):
     """Extract team size from leadership descriptions"""
     # Look for patterns like "team of 5", "5 members", "10-person team"
-    size_patterns = [
-        r'team of (\d+)',
-        r'(\d+) members?',
-        r'(\d+)-person team',
-        r'managed (\d+)'
-    ]
-    
-    for pattern in size_patterns:
-        match = re.search(pattern, line.lower())
-        if match:
-            return f"{match.group(1)} people"
+    if _DIGIT.search(line):
+        line_lower = line.lower()
+        for pattern in TEAM_SIZE_PATTERNS:
+            match = pattern.search(line_lower)
+            if match:
+                return f"{match.group(1)} people"
     
     return "Team size not specified"
 
@@ -0,0 +1,158 @@
+"""
+Analyzed profile storage with an inverted skill -> profile index for reverse (role -> candidate) matching
+"""
+import os
+import json
+import time
+import sqlite3
+
+_ROOT = os.path.dirname(__file__)
+_PROFILE_DB = os.getenv("PROFILE_STORE_DB", os.path.join(_ROOT, 'data', 'profiles.db'))
+
+_initialized_paths = set()
+
+
+def _connect(path=_PROFILE_DB):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    if path not in _initialized_paths:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                profile_id TEXT PRIMARY KEY,
+                career_type TEXT,
+                experience_level TEXT,
+                strength_score INTEGER NOT NULL DEFAULT 0,
+                skills TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+        """)
+        # The inverted index: one posting per (skill, profile)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS profile_skills (
+                skill_id TEXT NOT NULL,
+                profile_id TEXT NOT NULL,
+                PRIMARY KEY (skill_id, profile_id)
+            ) WITHOUT ROWID;
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_profile_skills_profile ON profile_skills (profile_id);")
+        # Postings per skill, kept up to date by save_profile so lookups know rare from common skills
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS skill_counts (
+                skill_id TEXT PRIMARY KEY,
+                profiles INTEGER NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        conn.commit()
+        _initialized_paths.add(path)
+    return conn
+
+
+def save_profile(profile_id, skill_ids, experience_level, strength_score, career_type=None):
+    """Insert or replace a profile and its postings in the skill index"""
+    skill_ids = sorted(set(s for s in skill_ids if s))
+    conn = _connect()
+    try:
+        with conn:
+            row = conn.execute("SELECT skills FROM profiles WHERE profile_id = ?;", (profile_id,)).fetchone()
+            old_ids = json.loads(row[0]) if row else []
+            conn.executemany("UPDATE skill_counts SET profiles = profiles - 1 WHERE skill_id = ?;",
+                             [(skill_id,) for skill_id in old_ids])
+            conn.execute("""
+                INSERT OR REPLACE INTO profiles (profile_id, career_type, experience_level, strength_score, skills, updated)
+                VALUES (?, ?, ?, ?, ?, ?);
+            """, (profile_id, career_type, experience_level, int(strength_score or 0), json.dumps(skill_ids), time.time()))
+            conn.execute("DELETE FROM profile_skills WHERE profile_id = ?;", (profile_id,))
+            conn.executemany(
+                "INSERT INTO profile_skills (skill_id, profile_id) VALUES (?, ?);",
+                [(skill_id, profile_id) for skill_id in skill_ids]
+            )
+            conn.executemany(
+                "INSERT INTO skill_counts (skill_id, profiles) VALUES (?, 1) "
+                "ON CONFLICT(skill_id) DO UPDATE SET profiles = profiles + 1;",
+                [(skill_id,) for skill_id in skill_ids]
+            )
+    finally:
+        conn.close()
+
+
+def count_profiles():
+    conn = _connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM profiles;").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _placeholders(values):
+    return ', '.join('?' for _ in values)
+
+
+def _top_profiles(conn, weighted_skills, skill_ids, seed_ids, career_types, limit):
+    """Top rows scored over skill_ids, among profiles that hold at least one of seed_ids"""
+    case_sql = ' '.join('WHEN ? THEN ?' for _ in skill_ids)
+    case_params = [p for skill_id in skill_ids for p in (skill_id, weighted_skills[skill_id])]
+    career_sql, career_params = '', []
+    if career_types:
+        career_sql = f'AND p.career_type IN ({_placeholders(career_types)})'
+        career_params = list(career_types)
+    return conn.execute(f"""
+        SELECT ps.profile_id, SUM(CASE ps.skill_id {case_sql} ELSE 0 END) AS overlap,
+               p.experience_level, p.strength_score, p.career_type
+        FROM profile_skills ps
+        JOIN profiles p ON p.profile_id = ps.profile_id
+        WHERE ps.skill_id IN ({_placeholders(skill_ids)})
+          AND ps.profile_id IN (SELECT profile_id FROM profile_skills WHERE skill_id IN ({_placeholders(seed_ids)}))
+          {career_sql}
+        GROUP BY ps.profile_id
+        ORDER BY overlap DESC, p.strength_score DESC
+        LIMIT ?;
+    """, case_params + list(skill_ids) + list(seed_ids) + career_params + [limit]).fetchall()
+
+
+def find_candidates(weighted_skills, limit=50, career_types=None):
+    """Top-N profiles of the given career types by weighted overlap with a {skill_id: weight} map.
+
+    Skills are taken rarest first (skill_counts): the profiles holding one
+    of the skills taken so far are scored exactly, and once the combined
+    weight of the remaining, more common skills is below the N-th best
+    score, a profile holding only those cannot make the list, so their long
+    posting lists are never scanned. Ties are broken by profile strength score.
+    """
+    if not weighted_skills:
+        return []
+
+    total_weight = sum(weighted_skills.values()) or 1
+    conn = _connect()
+    try:
+        counts = dict(conn.execute(
+            f"SELECT skill_id, profiles FROM skill_counts WHERE skill_id IN ({_placeholders(weighted_skills)});",
+            list(weighted_skills)).fetchall())
+        # Skills nobody holds cannot add to any score
+        skill_ids = sorted((s for s in weighted_skills if counts.get(s)), key=lambda s: (counts[s], s))
+        rows = []
+        for taken in range(1, len(skill_ids) + 1):
+            rows = _top_profiles(conn, weighted_skills, skill_ids, skill_ids[:taken], career_types, limit)
+            remaining = sum(weighted_skills[s] for s in skill_ids[taken:])
+            if len(rows) >= limit and remaining < rows[-1][1]:
+                break
+
+        matched = {}
+        if rows:
+            ids = [r[0] for r in rows]
+            for skill_id, profile_id in conn.execute(f"""
+                SELECT skill_id, profile_id FROM profile_skills
+                WHERE profile_id IN ({_placeholders(ids)}) AND skill_id IN ({_placeholders(skill_ids)});
+            """, ids + skill_ids):
+                matched.setdefault(profile_id, []).append(skill_id)
+    finally:
+        conn.close()
+
+    return [{
+        'profileId': profile_id,
+        'score': round((overlap / total_weight) * 100, 2),
+        'matchedSkills': sorted(matched.get(profile_id, [])),
+        'experienceLevel': experience_level,
+        'strengthScore': strength_score,
+        'careerType': career_type
+    } for profile_id, overlap, experience_level, strength_score, career_type in rows]
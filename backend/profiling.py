@@ -0,0 +1,176 @@
+"""
+On-demand request profiling: cProfile + tracemalloc for flagged or sampled requests, kept in a ring buffer
+"""
+import os
+import io
+import time
+import uuid
+import pstats
+import marshal
+import cProfile
+import logging
+import itertools
+import threading
+import tracemalloc
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Profile 1 in N API requests automatically (0 = only when asked for)
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+# Profiles kept per worker
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "20"))
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_TOP_ALLOCATIONS = 15
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 5
+
+
+class ProfileSession:
+    """One running profile; created by RequestProfiler.start"""
+
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.profile = cProfile.Profile()
+        self.started_tracemalloc = False
+        self.baseline = None
+        self.started = time.perf_counter()
+
+
+class RequestProfiler:
+    """Runs flagged or sampled requests under cProfile and tracemalloc.
+
+    cProfile is enabled on the calling thread only, but tracemalloc traces
+    the whole process, so one request is profiled at a time per worker;
+    other requests that ask for a profile while one runs are not profiled.
+    Finished profiles (pstats dump, top functions, top allocation sites) are
+    kept in a ring buffer of the last PROFILE_RING_SIZE.
+    """
+
+    def __init__(self, sample_every=PROFILE_SAMPLE_EVERY, ring_size=PROFILE_RING_SIZE):
+        self.sample_every = sample_every
+        self._counter = itertools.count(1)
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=ring_size)
+        self._stats = {'profiled': 0, 'sampled': 0, 'requested': 0, 'skipped_busy': 0}
+
+    def trigger_for(self, requested):
+        """'request' when asked for, 'sample' for every Nth call, otherwise None"""
+        if requested:
+            return 'request'
+        if self.sample_every > 0 and next(self._counter) % self.sample_every == 0:
+            return 'sample'
+        return None
+
+    def start(self, trigger):
+        """Begin profiling the current thread, or return None while another profile is running"""
+        if not self._busy.acquire(blocking=False):
+            self._count('skipped_busy')
+            return None
+        session = ProfileSession(trigger)
+        try:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                session.started_tracemalloc = True
+            tracemalloc.reset_peak()
+            session.baseline = tracemalloc.take_snapshot()
+            session.profile.enable()
+        except Exception:
+            self._release(session)
+            raise
+        return session
+
+    def stop(self, session, **details):
+        """Finish a session and store its results; returns the profile id"""
+        try:
+            session.profile.disable()
+            duration = time.perf_counter() - session.started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            self._release(session)
+
+        session.profile.create_stats()
+        # Same format as cProfile's dump_stats, so pstats.Stats() can load it; taken first because
+        # pstats.Stats(profile) empties profile.stats
+        dump = marshal.dumps(session.profile.stats)
+        stream = io.StringIO()
+        stats = pstats.Stats(session.profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+
+        record = dict(details)
+        record.update({
+            'id': uuid.uuid4().hex,
+            'trigger': session.trigger,
+            'timestamp': time.time(),
+            'durationMs': round(duration * 1000, 2),
+            'peakTracedBytes': peak,
+            'functions': stream.getvalue(),
+            'allocations': top_allocations(snapshot, session.baseline),
+            'pstats': dump
+        })
+        with self._lock:
+            self._profiles.append(record)
+            self._stats['profiled'] += 1
+            self._stats['sampled' if session.trigger == 'sample' else 'requested'] += 1
+        logger.info(f"Profiled {record.get('path')} ({session.trigger}) in {record['durationMs']}ms as {record['id']}")
+        return record['id']
+
+    def discard(self, session):
+        """Stop a session without storing it (the request failed before it finished)"""
+        try:
+            session.profile.disable()
+        finally:
+            self._release(session)
+
+    def _release(self, session):
+        if session.started_tracemalloc:
+            tracemalloc.stop()
+        self._busy.release()
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def summaries(self):
+        """Summaries of the stored profiles, newest first"""
+        with self._lock:
+            profiles = list(self._profiles)
+        return [{key: value for key, value in record.items() if key not in ('functions', 'allocations', 'pstats')}
+                for record in reversed(profiles)]
+
+    def get(self, profile_id):
+        with self._lock:
+            for record in self._profiles:
+                if record['id'] == profile_id:
+                    return record
+        return None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['stored'] = len(self._profiles)
+        stats['sample_every'] = self.sample_every
+        return stats
+
+
+def top_allocations(snapshot, baseline, limit=PROFILE_TOP_ALLOCATIONS):
+    """Allocation sites that grew most between the two snapshots"""
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    snapshot = snapshot.filter_traces(filters)
+    baseline = baseline.filter_traces(filters)
+    sites = []
+    for diff in snapshot.compare_to(baseline, 'lineno')[:limit]:
+        frame = diff.traceback[0]
+        sites.append({
+            'file': frame.filename,
+            'line': frame.lineno,
+            'sizeDiff': diff.size_diff,
+            'size': diff.size,
+            'countDiff': diff.count_diff
+        })
+    return sites
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,159 @@
+"""
+Prompt builder with token estimates, per-endpoint input budgets and chat history compaction
+"""
+import os
+import re
+import logging
+import threading
+
+from rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Input token budgets per endpoint (prompt only; output is capped separately by maxOutputTokens)
+PROMPT_BUDGETS = {
+    'chat': int(os.getenv("PROMPT_BUDGET_CHAT", "600")),
+    'advice': int(os.getenv("PROMPT_BUDGET_ADVICE", "700")),
+    'default': int(os.getenv("PROMPT_BUDGET_DEFAULT", "1000")),
+}
+
+# Sent once per prompt - callers no longer append their own copy
+RESPONSE_GUIDELINES = ("Style: clear, concise and specific; give actionable advice with examples where useful; "
+                       "keep an encouraging tone and organized formatting; no filler.")
+
+MAX_SKILLS_LISTED = 15
+RECENT_TURNS = 2
+TURN_TOKEN_CAP = 120
+SUMMARY_TOKEN_CAP = 80
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens, on a word boundary"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max(0, max_tokens * 4)]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip() + '...'
+
+
+def format_skill_list(skills, limit=MAX_SKILLS_LISTED):
+    """Comma-separated skills, capped so very long lists don't dominate the prompt"""
+    skills = [s for s in skills or [] if s]
+    if not skills:
+        return 'Not specified'
+    listed = ', '.join(skills[:limit])
+    if len(skills) > limit:
+        listed += f' (+{len(skills) - limit} more)'
+    return listed
+
+
+def compact_history(chat_history, recent_turns=RECENT_TURNS, turn_cap=TURN_TOKEN_CAP, summary_cap=SUMMARY_TOKEN_CAP):
+    """Split history into (rolling summary of older turns, recent turns kept verbatim but capped).
+
+    The summary is extractive: the first sentence of each older user turn,
+    newest first, until the summary cap is reached.
+    """
+    history = [m for m in chat_history or [] if m.get('user') or m.get('assistant')]
+    older, recent = history[:-recent_turns] if recent_turns else history, history[-recent_turns:] if recent_turns else []
+
+    topics = []
+    used = 0
+    for msg in reversed(older):
+        first_sentence = _SENTENCE_END.split((msg.get('user') or '').strip(), 1)[0]
+        topic = truncate_to_tokens(first_sentence, 20)
+        cost = estimate_tokens(topic) + 1
+        if not topic or used + cost > summary_cap:
+            break
+        topics.append(topic)
+        used += cost
+    summary = '; '.join(reversed(topics))
+
+    recent_lines = []
+    for msg in recent:
+        recent_lines.append(f"User (earlier): {truncate_to_tokens(msg.get('user', ''), turn_cap)}")
+        recent_lines.append(f"Assistant (earlier): {truncate_to_tokens(msg.get('assistant', ''), turn_cap)}")
+    return summary, '\n'.join(recent_lines)
+
+
+class PromptBuilder:
+    """Assembles a prompt from named sections within an input token budget.
+
+    Required sections are always kept. Optional sections are added in
+    priority order (lower number first) and truncated or dropped once the
+    budget runs out; the final prompt keeps the order the sections were added.
+    """
+
+    def __init__(self, endpoint, budget=None):
+        self.endpoint = endpoint
+        self.budget = budget or PROMPT_BUDGETS.get(endpoint, PROMPT_BUDGETS['default'])
+        self._sections = []
+
+    def add(self, name, text, priority=5, required=False):
+        if text:
+            self._sections.append({'name': name, 'text': text, 'priority': priority, 'required': required})
+        return self
+
+    def build(self):
+        """Return (prompt, report) where report lists the estimated tokens per section"""
+        remaining = self.budget
+        kept = {}
+        for section in self._sections:
+            if section['required']:
+                kept[section['name']] = section['text']
+                remaining -= estimate_tokens(section['text']) + 1
+
+        dropped = []
+        for section in sorted((s for s in self._sections if not s['required']), key=lambda s: s['priority']):
+            cost = estimate_tokens(section['text']) + 1  # +1 for the blank line between sections
+            if cost <= remaining:
+                kept[section['name']] = section['text']
+                remaining -= cost
+            elif remaining > 20:
+                kept[section['name']] = truncate_to_tokens(section['text'], remaining - 2)
+                remaining = 0
+            else:
+                dropped.append(section['name'])
+
+        parts = [kept[s['name']] for s in self._sections if s['name'] in kept]
+        prompt = '\n\n'.join(parts)
+        report = {
+            'endpoint': self.endpoint,
+            'budget': self.budget,
+            'total_tokens': estimate_tokens(prompt),
+            'sections': {name: estimate_tokens(text) for name, text in kept.items()},
+            'dropped': dropped
+        }
+        prompt_stats.record(report)
+        return prompt, report
+
+
+class PromptStats:
+    """Running prompt-size statistics per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, report):
+        logger.debug(f"Prompt for {report['endpoint']}: ~{report['total_tokens']} tokens "
+                     f"(budget {report['budget']}) sections={report['sections']} dropped={report['dropped']}")
+        with self._lock:
+            stats = self._stats.setdefault(report['endpoint'], {'calls': 0, 'total_tokens': 0, 'max_tokens': 0, 'over_budget': 0})
+            stats['calls'] += 1
+            stats['total_tokens'] += report['total_tokens']
+            stats['max_tokens'] = max(stats['max_tokens'], report['total_tokens'])
+            if report['total_tokens'] > report['budget']:
+                stats['over_budget'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(stats, avg_tokens=round(stats['total_tokens'] / stats['calls'], 1))
+                for endpoint, stats in self._stats.items()
+            }
+
+
+prompt_stats = PromptStats()
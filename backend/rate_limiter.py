@@ -0,0 +1,160 @@
+"""
+Client-side token-bucket rate limiter for the Gemini quota, shared across worker processes via SQLite
+"""
+import os
+import time
+import sqlite3
+import threading
+
+_ROOT = os.path.dirname(__file__)
+_LIMITER_DB = os.getenv("RATE_LIMIT_DB", os.path.join(_ROOT, 'data', 'rate_limit.db'))
+
+# Per-priority settings: how long a caller may queue, and which share of each
+# bucket it must leave untouched for higher-priority callers.
+PRIORITIES = {
+    'high': {'max_wait': float(os.getenv("RATE_LIMIT_MAX_WAIT_HIGH", "5")), 'reserve': 0.0},
+    'normal': {'max_wait': float(os.getenv("RATE_LIMIT_MAX_WAIT_NORMAL", "2")), 'reserve': 0.1},
+    'low': {'max_wait': float(os.getenv("RATE_LIMIT_MAX_WAIT_LOW", "0.5")), 'reserve': 0.25},
+}
+POLL_INTERVAL = 0.1
+
+
+class RateLimitExceeded(Exception):
+    """No quota became available within the caller's bounded wait"""
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) used before the real count is known"""
+    return max(1, len(text or '') // 4)
+
+
+class TokenBucketLimiter:
+    """Requests-per-minute and tokens-per-minute buckets kept in one SQLite row each.
+
+    Every check runs inside a BEGIN IMMEDIATE transaction, which takes the
+    database write lock, so all workers on the host draw from the same
+    buckets. A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, path=_LIMITER_DB, requests_per_minute=None, tokens_per_minute=None):
+        self.path = path
+        self.capacities = {
+            'requests': float(requests_per_minute if requests_per_minute is not None else os.getenv("GEMINI_RPM", "60")),
+            'tokens': float(tokens_per_minute if tokens_per_minute is not None else os.getenv("GEMINI_TPM", "1000000")),
+        }
+        self._initialized = False
+        self._stats_lock = threading.Lock()
+        self._stats = {p: {'acquired': 0, 'queued': 0, 'rejected': 0} for p in PRIORITIES}
+
+    @property
+    def enabled(self):
+        return any(self.capacities.values())
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+            """)
+            self._initialized = True
+        return conn
+
+    def _count(self, priority, stat, amount=1):
+        with self._stats_lock:
+            self._stats[priority][stat] += amount
+
+    def _try_take(self, conn, cost, reserve):
+        """Refill, then take cost from every bucket if all can afford it; else seconds until they could"""
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            levels = {}
+            for name, capacity in self.capacities.items():
+                if not capacity:
+                    continue
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?;", (name,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                levels[name] = min(capacity, tokens + (now - updated) * capacity / 60.0)
+
+            wait = 0.0
+            for name, level in levels.items():
+                capacity = self.capacities[name]
+                needed = min(cost[name], capacity) + reserve * capacity
+                if level < needed:
+                    wait = max(wait, (needed - level) * 60.0 / capacity)
+
+            if wait == 0.0:
+                for name in levels:
+                    levels[name] -= cost[name]
+            for name, level in levels.items():
+                conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?);",
+                             (name, level, now))
+            conn.execute("COMMIT;")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            raise
+        return wait
+
+    def acquire(self, tokens, priority='normal'):
+        """Block until one request and `tokens` tokens are available, or raise RateLimitExceeded"""
+        if not self.enabled:
+            return
+        settings = PRIORITIES.get(priority, PRIORITIES['normal'])
+        priority = priority if priority in PRIORITIES else 'normal'
+        cost = {'requests': 1, 'tokens': tokens}
+        deadline = time.monotonic() + settings['max_wait']
+        queued = False
+
+        conn = self._connect()
+        try:
+            while True:
+                wait = self._try_take(conn, cost, settings['reserve'])
+                if wait == 0.0:
+                    self._count(priority, 'acquired')
+                    return
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    self._count(priority, 'rejected')
+                    raise RateLimitExceeded(f'Gemini quota exhausted for {priority} priority; retry in {wait:.1f}s')
+                if not queued:
+                    self._count(priority, 'queued')
+                    queued = True
+                time.sleep(min(wait, POLL_INTERVAL))
+        finally:
+            conn.close()
+
+    def reconcile(self, estimated, actual):
+        """Correct the token bucket once the real usage of a call is known"""
+        delta = estimated - actual
+        if not delta or not self.capacities['tokens']:
+            return
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            conn.execute("UPDATE buckets SET tokens = MIN(?, tokens + ?) WHERE name = 'tokens';",
+                         (self.capacities['tokens'], delta))
+            conn.execute("COMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = {p: dict(s) for p, s in self._stats.items()}
+        return {
+            'requests_per_minute': self.capacities['requests'],
+            'tokens_per_minute': self.capacities['tokens'],
+            'priorities': stats
+        }
+
+
+gemini_limiter = TokenBucketLimiter()
@@ -0,0 +1,123 @@
+"""
+Per-endpoint request body limits and incremental JSON / NDJSON readers for large payloads
+"""
+import os
+import json
+import codecs
+
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+from resume_extract import MAX_FILE_BYTES
+
+
+def _kb(name, default):
+    return int(os.getenv(name, str(default))) * 1024
+
+
+# Largest accepted body per Flask endpoint; anything else gets DEFAULT_BODY_LIMIT
+BODY_LIMITS = {
+    'analyze_resume': _kb("BODY_LIMIT_RESUME_KB", 512),
+    # Room for the multipart framing and form fields around the file
+    'upload_resume': MAX_FILE_BYTES + 64 * 1024,
+    'batch_analyze_resumes': _kb("BODY_LIMIT_BATCH_KB", 20 * 1024),
+}
+DEFAULT_BODY_LIMIT = _kb("BODY_LIMIT_DEFAULT_KB", 256)
+# A single record of a batch body
+MAX_RECORD_BYTES = _kb("BODY_LIMIT_RECORD_KB", 512)
+READ_CHUNK = 64 * 1024
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+
+def body_limit(endpoint):
+    return BODY_LIMITS.get(endpoint, DEFAULT_BODY_LIMIT)
+
+
+def format_size(size):
+    return f'{size / (1024 * 1024):g} MB' if size >= 1024 * 1024 else f'{size // 1024} KB'
+
+
+def iter_ndjson(stream, max_record_bytes=MAX_RECORD_BYTES):
+    """Yield one parsed value per non-blank line, holding at most one record in memory"""
+    buffer, line_no = b'', 0
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        lines = (buffer + chunk).split(b'\n')
+        # The last piece is an unfinished line unless the body has ended
+        buffer = lines.pop() if chunk else b''
+        for line in lines:
+            line_no += 1
+            if len(line) > max_record_bytes:
+                raise RequestEntityTooLarge(f'Line {line_no} is larger than {format_size(max_record_bytes)}')
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise BadRequest(f'Line {line_no} is not valid JSON: {e}')
+        if not chunk:
+            return
+        if len(buffer) > max_record_bytes:
+            raise RequestEntityTooLarge(f'Line {line_no + 1} is larger than {format_size(max_record_bytes)}')
+
+
+def iter_json_array(stream, max_record_bytes=MAX_RECORD_BYTES):
+    """Yield the elements of a top-level JSON array one at a time as they arrive"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer, eof, state, index = '', False, 'open', 0
+
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer and eof:
+            if state == 'done':
+                return
+            raise BadRequest('Unexpected end of JSON array')
+        if buffer and state == 'done':
+            raise BadRequest('Unexpected data after the JSON array')
+
+        if buffer and state == 'open':
+            if buffer[0] != '[':
+                raise BadRequest('Expected a JSON array or an NDJSON body')
+            buffer, state = buffer[1:], 'first'
+            continue
+        if buffer and state in ('first', 'separator') and buffer[0] == ']':
+            buffer, state = buffer[1:], 'done'
+            continue
+        if buffer and state == 'separator':
+            if buffer[0] != ',':
+                raise BadRequest(f'Expected "," or "]" after element {index - 1}')
+            buffer, state = buffer[1:], 'value'
+            continue
+        if buffer and state in ('first', 'value'):
+            try:
+                value, end = decoder.raw_decode(buffer)
+                # A value running to the end of the buffer (e.g. a number) may continue in the next chunk
+                complete = end < len(buffer) or eof
+            except ValueError as e:
+                if eof:
+                    raise BadRequest(f'Element {index} is not valid JSON: {e}')
+                complete = False
+            if complete and end > max_record_bytes:
+                raise RequestEntityTooLarge(f'Element {index} is larger than {format_size(max_record_bytes)}')
+            if complete:
+                yield value
+                buffer, state, index = buffer[end:], 'separator', index + 1
+                continue
+            if len(buffer) > max_record_bytes:
+                raise RequestEntityTooLarge(f'Element {index} is larger than {format_size(max_record_bytes)}')
+
+        chunk = stream.read(READ_CHUNK)
+        eof = not chunk
+        try:
+            buffer += utf8.decode(chunk, final=eof)
+        except UnicodeDecodeError as e:
+            raise BadRequest(f'Body is not valid UTF-8: {e}')
+
+
+def iter_records(stream, mimetype, max_record_bytes=MAX_RECORD_BYTES):
+    """NDJSON bodies are read line by line, anything else as a streamed JSON array"""
+    if mimetype in NDJSON_MIMETYPES:
+        return iter_ndjson(stream, max_record_bytes)
+    return iter_json_array(stream, max_record_bytes)
@@ -0,0 +1,180 @@
+"""
+Learning-resource catalog (data/resources.json) indexed by canonical skill ID and alias, covering every role skill
+"""
+import os
+import re
+import json
+import bisect
+import difflib
+import hashlib
+import logging
+import threading
+from urllib.parse import quote_plus
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(__file__)
+_RESOURCES_FILE = os.getenv("RESOURCES_FILE", os.path.join(_ROOT, 'data', 'resources.json'))
+
+# Queries shorter than this are only matched exactly
+MIN_PREFIX_CHARS = 3
+FUZZY_CUTOFF = 0.8
+# Resolved non-exact queries kept per process
+MAX_RESOLVED = 2048
+MAX_LINKS = 3
+
+# Separators inside composite role skills such as "React/Vue/Angular" or "Version Control (Git)"
+_SKILL_PARTS = re.compile(r'\s*(?:/|,|&|\(|\)|\bor\b|\band\b)\s*')
+
+
+def normalize_key(skill):
+    return ' '.join((skill or '').lower().split())
+
+
+def search_links(name):
+    """Generic course-search links for a skill without curated resources"""
+    return [
+        {'title': f'Search for "{name}" courses on Coursera', 'url': f'https://www.coursera.org/search?query={quote_plus(name)}'},
+        {'title': f'"{name}" tutorials on YouTube', 'url': f'https://www.youtube.com/results?search_query={quote_plus(name + " tutorial")}'}
+    ]
+
+
+class ResourceCatalog:
+    """Curated entries from the JSON file plus one generated entry per role skill.
+
+    Every ID and alias maps to its entry in a dict, so exact lookups are
+    constant time. Other queries fall back to a prefix match over the sorted
+    keys and then to difflib; those answers are memoized. Role skills without
+    curated resources borrow the links of any curated skill they name
+    ("Version Control (Git)" -> Git) and add search links.
+    """
+
+    def __init__(self, path=_RESOURCES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._curated = []
+        self._index = {}
+        self._keys = []
+        self._resolved = {}
+        self._role_skills = set()
+        self.version = None
+        self.loaded = False
+
+    def _load_curated(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('skills', [])
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load resource catalog from {self.path}: {e}")
+            return []
+
+    def build(self, roles=()):
+        """(Re)build the index from the curated file and the skills of `roles`"""
+        curated = self._load_curated()
+        index = {}
+        for entry in curated:
+            entry = dict(entry, curated=True)
+            for key in [entry['id'], entry.get('name', '')] + entry.get('aliases', []):
+                key = normalize_key(key)
+                if key:
+                    index.setdefault(key, entry)
+
+        role_skills = set()
+        for role in roles or []:
+            for item in role.get('requiredSkills', []):
+                role_skills.add(item['skill'] if isinstance(item, dict) else item)
+        for name in sorted(role_skills):
+            key = normalize_key(name)
+            if key and key not in index:
+                index[key] = self._generated_entry(name, index)
+
+        fingerprint = json.dumps([curated, sorted(role_skills)], sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            self._curated = curated
+            self._index = index
+            self._keys = sorted(index)
+            self._resolved = {}
+            self._role_skills = role_skills
+            self.version = hashlib.blake2b(fingerprint.encode('utf-8'), digest_size=8).hexdigest()
+            self.loaded = True
+        logger.info(f"Resource catalog: {len(curated)} curated skills, {len(index)} keys (version {self.version})")
+
+    def add_role_skills(self, role):
+        """Index the skills of a newly added role"""
+        self.build([{'requiredSkills': sorted(self._role_skills)}, role])
+
+    @staticmethod
+    def _generated_entry(name, index):
+        links, seen = [], set()
+        for part in _SKILL_PARTS.split(name):
+            entry = index.get(normalize_key(part))
+            if not entry or not entry.get('curated'):
+                continue
+            for link in entry['resources']:
+                if link['url'] not in seen:
+                    seen.add(link['url'])
+                    links.append(link)
+        return {
+            'id': normalize_key(name),
+            'name': name,
+            'aliases': [],
+            'resources': links[:MAX_LINKS] + search_links(name)[:1 if links else 2],
+            'curated': False
+        }
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.build()
+
+    def _closest(self, key):
+        """Prefix or fuzzy match for a key that is not indexed, as (matched key, match type)"""
+        if len(key) >= MIN_PREFIX_CHARS:
+            position = bisect.bisect_left(self._keys, key)
+            candidates = []
+            while position < len(self._keys) and self._keys[position].startswith(key):
+                candidates.append(self._keys[position])
+                position += 1
+            if candidates:
+                return min(candidates, key=len), 'prefix'
+        close = difflib.get_close_matches(key, self._keys, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return close[0], 'fuzzy'
+        return None, None
+
+    def lookup(self, skill):
+        """(entry, match type) for a skill; match type is exact, prefix, fuzzy or None"""
+        self._ensure_loaded()
+        key = normalize_key(skill)
+        entry = self._index.get(key)
+        if entry is not None:
+            return entry, 'exact'
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            resolved = self._closest(key) if key else (None, None)
+            with self._lock:
+                if len(self._resolved) >= MAX_RESOLVED:
+                    self._resolved.clear()
+                self._resolved[key] = resolved
+        matched, match_type = resolved
+        entry = self._index.get(matched) if matched else None
+        return (entry, match_type) if entry else (None, None)
+
+    def resources_for(self, skill):
+        entry, _ = self.lookup(skill)
+        return entry['resources'] if entry else search_links(skill)
+
+    def curated_resources(self):
+        """{skill id: links} for the curated entries"""
+        self._ensure_loaded()
+        return {entry['id']: entry['resources'] for entry in self._curated}
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'curated': len(self._curated),
+            'keys': len(self._index),
+            'resolved': len(self._resolved)
+        }
+
+
+resource_catalog = ResourceCatalog()
@@ -0,0 +1,240 @@
+"""
+Near-duplicate resume detection - one-permutation MinHash signatures over word shingles with an LSH band index
+"""
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import random
+import sqlite3
+import threading
+from array import array
+
+_ROOT = os.path.dirname(__file__)
+_INDEX_FILE = os.getenv("RESUME_INDEX_DB", os.path.join(_ROOT, 'data', 'resume_index.db'))
+
+# 128 signature slots split into 32 bands of 4 rows: pairs above ~0.45 Jaccard
+# almost always share a band, so the exact signature comparison sees them.
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+DUPLICATE_THRESHOLD = float(os.getenv("RESUME_DUPLICATE_THRESHOLD", "0.9"))
+SIMILAR_THRESHOLD = float(os.getenv("RESUME_SIMILAR_THRESHOLD", "0.5"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+_SLOT_BITS = NUM_PERM.bit_length() - 1
+_SLOT_MASK = NUM_PERM - 1
+# Offset added per step when an empty slot borrows its neighbour's value
+_DENSIFY_STEP = 0x9E3779B1
+_TOKEN_RE = re.compile(r'[a-z0-9+#.]+')
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = random.Random(1729)
+_HASH_A, _HASH_B = _rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)
+
+
+def shingle_resume(text, size=SHINGLE_SIZE):
+    """Break resume text into a set of hashed word shingles"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    return {
+        zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+def minhash_signature(shingles):
+    """One-permutation MinHash: hash every shingle once, keep the minimum per slot.
+
+    The low bits of the hash pick one of NUM_PERM slots and the rest is the
+    value, so a resume costs one hash per shingle instead of NUM_PERM. Empty
+    slots (short resumes) borrow the next filled slot's value shifted by the
+    distance (rotation densification), which keeps the estimate unbiased.
+    """
+    signature = [_MAX_HASH] * NUM_PERM
+    filled = [False] * NUM_PERM
+    for x in shingles:
+        h = (_HASH_A * x + _HASH_B) % _MERSENNE_PRIME
+        slot = h & _SLOT_MASK
+        value = (h >> _SLOT_BITS) & _MAX_HASH
+        if not filled[slot] or value < signature[slot]:
+            signature[slot] = value
+            filled[slot] = True
+    if any(filled) and not all(filled):
+        dense = list(signature)
+        for slot in range(NUM_PERM):
+            if not filled[slot]:
+                distance = 1
+                while not filled[(slot + distance) & _SLOT_MASK]:
+                    distance += 1
+                dense[slot] = (signature[(slot + distance) & _SLOT_MASK] + distance * _DENSIFY_STEP) & _MAX_HASH
+        signature = dense
+    return array('I', signature)
+
+
+def resume_signature(resume_text):
+    """Signature of a resume's text; compute once and pass it to find_duplicate and add"""
+    return minhash_signature(shingle_resume(resume_text))
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimate Jaccard similarity from two MinHash signatures"""
+    equal = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return equal / NUM_PERM
+
+
+def _band_keys(signature):
+    return [
+        hash(tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+        for band in range(BANDS)
+    ]
+
+
+class ResumeIndex:
+    """MinHash/LSH index of analyzed resumes, persisted to SQLite.
+
+    Every worker keeps the signatures in memory and pulls rows written by
+    other workers incrementally (by rowid) before each lookup.
+    """
+
+    def __init__(self, path=_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signatures = {}
+        self._meta = {}
+        self._buckets = [dict() for _ in range(BANDS)]
+        self._last_rowid = 0
+        self._initialized = False
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resumes (
+                    resume_id TEXT PRIMARY KEY,
+                    career_type TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created REAL NOT NULL
+                );
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+        self._initialized = True
+
+    def _index(self, resume_id, career_type, signature):
+        self._signatures[resume_id] = signature
+        self._meta[resume_id] = career_type
+        for band, key in enumerate(_band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(resume_id)
+
+    def _sync(self):
+        """Load rows added since the last sync (possibly by another worker)."""
+        self._ensure_schema()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT rowid, resume_id, career_type, signature FROM resumes WHERE rowid > ? ORDER BY rowid;",
+                (self._last_rowid,)
+            ).fetchall()
+        finally:
+            conn.close()
+        for rowid, resume_id, career_type, blob in rows:
+            signature = array('I')
+            signature.frombytes(blob)
+            self._index(resume_id, career_type, signature)
+            self._last_rowid = rowid
+
+    def _candidates(self, signature):
+        found = set()
+        for band, key in enumerate(_band_keys(signature)):
+            found.update(self._buckets[band].get(key, ()))
+        return found
+
+    def _load_analysis(self, resume_id):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT analysis FROM resumes WHERE resume_id = ?;", (resume_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def _ranked_matches(self, signature, threshold, career_type=None):
+        matches = []
+        for resume_id in self._candidates(signature):
+            if career_type and self._meta.get(resume_id) != career_type:
+                continue
+            similarity = estimate_similarity(signature, self._signatures[resume_id])
+            if similarity >= threshold:
+                matches.append((similarity, resume_id))
+        matches.sort(reverse=True)
+        return matches
+
+    def find_duplicate(self, resume_text, career_type, threshold=DUPLICATE_THRESHOLD, signature=None):
+        """Return the closest stored analysis for the same career type above threshold, or None"""
+        if signature is None:
+            signature = resume_signature(resume_text)
+        with self._lock:
+            self._sync()
+            matches = self._ranked_matches(signature, threshold, career_type)
+        for similarity, resume_id in matches:
+            analysis = self._load_analysis(resume_id)
+            if analysis is not None:
+                return {'resumeId': resume_id, 'similarity': round(similarity, 3), 'analysis': analysis}
+        return None
+
+    def find_similar(self, resume_text, threshold=SIMILAR_THRESHOLD, limit=10, career_type=None):
+        """Find stored resumes similar to the given text, most similar first"""
+        signature = resume_signature(resume_text)
+        with self._lock:
+            self._sync()
+            matches = self._ranked_matches(signature, threshold, career_type)[:limit]
+
+        results = []
+        for similarity, resume_id in matches:
+            analysis = self._load_analysis(resume_id) or {}
+            results.append({
+                'resumeId': resume_id,
+                'similarity': round(similarity, 3),
+                'careerType': self._meta.get(resume_id),
+                'experienceLevel': analysis.get('experienceLevel'),
+                'skills': analysis.get('skills', []),
+                'profileScore': analysis.get('profileStrength', {}).get('score')
+            })
+        return results
+
+    def add(self, resume_text, career_type, analysis, signature=None):
+        """Store a resume's signature and analysis; returns the new resume id"""
+        resume_id = uuid.uuid4().hex
+        if signature is None:
+            signature = resume_signature(resume_text)
+        with self._lock:
+            self._ensure_schema()
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT INTO resumes (resume_id, career_type, signature, analysis, created) VALUES (?, ?, ?, ?, ?);",
+                    (resume_id, career_type, signature.tobytes(), json.dumps(analysis), time.time())
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            # Picks up our own row (and anything other workers wrote) in rowid order
+            self._sync()
+        return resume_id
+
+
+resume_index = ResumeIndex()
@@ -0,0 +1,203 @@
+"""
+Text extraction for uploaded resume files (PDF, DOCX, TXT) on a bounded worker pool with size, page and time limits
+"""
+import os
+import time
+import codecs
+import zipfile
+import logging
+import tempfile
+import threading
+import concurrent.futures
+import xml.etree.ElementTree as ET
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+logger = logging.getLogger(__name__)
+
+# Lazy import of pypdf so the backend still runs without PDF support
+try:
+    import pypdf
+    _HAS_PYPDF = True
+except Exception:
+    pypdf = None
+    _HAS_PYPDF = False
+
+MAX_FILE_BYTES = int(os.getenv("RESUME_MAX_FILE_BYTES", str(5 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "20"))
+MAX_TEXT_CHARS = int(os.getenv("RESUME_MAX_TEXT_CHARS", "100000"))
+EXTRACT_TIMEOUT = float(os.getenv("RESUME_EXTRACT_TIMEOUT", "10"))
+EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", "2"))
+# Extractions allowed to wait for a worker before new uploads are turned away
+EXTRACT_QUEUE = int(os.getenv("RESUME_EXTRACT_QUEUE", "8"))
+# Uploads are spooled to disk once they pass this size
+SPOOL_MEMORY_BYTES = 64 * 1024
+SPOOL_DIR = os.getenv("RESUME_SPOOL_DIR") or None
+# A DOCX is a zip; refuse document.xml entries that inflate beyond this
+MAX_DOCX_XML_BYTES = 20 * 1024 * 1024
+
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    """The file could not be turned into text; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=422):
+        super().__init__(message)
+        self.status = status
+
+
+class CappedSpool(tempfile.SpooledTemporaryFile):
+    """Spooled temp file that stops the upload as soon as it grows past max_bytes"""
+
+    def __init__(self, max_bytes=MAX_FILE_BYTES):
+        super().__init__(max_size=SPOOL_MEMORY_BYTES, mode='w+b', dir=SPOOL_DIR)
+        self.max_bytes = max_bytes
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+        if self.written > self.max_bytes:
+            raise RequestEntityTooLarge(f'Resume files are limited to {self.max_bytes // (1024 * 1024)} MB')
+        return super().write(data)
+
+
+def detect_type(stream, filename):
+    """'pdf', 'docx' or 'txt' from the file's magic bytes, falling back to its extension"""
+    head = stream.read(8)
+    stream.seek(0)
+    if head.startswith(b'%PDF'):
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        return 'docx'
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext in ('.txt', '.text', '.md', ''):
+        return 'txt'
+    raise ExtractionError(f'Unsupported resume file type {ext}; upload a PDF, DOCX or TXT file', status=415)
+
+
+def _check_deadline(deadline):
+    if time.monotonic() > deadline:
+        raise ExtractionError('Resume text extraction took too long', status=422)
+
+
+def extract_pdf(stream, deadline):
+    if not _HAS_PYPDF:
+        raise ExtractionError('PDF support is not installed on this server (pypdf); upload DOCX or TXT', status=415)
+    try:
+        reader = pypdf.PdfReader(stream)
+        if reader.is_encrypted:
+            raise ExtractionError('Password-protected PDFs are not supported')
+        if len(reader.pages) > MAX_PAGES:
+            raise ExtractionError(f'Resume PDFs are limited to {MAX_PAGES} pages')
+        parts, size = [], 0
+        for page in reader.pages:
+            _check_deadline(deadline)
+            text = page.extract_text() or ''
+            parts.append(text)
+            size += len(text)
+            if size >= MAX_TEXT_CHARS:
+                break
+        return '\n'.join(parts)
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f'Could not read PDF: {e}')
+
+
+def extract_docx(stream, deadline):
+    """Paragraph text from word/document.xml, parsed incrementally"""
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            try:
+                info = archive.getinfo('word/document.xml')
+            except KeyError:
+                raise ExtractionError('Not a Word document (word/document.xml missing)')
+            if info.file_size > MAX_DOCX_XML_BYTES:
+                raise ExtractionError('Word document is too large to process')
+            paragraphs, current, size = [], [], 0
+            with archive.open(info) as xml_file:
+                for event, elem in ET.iterparse(xml_file, events=('end',)):
+                    if elem.tag == f'{_W_NS}t' and elem.text:
+                        current.append(elem.text)
+                    elif elem.tag == f'{_W_NS}tab':
+                        current.append('\t')
+                    elif elem.tag == f'{_W_NS}p':
+                        paragraphs.append(''.join(current))
+                        size += len(paragraphs[-1])
+                        current = []
+                        elem.clear()
+                        if size >= MAX_TEXT_CHARS:
+                            break
+                        _check_deadline(deadline)
+            return '\n'.join(paragraphs)
+    except ExtractionError:
+        raise
+    except (zipfile.BadZipFile, ET.ParseError) as e:
+        raise ExtractionError(f'Could not read Word document: {e}')
+
+
+def _decode(data, encoding, truncated):
+    # A read cut at the size limit can split the last character; final=False leaves it out
+    return codecs.getincrementaldecoder(encoding)().decode(data, final=not truncated)
+
+
+def extract_txt(stream, deadline):
+    """UTF-16 only with a BOM; otherwise UTF-8, then cp1252, then latin-1 (which accepts any bytes)"""
+    data = stream.read(MAX_TEXT_CHARS * 4)
+    truncated = len(data) == MAX_TEXT_CHARS * 4
+    encodings = ['utf-8-sig', 'cp1252', 'latin-1']
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encodings.insert(0, 'utf-16')
+    for encoding in encodings:
+        try:
+            return _decode(data, encoding, truncated)[:MAX_TEXT_CHARS]
+        except UnicodeDecodeError:
+            continue
+
+
+_EXTRACTORS = {'pdf': extract_pdf, 'docx': extract_docx, 'txt': extract_txt}
+
+
+class ResumeExtractor:
+    """Runs extractions on a small thread pool.
+
+    At most `workers` files are parsed at once and at most `queue` more may
+    wait; beyond that uploads are rejected with 503 instead of piling up.
+    Each extraction checks its deadline between pages/paragraphs, so a
+    request that times out also stops its worker shortly after.
+    """
+
+    def __init__(self, workers=EXTRACT_WORKERS, queue=EXTRACT_QUEUE, timeout=EXTRACT_TIMEOUT):
+        self.timeout = timeout
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def _run(self, stream, kind, deadline):
+        try:
+            _check_deadline(deadline)
+            return _EXTRACTORS[kind](stream, deadline)
+        finally:
+            self._slots.release()
+
+    def extract(self, stream, filename):
+        """Text of an uploaded file stream; raises ExtractionError"""
+        kind = detect_type(stream, filename)
+        if not self._slots.acquire(blocking=False):
+            raise ExtractionError('Too many resumes are being processed; please retry shortly', status=503)
+        deadline = time.monotonic() + self.timeout
+        future = self._executor.submit(self._run, stream, kind, deadline)
+        try:
+            text = future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            if future.cancel():
+                # Never started, so _run will not release its slot
+                self._slots.release()
+            raise ExtractionError('Resume text extraction took too long', status=422)
+        text = text.strip()
+        if not text:
+            raise ExtractionError('No text found in the file (scanned PDFs are not supported)')
+        return text
+
+
+resume_extractor = ResumeExtractor()
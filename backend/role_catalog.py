@@ -0,0 +1,170 @@
+"""
+In-process role catalog: career-type filters, scoring data and learning-plan fragments precomputed per role
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Roles are re-read from the database/JSON file after this long, so roles added by another worker show up
+ROLE_CATALOG_MAX_AGE = float(os.getenv("ROLE_CATALOG_MAX_AGE", "300"))
+# Skill gaps shown per role in /api/analyze
+GAPS_PER_PLAN = 5
+# Assembled plans memoized per role for gap sets that were not precomputed
+MAX_PLANS_PER_ROLE = 64
+
+NONTECH_TAGS = ('nontech', 'healthcare', 'finance', 'education', 'marketing', 'hr', 'consulting', 'operations', 'legal')
+# Expanded matching criteria for better coverage
+GOVERNMENT_TAGS = ('government', 'ias', 'banking', 'railway', 'defense', 'ssc', 'psu', 'judiciary', 'teaching',
+                   'upsc', 'civil', 'public', 'administrative', 'clerk', 'officer', 'exam', 'competitive',
+                   'central', 'state', 'municipal', 'local', 'service', 'commission')
+GOVERNMENT_KEYWORDS = ('government', 'civil', 'public', 'administrative', 'clerk', 'officer',
+                       'ias', 'ips', 'bank', 'railway', 'defense', 'ssc', 'upsc', 'psu', 'nabard', 'rbi')
+
+# The generic weekly plan does not depend on the gaps, so every response shares this dict
+ACTION_PLAN = {
+    'week1': 'Focus on foundational skills. Aim to spend 60-90 minutes daily on learning and practice.',
+    'week2': 'Start a mini-project to apply your new skills. This will help you build a portfolio.'
+}
+
+
+def role_career_types(role):
+    """Career types ('tech', 'nontech', 'government') a role is listed under"""
+    role_tags = role.get('tags') or []
+    types = set()
+    # Tech roles: exclude roles tagged with 'nontech' or 'government'
+    if not any(tag in role_tags for tag in ('nontech', 'government')):
+        types.add('tech')
+    # Non-tech roles: include roles tagged with 'nontech' or traditional business domains
+    if any(tag in role_tags for tag in NONTECH_TAGS):
+        types.add('nontech')
+    # Government roles: tagged with a government domain, or a government keyword in the title
+    role_title_lower = role.get('title', '').lower()
+    if any(tag in role_tags for tag in GOVERNMENT_TAGS) or any(k in role_title_lower for k in GOVERNMENT_KEYWORDS):
+        types.add('government')
+    return types
+
+
+class RoleCatalog:
+    """Roles loaded once (and again after ROLE_CATALOG_MAX_AGE or an add_role) with per-role derived data.
+
+    For every role the catalog keeps the canonical required skills and total
+    weight used by scoring, the career types it belongs to, one learning-plan
+    fragment per required skill and the assembled plans for the gap sets users
+    most often have (the first skills missing, or a window further along the
+    list). /api/analyze returns those lists by reference instead of building
+    them per request; other gap sets are assembled once and memoized.
+    """
+
+    def __init__(self, max_age=ROLE_CATALOG_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._roles = []
+        self._by_title = {}
+        self._filtered = {}
+        self._loaded_at = 0.0
+        self.version = None
+        self._stats = {'loads': 0, 'plan_hits': 0, 'plan_misses': 0}
+
+    @property
+    def loaded(self):
+        return bool(self._loaded_at) and time.time() - self._loaded_at < self.max_age
+
+    def load(self, roles, canonical_skill, resources_for_skill):
+        """Precompute the derived data for `roles`"""
+        started = time.perf_counter()
+        entries = {}
+        for role in roles:
+            skills = [(canonical_skill(item['skill']), item.get('weight', 1), item['skill'])
+                      for item in role.get('requiredSkills', [])]
+            fragments = {}
+            for _, _, name in skills:
+                if name not in fragments:
+                    fragments[name] = {'category': name.title(), 'resources': resources_for_skill(name)}
+            names = [name for _, _, name in skills]
+            plans = {}
+            for start in range(max(1, len(names) - GAPS_PER_PLAN + 1)):
+                gaps = tuple(names[start:start + GAPS_PER_PLAN])
+                plans[gaps] = [fragments[name] for name in gaps]
+            entries[id(role)] = {
+                'skills': skills,
+                'total_weight': sum(weight for _, weight, _ in skills),
+                'career_types': role_career_types(role),
+                'tags': set(role.get('tags') or []),
+                'fragments': fragments,
+                'plans': plans
+            }
+        fingerprint = json.dumps(roles, sort_keys=True, ensure_ascii=False, default=str)
+        with self._lock:
+            # Content based, so a periodic reload of unchanged roles keeps the same version
+            self.version = hashlib.blake2b(fingerprint.encode('utf-8'), digest_size=8).hexdigest()
+            self._roles = list(roles)
+            # First role wins when two share a title, like the linear search it replaces
+            self._by_title = {}
+            for role in roles:
+                self._by_title.setdefault(role.get('title', '').lower(), role)
+            self._entries = entries
+            self._filtered = {}
+            self._loaded_at = time.time()
+            self._stats['loads'] += 1
+        logger.info(f"Role catalog: {len(entries)} roles precomputed in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def entry(self, role):
+        return self._entries.get(id(role))
+
+    def by_title(self, title):
+        """Role with this title (case-insensitive), or None"""
+        return self._by_title.get((title or '').lower())
+
+    def roles_for(self, career_type, domain):
+        """Roles of a career type, narrowed to a domain tag unless domain is empty or 'general'"""
+        key = (career_type, domain if domain and domain != 'general' else '')
+        roles = self._filtered.get(key)
+        if roles is None:
+            with self._lock:
+                entries = self._entries
+                roles = [role for role in self._roles
+                         if career_type in entries[id(role)]['career_types']
+                         and (not key[1] or key[1] in entries[id(role)]['tags'])]
+                self._filtered[key] = roles
+        return roles
+
+    def learning_plan(self, role, gaps):
+        """Shared plan list for a role's gap set; callers must not modify it"""
+        entry = self.entry(role)
+        gaps = tuple(gaps)
+        plan = entry['plans'].get(gaps) if entry else None
+        if plan is not None:
+            self._count('plan_hits')
+            return plan
+        self._count('plan_misses')
+        if entry is None:
+            return None
+        plan = [entry['fragments'][name] for name in gaps]
+        if len(entry['plans']) < MAX_PLANS_PER_ROLE:
+            entry['plans'][gaps] = plan
+        return plan
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['version'] = self.version
+        stats['roles'] = len(self._roles)
+        stats['plans'] = sum(len(entry['plans']) for entry in self._entries.values())
+        return stats
+
+
+role_catalog = RoleCatalog()
@@ -0,0 +1,366 @@
+"""
+Two-level cache shared by all workers on a host: in-process LRU (L1) over a pluggable shared store (L2)
+"""
+import os
+import json
+import time
+import zlib
+import marshal
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Lazy import of redis so the SQLite backend works without it
+try:
+    import redis
+    _HAS_REDIS = True
+except Exception:
+    redis = None
+    _HAS_REDIS = False
+
+_ROOT = os.path.dirname(__file__)
+_SHARED_CACHE_DB = os.getenv("SHARED_CACHE_DB", os.path.join(_ROOT, 'data', 'shared_cache.db'))
+
+# 'sqlite' (default), 'redis' (SHARED_CACHE_URL, e.g. redis://localhost:6379/0) or 'none' for L1 only
+SHARED_CACHE_BACKEND = os.getenv("SHARED_CACHE_BACKEND", "sqlite")
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "redis://localhost:6379/0")
+
+# Values larger than this are zlib-compressed before they go to L2
+COMPRESS_MIN_BYTES = 512
+_RAW, _ZLIB = b'm', b'z'
+# Expired SQLite rows are swept after this many writes
+PURGE_EVERY = 500
+
+
+def encode(value):
+    """marshal (optionally zlib-compressed) with a one-byte format tag"""
+    data = marshal.dumps(value)
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(data, 6)
+    return _RAW + data
+
+
+def decode(blob):
+    blob = bytes(blob)
+    tag, data = blob[:1], blob[1:]
+    if tag == _ZLIB:
+        data = zlib.decompress(data)
+    elif tag != _RAW:
+        raise ValueError(f'Unknown cache value format {tag!r}')
+    return marshal.loads(data)
+
+
+def make_key(*parts):
+    """Stable key for JSON-serializable parts (tuples and lists hash the same)"""
+    blob = json.dumps(parts, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(blob.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + (ttl if ttl is not None else self.ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """JSON key/value store with expiry in a local SQLite file"""
+
+    def __init__(self, path, table='cache'):
+        self.path = path
+        self.table = table
+        self._initialized = False
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires REAL NOT NULL
+                );
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?;", (key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?);",
+                             (key, json.dumps(value), time.time() + ttl))
+        finally:
+            conn.close()
+
+    def delete(self, key):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?;", (key,))
+        finally:
+            conn.close()
+
+    def purge_expired(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE expires < ?;", (time.time(),))
+        finally:
+            conn.close()
+
+
+class SQLiteBackend:
+    """L2 in a local SQLite file in WAL mode; each thread keeps its own connection"""
+
+    name = 'sqlite'
+
+    def __init__(self, path=_SHARED_CACHE_DB):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID;
+            """)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        """(blob, expires) or None"""
+        row = self._connect().execute(
+            "SELECT value, expires FROM entries WHERE namespace = ? AND key = ?;", (namespace, key)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], row[1]
+
+    def set(self, namespace, key, blob, expires):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries (namespace, key, value, expires) VALUES (?, ?, ?, ?);",
+                         (namespace, key, blob, expires))
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            with conn:
+                conn.execute("DELETE FROM entries WHERE expires < ?;", (time.time(),))
+
+    def delete(self, namespace, key):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?;", (namespace, key))
+
+    def clear(self, namespace):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ?;", (namespace,))
+
+
+class RedisBackend:
+    """L2 in Redis (or any server speaking its protocol); expiry is left to the server"""
+
+    name = 'redis'
+
+    def __init__(self, url=SHARED_CACHE_URL):
+        if not _HAS_REDIS:
+            raise RuntimeError('redis package not installed')
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+
+    def get(self, namespace, key):
+        pipe = self.client.pipeline()
+        pipe.get(f'{namespace}:{key}')
+        pipe.pttl(f'{namespace}:{key}')
+        blob, ttl_ms = pipe.execute()
+        if blob is None:
+            return None
+        return blob, time.time() + max(ttl_ms, 0) / 1000.0
+
+    def set(self, namespace, key, blob, expires):
+        self.client.set(f'{namespace}:{key}', blob, px=max(1, int((expires - time.time()) * 1000)))
+
+    def delete(self, namespace, key):
+        self.client.delete(f'{namespace}:{key}')
+
+    def clear(self, namespace):
+        for name in self.client.scan_iter(match=f'{namespace}:*', count=500):
+            self.client.delete(name)
+
+
+def create_backend(kind=SHARED_CACHE_BACKEND):
+    """Configured L2 backend, or None for in-process caching only"""
+    if kind == 'none':
+        return None
+    if kind == 'redis':
+        try:
+            return RedisBackend()
+        except Exception as e:
+            logger.error(f"Redis cache backend unavailable, using SQLite: {e}")
+    return SQLiteBackend()
+
+
+_shared_backend = None
+_backend_lock = threading.Lock()
+
+
+def shared_backend():
+    """Process-wide L2 backend, created on first use"""
+    global _shared_backend
+    with _backend_lock:
+        if _shared_backend is None:
+            _shared_backend = create_backend() or False
+    return _shared_backend or None
+
+
+class TieredCache:
+    """L1 LRUTTLCache per process in front of the shared L2 backend.
+
+    Values must be marshal-able (dicts, lists, tuples, strings, numbers,
+    None). An L2 hit is promoted to L1 with its remaining lifetime, so all
+    workers expire an entry at the same moment. L2 failures are counted and
+    treated as misses; they never fail the request.
+    """
+
+    def __init__(self, namespace, max_size, ttl, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.l1 = LRUTTLCache(max_size, ttl)
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'stores': 0, 'l2_errors': 0, 'l2_bytes_written': 0}
+
+    @property
+    def backend(self):
+        return self._backend if self._backend is not None else shared_backend()
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def get(self, key):
+        value = self.l1.get(key)
+        if value is not None:
+            self._count('l1_hits')
+            return value
+        backend = self.backend
+        if backend is not None:
+            try:
+                found = backend.get(self.namespace, key)
+                if found is not None:
+                    value = decode(found[0])
+                    self.l1.set(key, value, ttl=found[1] - time.time())
+                    self._count('l2_hits')
+                    return value
+            except Exception as e:
+                logger.warning(f"Shared cache read failed ({self.namespace}): {e}")
+                self._count('l2_errors')
+        self._count('misses')
+        return None
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        self.l1.set(key, value, ttl=ttl)
+        self._count('stores')
+        backend = self.backend
+        if backend is None:
+            return
+        try:
+            blob = encode(value)
+            backend.set(self.namespace, key, blob, time.time() + ttl)
+            self._count('l2_bytes_written', len(blob))
+        except Exception as e:
+            logger.warning(f"Shared cache write failed ({self.namespace}): {e}")
+            self._count('l2_errors')
+
+    def pop(self, key):
+        self.l1.pop(key)
+        backend = self.backend
+        if backend is not None:
+            try:
+                backend.delete(self.namespace, key)
+            except Exception as e:
+                logger.warning(f"Shared cache delete failed ({self.namespace}): {e}")
+                self._count('l2_errors')
+
+    def clear(self):
+        self.l1.clear()
+        backend = self.backend
+        if backend is not None:
+            try:
+                backend.clear(self.namespace)
+            except Exception as e:
+                logger.warning(f"Shared cache clear failed ({self.namespace}): {e}")
+                self._count('l2_errors')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats['l1_hits'] + stats['l2_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        stats['l1_entries'] = len(self.l1)
+        backend = self.backend
+        stats['l2_backend'] = backend.name if backend is not None else None
+        return stats
@@ -0,0 +1,19 @@
+"""
+Runs the backend modules offline against throwaway SQLite files and indexes
+"""
+import os
+import sys
+import tempfile
+
+_DATA = tempfile.mkdtemp(prefix='careerpath-tests-')
+
+# Module-level configuration is read at import time, so this has to happen before any backend import
+for _name, _file in [('SHARED_CACHE_DB', 'shared_cache.db'), ('RATE_LIMIT_DB', 'rate_limit.db'),
+                     ('ADVICE_WARM_DB', 'advice_warm.db'), ('ADVICE_JOBS_DB', 'advice_jobs.db'),
+                     ('RESUME_INDEX_DB', 'resume_index.db'), ('PROFILE_STORE_DB', 'profiles.db'),
+                     ('GEMINI_CONTEXT_DB', 'gemini_context.db'), ('KNOWLEDGE_INDEX_FILE', 'knowledge_index.json')]:
+    os.environ[_name] = os.path.join(_DATA, _file)
+os.environ['GEMINI_API_KEY'] = ''
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import pytest
+
+from advice_cache import AdviceCache
+from shared_cache import SQLiteBackend
+
+
+def key(**changes):
+    args = dict(user_skills=['Python', ' sql'], role_title='Data Analyst', gaps=['Tableau', 'Excel'],
+                career_type='tech', temperature=0.6, model='gemini-1.5-flash')
+    args.update(changes)
+    return AdviceCache.make_key(**args)
+
+
+def test_key_is_canonical():
+    assert key() == key(user_skills=['SQL', 'python', 'Python'], role_title=' data analyst ',
+                        gaps=['excel', 'tableau'], temperature=0.6000001)
+
+
+@pytest.mark.parametrize('change', [
+    dict(user_skills=['python']),
+    dict(role_title='Data Engineer'),
+    dict(gaps=['excel']),
+    dict(career_type='nontech'),
+    dict(temperature=0.7),
+    dict(model='gemini-2.0-flash'),
+])
+def test_key_changes(change):
+    assert key() != key(**change)
+
+
+def test_shared_between_workers(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'shared.db'))
+    AdviceCache(backend=backend).set(key(), 'advice text')
+    other = AdviceCache(backend=backend)
+    assert other.get(key()) == 'advice text'
+    assert other.get(key(gaps=[])) is None
+    assert other.stats()['saved_api_calls'] == 1
+
+
+@pytest.fixture
+def gemini(monkeypatch, tmp_path):
+    import app
+
+    monkeypatch.setattr(app, 'advice_cache', AdviceCache(backend=SQLiteBackend(str(tmp_path / 'shared.db'))))
+    answers = []
+    calls = []
+
+    def request_gemini_text(prompt, **kwargs):
+        calls.append(prompt)
+        return answers.pop(0)
+
+    monkeypatch.setattr(app, 'request_gemini_text', request_gemini_text)
+    return app, answers, calls
+
+
+def test_repeat_advice_is_served_from_cache(gemini):
+    app, answers, calls = gemini
+    answers.append('Gemini advice')
+    role = {'title': 'Data Analyst'}
+    assert app.get_gemini_advice(['python', 'sql'], role, ['tableau']) == 'Gemini advice'
+    assert app.get_gemini_advice(['SQL', 'Python'], role, ['Tableau']) == 'Gemini advice'
+    assert len(calls) == 1
+
+
+def test_fallback_text_is_not_cached(gemini):
+    app, answers, calls = gemini
+    answers.extend([None, None, 'Gemini advice'])
+    role = {'title': 'Data Analyst'}
+    assert app.get_gemini_advice(['python'], role, ['sql'], fallback=False) is None
+    assert app.get_gemini_advice(['python'], role, ['sql']) not in (None, 'Gemini advice')
+    assert app.get_gemini_advice(['python'], role, ['sql']) == 'Gemini advice'
+    assert len(calls) == 3
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from advice_jobs import AdviceJobs
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    return AdviceJobs(str(tmp_path / 'jobs.db'), max_workers=2)
+
+
+def test_ready_with_advice(jobs):
+    job_id = jobs.submit(lambda skills, fallback: f'advice for {skills} ({fallback})', 'python', fallback=False)
+    assert jobs.wait(job_id, 5) == 'advice for python (False)'
+    assert jobs.get(job_id) == {'status': 'ready', 'advice': 'advice for python (False)'}
+
+
+def test_pending_until_done(jobs):
+    release = threading.Event()
+    job_id = jobs.submit(lambda: release.wait(5) and 'done')
+    assert jobs.get(job_id) == {'status': 'pending'}
+    assert jobs.wait(job_id, 0.01) is None
+    release.set()
+    assert jobs.wait(job_id, 5) == 'done'
+
+
+def test_no_advice_is_failed(jobs):
+    # get_gemini_advice(..., fallback=False) returns None when Gemini fails
+    job_id = jobs.submit(lambda: None)
+    assert jobs.wait(job_id, 5) is None
+    assert jobs.get(job_id) == {'status': 'failed'}
+
+
+def test_exception_is_failed(jobs):
+    def broken():
+        raise RuntimeError('boom')
+    job_id = jobs.submit(broken)
+    assert jobs.wait(job_id, 5) is None
+    assert jobs.get(job_id) == {'status': 'failed'}
+
+
+def test_other_worker_reads_stored_result(jobs, tmp_path):
+    job_id = jobs.submit(lambda: 'shared')
+    jobs.wait(job_id, 5)
+    other = AdviceJobs(str(tmp_path / 'jobs.db'), max_workers=1)
+    assert other.wait(job_id, 0) == 'shared'
+    assert other.get('unknown') is None
+
+
+def test_deferred_analyze_serves_cached_advice(monkeypatch, tmp_path):
+    import app
+    from advice_cache import AdviceCache
+    from shared_cache import SQLiteBackend
+
+    monkeypatch.setattr(app, 'advice_cache', AdviceCache(backend=SQLiteBackend(str(tmp_path / 'shared.db'))))
+    monkeypatch.setattr(app, 'is_gemini_available', lambda: True)
+    submitted = []
+    monkeypatch.setattr(app.advice_jobs, 'submit', lambda fn, *args, **kwargs: submitted.append(args) or 'job-1')
+    client = app.app.test_client()
+    body = {'mode': 'quick', 'skills': 'python, sql, statistics', 'careerType': 'tech', 'adviceMode': 'deferred'}
+
+    first = client.post('/api/analyze', json=body).get_json()
+    assert first['adviceStatus'] == 'pending' and first['adviceId'] == 'job-1'
+    assert len(submitted) == 1
+
+    user_skills, top_role, gaps, career_type = submitted[0]
+    app.advice_cache.set(app.advice_cache_key(user_skills, top_role, gaps, career_type), 'Cached Gemini advice')
+    second = client.post('/api/analyze', json=body).get_json()
+    assert second['adviceStatus'] == 'ready' and 'adviceId' not in second
+    assert second['aiAdvice'] == 'Cached Gemini advice'
+    assert len(submitted) == 1
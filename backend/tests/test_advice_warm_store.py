@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+import advice_warm_store
+from advice_warm_store import AdviceWarmStore, signature
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long interval so only explicit flushes write
+    return AdviceWarmStore(str(tmp_path / 'warm.db'), flush_interval=3600)
+
+
+def stored_hits(store):
+    conn = store._connect()
+    try:
+        return conn.execute("SELECT COALESCE(SUM(hits), 0) FROM signatures;").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_signature_ignores_gap_order_and_case():
+    assert signature('Data Scientist ', ['SQL', 'python'], 'tech') == signature('data scientist', ['Python', 'sql'], 'tech')
+    assert signature('Data Scientist', [], None)[2] == 'tech'
+
+
+def test_record_signature_is_buffered(store):
+    store.record_signature('Data Scientist', ['sql', 'python'], 'tech')
+    store.record_signature('data scientist', ['python', 'sql'], 'tech')
+    store.record_signature('Clerk', ['typing'], 'government')
+    assert store.stats()['pending_signatures'] == 2
+    assert stored_hits(store) == 0
+
+    assert store.top_signatures() == [('Data Scientist', ['sql', 'python'], 'tech', 2),
+                                      ('Clerk', ['typing'], 'government', 1)]
+    assert store.stats()['pending_signatures'] == 0
+
+
+def test_flush_adds_to_stored_counts(store):
+    for _ in range(3):
+        store.record_signature('Clerk', ['typing'], 'government')
+        store.flush()
+    assert store.top_signatures() == [('Clerk', ['typing'], 'government', 3)]
+
+
+def test_early_flush_when_many_pending(store, monkeypatch):
+    monkeypatch.setattr(advice_warm_store, 'SIGNATURE_FLUSH_MAX_PENDING', 2)
+    store.record_signature('A', ['x'], 'tech')
+    store.record_signature('B', ['y'], 'tech')
+    # The background thread writes them without waiting for the interval
+    deadline = time.time() + 5
+    while stored_hits(store) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert stored_hits(store) == 2
+
+
+def test_get_serves_fresh_gemini_advice_only(store):
+    assert store.get('Clerk', ['typing'], 'government') is None
+    store.put('Clerk', ['typing'], 'government', 'local advice', 'local')
+    assert store.get('Clerk', ['typing'], 'government') is None
+    assert store.has_fresh('Clerk', ['typing'], 'government', 'local')
+
+    store.put('Clerk', ['typing'], 'government', 'gemini advice', 'gemini')
+    assert store.get('Clerk', ['Typing'], 'government') == 'gemini advice'
+    store.max_age = -1
+    assert store.get('Clerk', ['typing'], 'government') is None
+    assert store.stats()['hits'] == 1
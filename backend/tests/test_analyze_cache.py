@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from analyze_cache import AnalyzeCache, ResumeAnalysisCache
+from shared_cache import SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'shared.db'))
+
+
+def test_analyze_key_ignores_skill_order_and_duplicates():
+    key = AnalyzeCache.make_key(['python', 'sql'], 'tech', '', ('roles-1', 'res-1'))
+    assert key == AnalyzeCache.make_key(['sql', 'python', 'sql'], 'tech', 'general', ['roles-1', 'res-1'])
+    assert key == AnalyzeCache.make_key(['python', 'sql'], None, None, ('roles-1', 'res-1'))
+
+
+@pytest.mark.parametrize('change', [
+    dict(user_skills=['python']),
+    dict(career_type='nontech'),
+    dict(domain='finance'),
+    # A new role or resource catalog version invalidates every entry
+    dict(catalog_versions=('roles-2', 'res-1')),
+    dict(catalog_versions=('roles-1', 'res-2')),
+])
+def test_analyze_key_changes(change):
+    base = dict(user_skills=['python', 'sql'], career_type='tech', domain='', catalog_versions=('roles-1', 'res-1'))
+    assert AnalyzeCache.make_key(**base) != AnalyzeCache.make_key(**dict(base, **change))
+
+
+def test_analyze_clear(backend):
+    cache = AnalyzeCache(backend=backend)
+    key = AnalyzeCache.make_key(['python'], 'tech', '', ('v1',))
+    cache.set(key, {'roles': []})
+    assert cache.get(key) == {'roles': []}
+    cache.clear()
+    assert cache.get(key) is None
+    assert cache.stats()['clears'] == 1 and cache.stats()['hits'] == 1
+
+
+def test_resume_key():
+    key = ResumeAnalysisCache.make_key('Jane Doe, Python developer', 'tech')
+    assert key == ResumeAnalysisCache.make_key('Jane Doe, Python developer', None)
+    assert key != ResumeAnalysisCache.make_key('Jane Doe, Python developer', 'government')
+    assert key != ResumeAnalysisCache.make_key('Jane Doe, Python developer.', 'tech')
+
+
+def test_upload_fields_do_not_leak_into_cached_analysis():
+    from app import app, resume_analysis_cache
+
+    resume = 'Alice Smith. Python developer with five years of Flask, SQL and AWS experience building APIs.'
+    client = app.test_client()
+    upload = {'careerType': 'tech', 'file': (io.BytesIO(resume.encode('utf-8')), 'alice_smith_cv.txt')}
+    uploaded = client.post('/api/resume/upload', data=upload, content_type='multipart/form-data')
+    assert uploaded.status_code == 200
+    assert uploaded.get_json()['fileName'] == 'alice_smith_cv.txt'
+
+    cached = resume_analysis_cache.get(resume_analysis_cache.make_key(resume, 'tech'))
+    assert 'fileName' not in cached
+    analyzed = client.post('/api/resume/analyze', json={'text': resume, 'careerType': 'tech'}).get_json()
+    assert 'fileName' not in analyzed and 'extractedChars' not in analyzed
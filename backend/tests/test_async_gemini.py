@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+import gemini_client
+from async_gemini import AsyncGeminiClient, RequestCancelled
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def generate_content(payload, api_key, model, timeout, priority):
+        calls.append(payload)
+        release.wait(5)
+        return {'echo': payload}
+
+    monkeypatch.setattr(gemini_client, 'generate_content', generate_content)
+    yield calls, release
+    release.set()
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_identical_requests_share_one_call(upstream):
+    calls, release = upstream
+    client = AsyncGeminiClient(max_concurrency=2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.generate_content({'q': 1}, 'key')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: client.stats()['requests'] == 5)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert results == [{'echo': {'q': 1}}] * 5
+    assert len(calls) == 1
+    stats = client.stats()
+    assert stats['upstream_calls'] == 1 and stats['coalesced'] == 4 and stats['in_flight'] == 0
+
+
+def test_different_payloads_are_not_coalesced(upstream):
+    calls, release = upstream
+    release.set()
+    client = AsyncGeminiClient()
+    assert client.generate_content({'q': 1}, 'key') == {'echo': {'q': 1}}
+    assert client.generate_content({'q': 2}, 'key') == {'echo': {'q': 2}}
+    assert calls == [{'q': 1}, {'q': 2}]
+
+
+def test_cancelled_caller_drops_queued_call(upstream):
+    calls, release = upstream
+    client = AsyncGeminiClient(max_concurrency=1)
+    blocker = threading.Thread(target=client.generate_content, args=({'q': 'first'}, 'key'))
+    blocker.start()
+    wait_for(lambda: len(calls) == 1)
+
+    # Queued behind the concurrency limit, then the browser goes away
+    with pytest.raises(RequestCancelled):
+        client.generate_content({'q': 'second'}, 'key', cancelled=lambda: True)
+    wait_for(lambda: client.stats()['cancelled'] == 1)
+
+    release.set()
+    blocker.join(2)
+    assert calls == [{'q': 'first'}]
+    assert client.stats()['upstream_calls'] == 1
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call(upstream):
+    calls, release = upstream
+    client = AsyncGeminiClient()
+    result = []
+    survivor = threading.Thread(target=lambda: result.append(client.generate_content({'q': 1}, 'key')))
+    survivor.start()
+    wait_for(lambda: len(calls) == 1)
+
+    with pytest.raises(RequestCancelled):
+        client.generate_content({'q': 1}, 'key', cancelled=lambda: True)
+    release.set()
+    survivor.join(2)
+
+    assert result == [{'echo': {'q': 1}}]
+    assert len(calls) == 1 and client.stats()['cancelled'] == 0
+
+
+def test_wait_timeout(upstream):
+    client = AsyncGeminiClient()
+    with pytest.raises(TimeoutError):
+        client.generate_content({'q': 1}, 'key', wait_timeout=0.1)
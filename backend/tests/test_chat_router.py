@@ -0,0 +1,98 @@
+import pytest
+
+from chat_router import ChatRouter
+
+
+@pytest.fixture
+def router():
+    return ChatRouter(threshold=0.6, max_words=10, faq_threshold=0.4, enabled=True)
+
+
+@pytest.mark.parametrize('message, intent', [
+    ('hi', 'greeting'),
+    ('Hello there!', 'greeting'),
+    ('thank you so much', 'thanks'),
+    ('who are you?', 'identity'),
+    ('tell me a joke', 'joke'),
+    ('ok bye', 'goodbye'),
+])
+def test_small_talk(router, message, intent):
+    assert router.classify(message) == (intent, 1.0)
+    assert router.route(message)[:2] == ('local', intent)
+
+
+def test_filler_inside_a_match_does_not_inflate_confidence(router):
+    # "so much" is filler: only "thank you" counts, against the two meaningful words "thank you" and "bro"
+    intent, confidence = router.classify('thank you so much bro')
+    assert intent == 'thanks' and confidence == 0.67
+
+
+@pytest.mark.parametrize('message', [
+    'hi, how do I become a data engineer?',
+    'Thanks, but what should I learn after SQL?',
+    'hi ' + 'word ' * 12,
+])
+def test_real_questions_go_to_the_llm(router, message):
+    assert router.route(message)[0] == 'llm'
+
+
+def test_faq_route(router):
+    asked = []
+
+    def faq(message):
+        asked.append(message)
+        return (0.5, 'UI/UX designers...') if 'designer' in message else (0.2, 'weak match')
+
+    assert router.route('what does a ui ux designer do', faq=faq) == ('faq', None, 0.5, 'UI/UX designers...')
+    assert router.route('should I quit my job', faq=faq) == ('llm', None, 0.0, None)
+    # Small talk and long questions never reach the lookup
+    router.route('hi', faq=faq)
+    router.route('I have five years in sales and want to move into product management next year', faq=faq)
+    assert asked == ['what does a ui ux designer do', 'should I quit my job']
+
+
+def test_stats(router):
+    router.route('hi')
+    router.route('what does a designer do', faq=lambda message: (0.9, 'answer'))
+    router.route('explain the tradeoffs between kafka and rabbitmq for event sourcing at scale please')
+    router.record_latency('faq', 0.002)
+    stats = router.stats()
+    assert stats['routes'] == {'local': 1, 'faq': 1, 'llm': 1}
+    assert stats['local_share'] == 0.667
+    assert stats['intents']['greeting'] == 1
+    assert stats['median_latency_ms']['faq'] == 2.0
+
+
+def test_disabled_router_sends_everything_to_the_llm():
+    router = ChatRouter(enabled=False)
+    assert router.route('hi', faq=lambda message: (1.0, 'answer')) == ('llm', None, 0.0, None)
+
+
+@pytest.fixture
+def faq():
+    import app
+    app.init_knowledge_base()
+    return lambda message, career_type='tech': app.faq_answer(message, {'careerType': career_type})
+
+
+@pytest.mark.parametrize('message', [
+    'how much does a data scientist earn',
+    'should I learn java or python',
+    'what is machine learning',
+    'what is docker',
+])
+def test_open_questions_still_go_to_gemini(router, faq, message):
+    assert router.route(message, faq=faq)[0] == 'llm'
+
+
+def test_curated_guides_answer_as_faq(router, faq):
+    route, _, confidence, answer = router.route('what is digital marketing', faq=lambda m: faq(m, 'nontech'))
+    assert route == 'faq' and 'Marketing' in answer
+    # The career type boost reorders passages but is not part of the score
+    assert confidence == round(faq('what is digital marketing', 'tech')[0], 2)
+
+
+def test_role_and_resource_passages_are_not_faqs(faq):
+    import app
+    assert faq('what is docker')[1] is None
+    assert 'docker' in app.offline_chat_answer('what is docker', {'careerType': 'tech'}).lower()
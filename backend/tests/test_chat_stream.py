@@ -0,0 +1,119 @@
+import io
+import json
+
+import pytest
+import requests
+
+import gemini_client
+
+
+def sse_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    # No charset, like Gemini's SSE responses
+    response.headers['Content-Type'] = 'text/event-stream'
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def chunk_event(text):
+    return f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]}, ensure_ascii=False)}\r\n\r\n"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    monkeypatch.setattr(gemini_client.gemini_limiter, 'acquire', lambda tokens, priority: None)
+
+    def play(body):
+        response = sse_response(body)
+        monkeypatch.setattr(gemini_client, 'post', lambda *args, **kwargs: response)
+        return response
+    return play
+
+
+def test_stream_yields_utf8_text(upstream):
+    body = (chunk_event('Résumé tips: ') + ': keep-alive\r\n\r\n' + 'data: not json\r\n\r\n'
+            + chunk_event('naïve → 日本語')).encode('utf-8')
+    upstream(body)
+    chunks = list(gemini_client.stream_generate_content({'contents': []}, 'key'))
+    assert chunks == ['Résumé tips: ', 'naïve → 日本語']
+
+
+def test_closing_the_generator_closes_upstream(upstream):
+    response = upstream((chunk_event('one') + chunk_event('two')).encode('utf-8'))
+    closed = []
+    response.close = lambda: closed.append(True)
+    chunks = gemini_client.stream_generate_content({'contents': []}, 'key')
+    assert next(chunks) == 'one'
+    chunks.close()
+    assert closed == [True]
+
+
+def events(response):
+    parsed = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        parsed.append((lines['event'], json.loads(lines['data'])))
+    return parsed
+
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
+
+
+def test_local_answer_streams_as_tokens(client):
+    response = client.post('/api/chat/stream', json={'message': 'hi'})
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    parsed = events(response)
+    assert {name for name, _ in parsed[:-1]} == {'token'}
+    assert ''.join(data['text'] for _, data in parsed[:-1]).startswith('Hello')
+    assert parsed[-1][0] == 'done' and parsed[-1][1]['source'] == 'local'
+
+
+def test_gemini_tokens_are_forwarded(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'is_gemini_available', lambda: True)
+    monkeypatch.setattr(app, 'stream_gemini_text', lambda *args, **kwargs: iter(['Für ', 'dich']))
+    parsed = events(client.post('/api/chat/stream', json={
+        'message': 'Compare the long term prospects of data engineering and analytics engineering for me'}))
+    assert parsed[:2] == [('token', {'text': 'Für '}), ('token', {'text': 'dich'})]
+    assert parsed[-1][0] == 'done' and parsed[-1][1]['source'] == 'gemini'
+
+
+def test_failure_before_first_token_falls_back_locally(client, monkeypatch):
+    import app
+
+    def broken(*args, **kwargs):
+        raise requests.ConnectionError('down')
+        yield
+
+    monkeypatch.setattr(app, 'is_gemini_available', lambda: True)
+    monkeypatch.setattr(app, 'stream_gemini_text', broken)
+    parsed = events(client.post('/api/chat/stream', json={
+        'message': 'Compare the long term prospects of data engineering and analytics engineering for me'}))
+    assert parsed[0][0] == 'token' and parsed[-1][1]['source'] == 'local'
+
+
+def test_failure_mid_answer_ends_the_stream(client, monkeypatch):
+    import app
+
+    def interrupted(*args, **kwargs):
+        yield 'Partial '
+        raise requests.ConnectionError('reset')
+
+    monkeypatch.setattr(app, 'is_gemini_available', lambda: True)
+    monkeypatch.setattr(app, 'stream_gemini_text', interrupted)
+    parsed = events(client.post('/api/chat/stream', json={
+        'message': 'Compare the long term prospects of data engineering and analytics engineering for me'}))
+    assert [name for name, _ in parsed] == ['token', 'error', 'done']
+    assert parsed[-1][1]['source'] == 'gemini'
+
+
+def test_chunk_text_keeps_spacing():
+    from app import chunk_text
+    text = 'one two three four five six seven eight nine'
+    chunks = list(chunk_text(text, words_per_chunk=4))
+    assert ''.join(chunks) == text and len(chunks) == 3
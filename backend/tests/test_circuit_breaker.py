@@ -0,0 +1,83 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def breaker(**kwargs):
+    options = dict(failure_threshold=3, latency_threshold=2.0, reset_timeout=30.0, min_samples=5)
+    options.update(kwargs)
+    return CircuitBreaker('test', **options)
+
+
+def fail(cb, times):
+    for _ in range(times):
+        cb.before_call()
+        cb.record_failure()
+
+
+def test_opens_after_consecutive_failures(clock):
+    cb = breaker()
+    fail(cb, 2)
+    cb.before_call()
+    cb.record_success(0.1)  # resets the streak
+    fail(cb, 2)
+    assert cb.state == CLOSED
+    fail(cb, 1)
+    assert cb.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+    assert cb.snapshot()['rejected'] == 1 and cb.snapshot()['retry_in'] == 30.0
+
+
+def test_slow_successes_count_as_failures(clock):
+    cb = breaker()
+    for _ in range(3):
+        cb.before_call()
+        cb.record_success(5.0)
+    assert cb.state == OPEN
+    assert cb.snapshot()['latency_breaches'] == 3
+
+
+def test_half_open_probe_closes_on_success(clock):
+    cb = breaker()
+    fail(cb, 3)
+    clock[0] += 30
+    assert cb.state == HALF_OPEN
+    cb.before_call()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+    cb.record_success(0.1)
+    assert cb.state == CLOSED
+    cb.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    cb = breaker()
+    fail(cb, 3)
+    clock[0] += 30
+    fail(cb, 1)
+    assert cb.state == OPEN
+    assert cb.snapshot()['opened'] == 2
+    clock[0] += 29
+    assert cb.state == OPEN
+
+
+def test_adaptive_timeout_follows_p95(clock):
+    cb = breaker(min_samples=20, timeout_multiplier=2.0, min_timeout=5.0, max_timeout=30.0,
+                 latency_threshold=None)
+    assert cb.adaptive_timeout() == 30.0  # not enough samples yet
+    for latency in [1.0] * 18 + [6.0, 6.0]:
+        cb.record_success(latency)
+    assert cb.adaptive_timeout() == 12.0
+    for _ in range(100):
+        cb.record_success(0.5)
+    assert cb.adaptive_timeout() == 5.0
@@ -0,0 +1,117 @@
+import pytest
+import requests
+
+import gemini_client
+from circuit_breaker import CircuitBreaker
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None, body=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body or {}
+        self.closed = False
+
+    def json(self):
+        return self.body
+
+    def close(self):
+        self.closed = True
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code}', response=self)
+
+
+class FakeSession:
+    """Plays back a script of responses / exceptions and records the calls"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(gemini_client.time, 'sleep', slept.append)
+    monkeypatch.setattr(gemini_client, 'MAX_RETRIES', 2)
+    monkeypatch.setattr(gemini_client, 'gemini_breaker', CircuitBreaker('test', failure_threshold=100))
+    return slept
+
+
+def use_session(monkeypatch, session):
+    monkeypatch.setattr(gemini_client, 'get_session', lambda: session)
+    return session
+
+
+def test_session_is_pooled_and_reused():
+    session = gemini_client.get_session()
+    assert gemini_client.get_session() is session
+    adapter = session.get_adapter('https://generativelanguage.googleapis.com')
+    assert adapter._pool_maxsize == gemini_client.POOL_SIZE
+    assert adapter.max_retries.total == 0
+
+
+def test_retries_5xx_then_succeeds(monkeypatch, sleeps):
+    failed = FakeResponse(503)
+    session = use_session(monkeypatch, FakeSession(failed, FakeResponse(200, body={'ok': 1})))
+    response = gemini_client.post('models/m:generateContent', {'contents': []}, 'key')
+    assert response.json() == {'ok': 1}
+    assert len(session.calls) == 2 and failed.closed
+    assert session.calls[0][1]['params'] == {'key': 'key'}
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= gemini_client.BACKOFF_BASE
+
+
+def test_retry_after_is_honoured(monkeypatch, sleeps):
+    use_session(monkeypatch, FakeSession(FakeResponse(429, {'Retry-After': '3'}), FakeResponse(200)))
+    gemini_client.post('path', {}, 'key')
+    assert sleeps == [3.0]
+    assert gemini_client._backoff_delay(0, FakeResponse(429, {'Retry-After': '999'})) == gemini_client.BACKOFF_MAX
+
+
+def test_gives_up_after_max_retries(monkeypatch, sleeps):
+    session = use_session(monkeypatch, FakeSession(FakeResponse(500), FakeResponse(502), FakeResponse(504)))
+    with pytest.raises(requests.HTTPError):
+        gemini_client.post('path', {}, 'key')
+    assert len(session.calls) == 3 and len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(monkeypatch, sleeps):
+    session = use_session(monkeypatch, FakeSession(FakeResponse(400)))
+    with pytest.raises(requests.HTTPError):
+        gemini_client.post('path', {}, 'key')
+    assert len(session.calls) == 1 and sleeps == []
+
+
+def test_connection_errors_retry_but_read_timeouts_do_not(monkeypatch, sleeps):
+    session = use_session(monkeypatch, FakeSession(requests.ConnectionError('reset'), FakeResponse(200)))
+    assert gemini_client.post('path', {}, 'key').status_code == 200
+    assert len(session.calls) == 2
+
+    session = use_session(monkeypatch, FakeSession(requests.ReadTimeout('slow'), FakeResponse(200)))
+    with pytest.raises(requests.ReadTimeout):
+        gemini_client.post('path', {}, 'key')
+    assert len(session.calls) == 1
+
+
+def test_split_timeout_uses_adaptive_read_timeout(monkeypatch, sleeps):
+    session = use_session(monkeypatch, FakeSession(FakeResponse(200), FakeResponse(200)))
+    gemini_client.post('path', {}, 'key')
+    assert session.calls[0][1]['timeout'] == (gemini_client.CONNECT_TIMEOUT,
+                                              gemini_client.gemini_breaker.adaptive_timeout())
+    gemini_client.post('path', {}, 'key', timeout=(1, 2))
+    assert session.calls[1][1]['timeout'] == (1, 2)
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = [gemini_client._backoff_delay(10) for _ in range(200)]
+    assert max(delays) <= gemini_client.BACKOFF_MAX
+    assert len(set(delays)) > 100
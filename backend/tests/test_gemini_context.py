@@ -0,0 +1,106 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+import gemini_client
+import gemini_context
+import gemini_stub
+from gemini_context import ContextCache
+
+
+def http_error(status, text=''):
+    response = requests.Response()
+    response.status_code = status
+    response._content = text.encode('utf-8')
+    return requests.HTTPError(response=response)
+
+
+@pytest.mark.parametrize('status, text, stale', [
+    (404, 'Not found', True),
+    (403, 'Permission denied', True),
+    (400, 'CachedContent not found (or permission denied)', True),
+    (400, 'Cached content has expired', True),
+    (400, 'Request payload size exceeds the limit', False),
+    (429, 'Resource exhausted', False),
+    (500, '', False),
+])
+def test_only_handle_errors_are_stale(status, text, stale):
+    assert ContextCache._is_stale({'cachedContent': 'cachedContents/abc'}, http_error(status, text)) is stale
+    assert ContextCache._is_stale({'systemInstruction': {}}, http_error(status, text)) is False
+
+
+def test_small_instructions_stay_inline(tmp_path, monkeypatch):
+    cache = ContextCache(str(tmp_path / 'context.db'), enabled=True)
+    monkeypatch.setattr(cache, '_register', lambda *args: pytest.fail('registered a small instruction'))
+    assert cache.handle_for('chat', 'gemini-1.5-flash-latest', 'key') is None
+    payload = cache.apply({'contents': []}, 'chat', 'gemini-1.5-flash-latest', None)
+    assert 'systemInstruction' in payload and 'cachedContent' not in payload
+
+
+def test_stale_handle_is_dropped_without_disabling_the_model(tmp_path):
+    cache = ContextCache(str(tmp_path / 'context.db'), enabled=True, min_tokens=0)
+    payload = cache._inline_retry({'cachedContent': 'cachedContents/abc', 'contents': []}, 'chat', 'm')
+    assert 'systemInstruction' in payload and 'cachedContent' not in payload
+    assert cache._unsupported == {}
+
+
+@pytest.mark.parametrize('model, minimum', [
+    ('gemini-1.5-flash-latest', 32768),
+    ('gemini-1.5-pro', 32768),
+    ('gemini-2.0-flash', 1024),
+    ('gemini-2.5-flash', 1024),
+    ('gemini-2.5-pro', 4096),
+])
+def test_min_tokens_follow_the_model(model, minimum):
+    assert gemini_context.min_cache_tokens(model) == minimum
+
+
+def test_env_override_replaces_the_model_table(monkeypatch):
+    monkeypatch.setattr(gemini_context, 'MIN_CACHE_TOKENS', '0')
+    assert gemini_context.min_cache_tokens('gemini-1.5-flash') == 0
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), gemini_stub.GeminiStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(gemini_client, 'GEMINI_API_BASE', f'http://127.0.0.1:{server.server_port}/v1beta')
+    # Long enough for the 2.x minimum of 1024 tokens
+    monkeypatch.setitem(gemini_context.SYSTEM_INSTRUCTIONS, 'advice', 'Career coach instructions. ' * 200)
+    gemini_stub._cached.clear()
+    gemini_stub._counts.update(dict.fromkeys(gemini_stub._counts, 0))
+    yield gemini_stub._counts
+    server.shutdown()
+    server.server_close()
+
+
+def ask(cache, model='gemini-2.0-flash'):
+    payload = {'contents': [{'role': 'user', 'parts': [{'text': 'hello'}]}]}
+    return gemini_client.extract_text(cache.generate_content(payload, 'advice', 'k' * 24, model))
+
+
+def test_handle_is_registered_once_and_reused(tmp_path, stub):
+    cache = ContextCache(str(tmp_path / 'context.db'))  # default minimum for the model
+    assert ask(cache).startswith('[cached:cachedContents/')
+    assert ask(cache).startswith('[cached:cachedContents/')
+    # Another worker picks the handle up from SQLite instead of registering again
+    assert ask(ContextCache(str(tmp_path / 'context.db'))).startswith('[cached:')
+    assert stub['registered'] == 1 and stub['cached_hits'] == 3
+    assert cache.stats()['registered'] == 1 and cache.stats()['reused'] == 1
+
+
+def test_default_model_sends_instructions_inline(tmp_path, stub):
+    cache = ContextCache(str(tmp_path / 'context.db'))
+    assert ask(cache, 'gemini-1.5-flash-latest').startswith('[inline]')
+    assert stub['registered'] == 0
+
+
+def test_expired_handle_retries_inline_then_reregisters(tmp_path, stub):
+    cache = ContextCache(str(tmp_path / 'context.db'))
+    ask(cache)
+    gemini_stub._cached.clear()  # expired upstream
+    assert ask(cache).startswith('[inline]')
+    assert ask(cache).startswith('[cached:')
+    assert stub['rejected'] == 1 and stub['registered'] == 2
@@ -0,0 +1,55 @@
+import pytest
+
+from intent_matcher import IntentMatcher, fallback_intents
+
+
+@pytest.mark.parametrize('engine, message, career_type, expected', [
+    # A longer keyword of another intent must not hide an intent's own inflected keyword
+    ('basic', 'How do I get into web development?', 'nontech', 'nontech_skills'),
+    ('basic', 'Which skills should I improve?', 'nontech', 'nontech_skills'),
+    ('basic', 'I am learning to code', 'tech', 'tech_skills'),
+    # Phrases outweigh single words ("learning" also matches "learn")
+    ('basic', 'Is machine learning worth learning?', 'tech', 'tech_data_science'),
+    ('basic', 'Exam preparation tips', 'government', 'gov_exam'),
+    ('enhanced', 'Hello! Tell me about full stack jobs', 'tech', 'web_development'),
+    ('enhanced', 'How do I clear the UPSC exam?', 'government', 'upsc'),
+    ('enhanced', 'hi', 'nontech', 'greeting'),
+])
+def test_match(engine, message, career_type, expected):
+    assert fallback_intents.match(engine, message, career_type)[0] == expected
+
+
+@pytest.mark.parametrize('message', ['this is it', 'maintain the system', 'whichever'])
+def test_keywords_match_whole_words_only(message):
+    assert fallback_intents.match('enhanced', message, 'tech') == (None, 0.0)
+
+
+def test_career_type_filters_intents():
+    assert fallback_intents.match('enhanced', 'upsc', 'tech') == (None, 0.0)
+    # Unknown career types use the tech rules
+    assert fallback_intents.match('enhanced', 'frontend roles', 'engineering')[0] == 'web_development'
+
+
+def test_respond_falls_back_to_default():
+    engine = fallback_intents._engines['enhanced']
+    assert fallback_intents.respond('enhanced', 'zzz', 'government') == engine.default('government')
+    assert fallback_intents.respond('missing', 'hi') == ''
+    assert fallback_intents.match('missing', 'hi') == (None, 0.0)
+
+
+def test_unreadable_file_has_no_engines(tmp_path):
+    matcher = IntentMatcher(str(tmp_path / 'missing.json'))
+    assert matcher.match('basic', 'career') == (None, 0.0)
+
+
+def test_one_scan_scores_overlapping_keywords_of_every_intent():
+    from intent_matcher import _Engine
+    engine = _Engine({'intents': [
+        {'id': 'ml', 'keywords': ['machine learning']},
+        {'id': 'hardware', 'keywords': ['machine', 'machines'], 'weight': 3.0},
+        {'id': 'study', 'keywords': ['learn', 'learning']},
+    ]})
+    assert engine.match('machine learning', 'tech')[0]['id'] == 'hardware'
+    assert engine._pattern.pattern.count('(?=') == 1
+    # Same intent: "learning" and "learn" overlap, so only the longer one counts
+    assert engine.match('learning', 'tech') == (engine.intents[2], 1.0)
@@ -0,0 +1,84 @@
+import os
+import json
+import threading
+
+import pytest
+
+import knowledge_base
+from knowledge_base import KnowledgeBase, tokenize
+
+ROLES = [
+    {'title': 'UI/UX Designer', 'description': 'Designs user interfaces and researches user experience.',
+     'requiredSkills': ['Figma', 'Wireframing'], 'tags': ['design']},
+    {'title': 'Bank Clerk', 'description': 'Handles customer accounts at a public sector bank.',
+     'requiredSkills': ['Accounting'], 'tags': ['government']},
+]
+
+
+@pytest.fixture
+def base(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / 'index.json'))
+    kb.load_or_build(roles=ROLES, resources={'figma': [{'title': 'Figma basics', 'url': 'https://example.com'}]})
+    return kb
+
+
+def test_tokenize_drops_stopwords_and_adds_bigrams():
+    assert tokenize('What is Data Science?') == ['data', 'science', 'data science']
+
+
+def test_answer_and_scores(base):
+    score, answer = base.scored_answer('what does a ui ux designer do')
+    assert answer.startswith('**UI/UX Designer**') and score > 0.35
+    assert base.answer('what does a ui ux designer do') == answer
+    assert base.scored_answer('zebra quantum banana') == (0.0, None)
+
+
+def test_sources_and_career_type_boost(base):
+    assert base.scored_answer('what does a ui ux designer do', sources=('guide',))[1] is None
+    hits = base.search('bank accounts clerk', career_type='government')
+    assert hits[0][1]['title'] == 'Bank Clerk'
+    # The boost changes the ranking score only; scored_answer reports the cosine
+    assert base.scored_answer('bank accounts clerk', career_type='government')[0] == \
+        base.scored_answer('bank accounts clerk')[0] < hits[0][0]
+
+
+def test_saved_index_is_reused(base):
+    reloaded = KnowledgeBase(base.path)
+    reloaded.load_or_build(roles=ROLES, resources={'figma': [{'title': 'Figma basics', 'url': 'https://example.com'}]})
+    assert reloaded.docs == base.docs
+    # Changed sources change the fingerprint
+    with open(base.path, encoding='utf-8') as f:
+        fingerprint = json.load(f)['fingerprint']
+    KnowledgeBase(base.path).load_or_build(roles=ROLES[:1])
+    with open(base.path, encoding='utf-8') as f:
+        assert json.load(f)['fingerprint'] != fingerprint
+
+
+def test_concurrent_saves_publish_one_whole_index(tmp_path):
+    path = str(tmp_path / 'index.json')
+    builders = [threading.Thread(target=KnowledgeBase(path).load_or_build, args=([dict(ROLES[0], title=f'Role {i}')],))
+                for i in range(8)]
+    for builder in builders:
+        builder.start()
+    for builder in builders:
+        builder.join()
+    with open(path, encoding='utf-8') as f:
+        assert 'fingerprint' in json.load(f)
+    assert os.listdir(tmp_path) == ['index.json']
+
+
+def test_failed_builds_back_off(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_base, 'BUILD_RETRY_AFTER', 30)
+    monkeypatch.setattr(knowledge_base, 'BUILD_RETRY_MAX', 100)
+    kb = KnowledgeBase(str(tmp_path / 'index.json'))
+    assert kb.build_due()
+    delays = []
+    for _ in range(4):
+        kb.mark_failed()
+        delays.append(round(kb._retry_at - knowledge_base.time.time()))
+        assert not kb.build_due()
+    assert delays == [30, 60, 100, 100]
+
+    kb._retry_at = 0
+    kb.load_or_build(roles=ROLES)
+    assert kb.failures == 0 and not kb.build_due()
@@ -0,0 +1,99 @@
+import io
+import json
+import queue
+import logging
+
+import pytest
+from flask import Flask
+
+from logging_setup import (DebugSampler, DroppingQueueHandler, LoggingPipeline, assign_request_id,
+                           parse_levels)
+
+
+@pytest.fixture
+def pipeline():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    pipeline, stream = LoggingPipeline(), io.StringIO()
+
+    def configure(**options):
+        pipeline.configure(stream=stream, **options)
+        return stream
+
+    yield pipeline, configure
+    pipeline.shutdown()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_lines_with_request_id(pipeline):
+    pipeline, configure = pipeline
+    stream = configure(level='INFO', levels='', fmt='json', sample_every=1)
+    app = Flask(__name__)
+    with app.test_request_context():
+        assign_request_id('abc-123')
+        logging.getLogger('demo').info('hello %s', 'world')
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logging.getLogger('demo').exception('failed')
+    pipeline.shutdown()
+
+    hello, failed = lines(stream)
+    assert hello['message'] == 'hello world' and hello['request_id'] == 'abc-123'
+    assert hello['logger'] == 'demo' and hello['level'] == 'INFO'
+    assert failed['request_id'] == '-' and 'ValueError: boom' in failed['exc']
+
+
+def test_request_id_must_look_sane():
+    app = Flask(__name__)
+    with app.test_request_context():
+        assert assign_request_id('ok.id_1') == 'ok.id_1'
+        generated = assign_request_id('bad id\nwith newline')
+        assert len(generated) == 16 and generated.isalnum()
+
+
+def test_per_logger_levels(pipeline):
+    pipeline, configure = pipeline
+    stream = configure(level='WARNING', levels='chatty=DEBUG,bogus=LOUD', fmt='json', sample_every=1)
+    logging.getLogger('chatty').debug('kept')
+    logging.getLogger('quiet').info('dropped')
+    pipeline.shutdown()
+    assert [entry['message'] for entry in lines(stream)] == ['kept']
+    assert parse_levels('a=debug, b=LOUD,=INFO') == {'a': 'DEBUG'}
+
+
+def test_debug_records_are_sampled_per_call_site():
+    sampler = DebugSampler(every=5)
+    debug = logging.LogRecord('demo', logging.DEBUG, 'x.py', 10, 'msg', None, None)
+    other_site = logging.LogRecord('demo', logging.DEBUG, 'x.py', 11, 'msg', None, None)
+    warning = logging.LogRecord('demo', logging.WARNING, 'x.py', 10, 'msg', None, None)
+    assert [sampler.filter(debug) for _ in range(10)].count(True) == 2
+    assert sampler.filter(other_site)
+    assert all(sampler.filter(warning) for _ in range(10))
+    assert sampler.dropped == 8
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(1))
+    record = logging.LogRecord('demo', logging.INFO, 'x.py', 1, 'msg %s', ('arg',), None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+    # Rendered on the emitting thread, so the writer never formats request objects
+    queued = handler.queue.get_nowait()
+    assert queued.msg == 'msg arg' and queued.args is None
+
+
+def test_app_echoes_request_id():
+    from app import app
+    client = app.test_client()
+    assert client.get('/health', headers={'X-Request-ID': 'trace-42'}).headers['X-Request-ID'] == 'trace-42'
+    assert len(client.get('/health').headers['X-Request-ID']) == 16
@@ -0,0 +1,53 @@
+import re
+
+from metrics import Registry
+
+
+def test_counter_and_label_escaping():
+    registry = Registry()
+    counter = registry.counter('demo_total', 'Demo counter', ('path',))
+    counter.inc('a')
+    counter.inc('a', amount=2)
+    counter.inc('say "hi"\n')
+    assert counter.value('a') == 3
+    text = registry.render()
+    assert '# TYPE demo_total counter' in text
+    assert 'demo_total{path="a"} 3' in text
+    assert 'demo_total{path="say \\"hi\\"\\n"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram('demo_seconds', 'Demo histogram', ('stage',), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, 'db')
+    lines = registry.render().splitlines()
+    assert 'demo_seconds_bucket{stage="db",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="db",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{stage="db",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{stage="db"} 3.65' in lines
+    assert 'demo_seconds_count{stage="db"} 4' in lines
+
+
+def test_gauge_reads_at_scrape_time():
+    registry = Registry()
+    sizes = {('advice',): 1}
+    registry.gauge('demo_entries', 'Demo gauge', ('cache',), lambda: sizes)
+    sizes[('advice',)] = 7
+    assert 'demo_entries{cache="advice"} 7' in registry.render()
+
+
+def test_server_timing_and_metrics_endpoint():
+    from app import app
+    client = app.test_client()
+    response = client.post('/api/analyze', json={'mode': 'quick', 'skills': 'python, sql', 'careerType': 'tech'})
+    timing = response.headers['Server-Timing']
+    stages = dict(re.findall(r'(\w+);dur=([\d.]+)', timing))
+    assert {'skills', 'get_roles', 'total'} <= set(stages)
+    assert float(stages['total']) >= float(stages['skills'])
+
+    scrape = client.get('/metrics')
+    assert scrape.mimetype == 'text/plain'
+    text = scrape.get_data(as_text=True)
+    assert 'careerpath_request_duration_seconds_count{endpoint="analyze",status="200"}' in text
+    assert 'careerpath_stage_duration_seconds_count{endpoint="analyze",stage="skills"}' in text
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+import profile_store
+from profile_store import find_candidates, save_profile
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    conn = profile_store._connect()
+    with conn:
+        for table in ('profiles', 'profile_skills', 'skill_counts'):
+            conn.execute(f"DELETE FROM {table};")
+    conn.close()
+
+
+def brute_force(profiles, weighted_skills, limit, career_types=None):
+    scored = []
+    for profile_id, (skills, strength, career_type) in profiles.items():
+        if career_types and career_type not in career_types:
+            continue
+        overlap = sum(weight for skill, weight in weighted_skills.items() if skill in skills)
+        if overlap:
+            scored.append((overlap, strength, profile_id))
+    scored.sort(key=lambda row: (-row[0], -row[1]))
+    return [(overlap, strength) for overlap, strength, _ in scored[:limit]]
+
+
+def test_matches_exhaustive_ranking():
+    rng = random.Random(27)
+    # Skill i is held by roughly 1 in (i + 1) profiles, so posting lists range from huge to tiny
+    skills = [f'skill{i}' for i in range(12)]
+    profiles = {}
+    for n in range(400):
+        held = {skill for i, skill in enumerate(skills) if rng.random() < 1 / (i + 1)}
+        profiles[f'p{n}'] = (held, rng.randrange(100), rng.choice(['tech', 'nontech']))
+        save_profile(f'p{n}', held, 'Mid', profiles[f'p{n}'][1], profiles[f'p{n}'][2])
+
+    for trial in range(20):
+        weighted = {skill: rng.choice([1, 2, 3]) for skill in rng.sample(skills, rng.randrange(1, 8))}
+        limit = rng.choice([1, 5, 50])
+        career_types = rng.choice([None, ['tech'], ['tech', 'nontech']])
+        found = find_candidates(weighted, limit=limit, career_types=career_types)
+        total = sum(weighted.values())
+        expected = brute_force(profiles, weighted, limit, career_types)
+        assert [(round(c['score'] * total / 100), c['strengthScore']) for c in found] == expected
+        for candidate in found:
+            assert set(candidate['matchedSkills']) == profiles[candidate['profileId']][0] & set(weighted)
+
+
+def test_filters_by_career_type():
+    save_profile('dev', ['python', 'sql'], 'Senior', 80, 'tech')
+    save_profile('clerk', ['python', 'sql'], 'Senior', 90, 'government')
+    assert [c['profileId'] for c in find_candidates({'python': 1, 'sql': 1})] == ['clerk', 'dev']
+    found = find_candidates({'python': 1, 'sql': 1}, career_types=['tech'])
+    assert [(c['profileId'], c['score'], c['careerType']) for c in found] == [('dev', 100.0, 'tech')]
+
+
+def test_skill_counts_follow_resaves():
+    save_profile('a', ['python', 'sql'], 'Mid', 10, 'tech')
+    save_profile('b', ['python'], 'Mid', 10, 'tech')
+    save_profile('a', ['excel'], 'Mid', 10, 'tech')
+    conn = profile_store._connect()
+    counts = dict(conn.execute("SELECT skill_id, profiles FROM skill_counts WHERE profiles > 0;").fetchall())
+    conn.close()
+    assert counts == {'python': 1, 'excel': 1}
+    assert [c['profileId'] for c in find_candidates({'python': 1, 'sql': 5})] == ['b']
+    assert find_candidates({'unknown': 1}) == []
+    assert find_candidates({}) == []
+
+
+def test_role_candidates_route():
+    from app import app, init_role_catalog, role_catalog
+
+    init_role_catalog()
+    role = role_catalog.roles_for('tech', '')[0]
+    entry = role_catalog.entry(role)
+    skills = [skill_id for skill_id, _, _ in entry['skills']]
+    save_profile('tech-candidate', skills, 'Senior', 50, 'tech')
+    other_track = next(t for t in ('tech', 'nontech', 'government') if t not in entry['career_types'])
+    save_profile('other-track', skills, 'Senior', 99, other_track)
+
+    client = app.test_client()
+    data = client.get(f"/api/roles/{role['title'].upper()}/candidates?limit=5").get_json()
+    assert data['role'] == role['title']
+    assert [c['profileId'] for c in data['candidates']] == ['tech-candidate']
+    assert data['candidates'][0]['score'] == 100.0
+    assert client.get('/api/roles/No Such Role/candidates').status_code == 404
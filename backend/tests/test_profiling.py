@@ -0,0 +1,72 @@
+import marshal
+import tracemalloc
+
+import pytest
+
+from profiling import RequestProfiler
+
+
+def work():
+    return [str(i) * 10 for i in range(2000)]
+
+
+def test_profile_is_stored_with_functions_and_allocations():
+    profiler = RequestProfiler(ring_size=2)
+    session = profiler.start('request')
+    work()
+    profile_id = profiler.stop(session, path='/api/test')
+    record = profiler.get(profile_id)
+    assert record['path'] == '/api/test' and record['trigger'] == 'request'
+    assert 'work' in record['functions']
+    assert record['peakTracedBytes'] > 0
+    # Same layout as a cProfile dump_stats file: {(file, line, function): timings}
+    assert any(func[2] == 'work' for func in marshal.loads(record['pstats']))
+    assert not tracemalloc.is_tracing()
+
+
+def test_one_profile_at_a_time():
+    profiler = RequestProfiler()
+    session = profiler.start('request')
+    assert profiler.start('request') is None
+    profiler.discard(session)
+    assert profiler.stats()['skipped_busy'] == 1
+    profiler.discard(profiler.start('sample'))
+
+
+def test_sampling_every_nth_call():
+    profiler = RequestProfiler(sample_every=3)
+    assert [profiler.trigger_for(False) for _ in range(6)] == [None, None, 'sample'] * 2
+    assert profiler.trigger_for(True) == 'request'
+    assert RequestProfiler(sample_every=0).trigger_for(False) is None
+
+
+def test_ring_buffer_keeps_the_newest():
+    profiler = RequestProfiler(ring_size=2)
+    ids = [profiler.stop(profiler.start('request'), path=f'/api/{i}') for i in range(3)]
+    assert [summary['id'] for summary in profiler.summaries()] == ids[:0:-1]
+    assert profiler.get(ids[0]) is None
+    assert 'pstats' not in profiler.summaries()[0]
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'API_KEY', 'secret-admin-key')
+    return app.app.test_client(), {'X-Admin-Key': 'secret-admin-key'}
+
+
+def test_flagged_request_is_profiled_for_admins_only(admin):
+    client, headers = admin
+    body = {'mode': 'quick', 'skills': 'python', 'careerType': 'tech'}
+    assert 'X-Profile-Id' not in client.post('/api/analyze', json=body, headers={'X-Profile': '1'}).headers
+    response = client.post('/api/analyze?profile=1', json=body, headers=headers)
+    profile_id = response.headers['X-Profile-Id']
+
+    assert client.get('/api/admin/profiles').status_code == 403
+    listed = client.get('/api/admin/profiles', headers=headers).get_json()
+    assert profile_id in [summary['id'] for summary in listed['profiles']]
+    detail = client.get(f'/api/admin/profiles/{profile_id}', headers=headers).get_json()
+    assert detail['path'] == '/api/analyze' and 'pstats' not in detail
+    raw = client.get(f'/api/admin/profiles/{profile_id}?format=pstats', headers=headers)
+    assert raw.mimetype == 'application/octet-stream' and marshal.loads(raw.data)
+    assert client.get('/api/admin/profiles/unknown', headers=headers).status_code == 404
@@ -0,0 +1,67 @@
+from prompt_builder import PromptBuilder, compact_history, format_skill_list, prompt_stats, truncate_to_tokens
+from rate_limiter import estimate_tokens
+
+
+def test_sections_keep_insertion_order_within_budget():
+    prompt, report = (PromptBuilder('test', budget=100)
+                      .add('profile', 'profile text', required=True)
+                      .add('context', 'context text', priority=2)
+                      .add('question', 'question text', required=True)
+                      .build())
+    assert prompt == 'profile text\n\ncontext text\n\nquestion text'
+    assert report['dropped'] == [] and set(report['sections']) == {'profile', 'context', 'question'}
+
+
+def test_low_priority_sections_are_truncated_then_dropped():
+    prompt, report = (PromptBuilder('test', budget=80)
+                      .add('question', 'q ' * 40, required=True)
+                      .add('history', 'older turn ' * 40, priority=3)
+                      .add('resources', 'resource ' * 10, priority=1)
+                      .add('extra', 'unused ' * 40, priority=4)
+                      .build())
+    # resources (priority 1) fits; history is cut to the rest; extra is dropped
+    assert 'resource' in prompt and prompt.index('older turn') < prompt.index('resource')
+    assert report['sections']['history'] < estimate_tokens('older turn ' * 40)
+    assert report['dropped'] == ['extra']
+    assert report['total_tokens'] <= 80
+
+
+def test_required_sections_are_never_dropped():
+    prompt, report = PromptBuilder('test', budget=10).add('question', 'word ' * 100, required=True).build()
+    assert prompt == 'word ' * 100
+    assert report['total_tokens'] > report['budget']
+
+
+def test_stats_count_over_budget_prompts():
+    PromptBuilder('stats-test', budget=10).add('question', 'word ' * 100, required=True).build()
+    PromptBuilder('stats-test', budget=10).add('question', 'short', required=True).build()
+    stats = prompt_stats.snapshot()['stats-test']
+    assert stats['calls'] == 2 and stats['over_budget'] == 1
+
+
+def test_truncate_to_tokens_cuts_on_a_word():
+    assert truncate_to_tokens('short text', 10) == 'short text'
+    cut = truncate_to_tokens('alpha beta gamma delta epsilon', 4)
+    assert cut == 'alpha beta...'
+
+
+def test_format_skill_list():
+    assert format_skill_list([]) == 'Not specified'
+    assert format_skill_list(['a', '', 'b']) == 'a, b'
+    assert format_skill_list([str(i) for i in range(20)], limit=3) == '0, 1, 2 (+17 more)'
+
+
+def test_compact_history_summarizes_older_turns():
+    history = [{'user': f'Question {i}. More detail here.', 'assistant': f'Answer {i}'} for i in range(5)]
+    summary, recent = compact_history(history, recent_turns=2)
+    assert summary == 'Question 0.; Question 1.; Question 2.'
+    assert recent.splitlines() == [
+        'User (earlier): Question 3. More detail here.', 'Assistant (earlier): Answer 3',
+        'User (earlier): Question 4. More detail here.', 'Assistant (earlier): Answer 4',
+    ]
+
+
+def test_compact_history_caps_long_turns():
+    summary, recent = compact_history([{'user': 'x ' * 1000, 'assistant': 'y ' * 1000}], turn_cap=50)
+    assert summary == ''
+    assert all(estimate_tokens(line) < 60 for line in recent.splitlines())
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from rate_limiter import RateLimitExceeded, TokenBucketLimiter, estimate_tokens
+
+
+def limiter(tmp_path, rpm=0, tpm=0):
+    return TokenBucketLimiter(str(tmp_path / 'rate_limit.db'), requests_per_minute=rpm, tokens_per_minute=tpm)
+
+
+def take_all(bucket, priority):
+    # Only for buckets too slow to refill within the priority's max wait
+    taken = 0
+    while True:
+        try:
+            bucket.acquire(1, priority)
+        except RateLimitExceeded:
+            return taken
+        taken += 1
+
+
+def test_lower_priorities_leave_a_reserve(tmp_path):
+    bucket = limiter(tmp_path, rpm=10)
+    # low keeps 25% of the bucket back, normal 10%, high nothing
+    assert take_all(bucket, 'low') == 7
+    assert take_all(bucket, 'normal') == 2
+    assert take_all(bucket, 'high') == 1
+    stats = bucket.stats()['priorities']
+    assert stats['low'] == {'acquired': 7, 'queued': 0, 'rejected': 1}
+    assert stats['high']['acquired'] == 1
+
+
+def test_workers_share_buckets(tmp_path):
+    first, second = limiter(tmp_path, rpm=10), limiter(tmp_path, rpm=10)
+    for _ in range(5):
+        first.acquire(1, 'high')
+    assert take_all(second, 'high') == 5
+
+
+def test_token_budget_and_reconcile(tmp_path):
+    bucket = limiter(tmp_path, tpm=1000)
+    bucket.acquire(800, 'high')
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire(800, 'high')
+    # The call actually used far fewer tokens than estimated
+    bucket.reconcile(800, 100)
+    bucket.acquire(800, 'high')
+
+
+def test_short_wait_is_queued(tmp_path):
+    bucket = limiter(tmp_path, rpm=60)
+    for _ in range(60):
+        bucket.acquire(1, 'high')
+    # One request refills per second, well inside the 5s high-priority wait
+    started = time.monotonic()
+    bucket.acquire(1, 'high')
+    assert 0.5 < time.monotonic() - started < 3
+    assert bucket.stats()['priorities']['high'] == {'acquired': 61, 'queued': 1, 'rejected': 0}
+
+
+def test_disabled_limits_never_block(tmp_path):
+    bucket = limiter(tmp_path)
+    assert not bucket.enabled
+    for _ in range(100):
+        bucket.acquire(10 ** 6, 'low')
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 1
+    assert estimate_tokens('x' * 400) == 100
@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+import request_body
+from request_body import iter_json_array, iter_ndjson, iter_records
+
+
+class ChunkedStream(io.BytesIO):
+    """Returns at most `size` bytes per read, like a socket delivering a body in pieces"""
+
+    def __init__(self, data, size):
+        super().__init__(data)
+        self.size = size
+
+    def read(self, n=-1):
+        return super().read(self.size)
+
+
+@pytest.fixture(params=[1, 7, 64 * 1024])
+def chunk(request):
+    return request.param
+
+
+def test_ndjson_records(chunk):
+    body = b'{"text": "a"}\n\n  {"text": "caf\xc3\xa9"}\r\n[1, 2]'
+    assert list(iter_ndjson(ChunkedStream(body, chunk))) == [{'text': 'a'}, {'text': 'café'}, [1, 2]]
+
+
+def test_ndjson_errors():
+    with pytest.raises(BadRequest, match='Line 2'):
+        list(iter_ndjson(io.BytesIO(b'{}\n{oops\n')))
+    with pytest.raises(RequestEntityTooLarge, match='Line 2'):
+        list(iter_ndjson(io.BytesIO(b'{}\n' + b'"' + b'x' * 100 + b'"'), max_record_bytes=50))
+
+
+def test_ndjson_oversized_line_stops_before_end(monkeypatch):
+    monkeypatch.setattr(request_body, 'READ_CHUNK', 10)
+    stream = ChunkedStream(b'"' + b'x' * 10000, 10)
+    with pytest.raises(RequestEntityTooLarge):
+        list(iter_ndjson(stream, max_record_bytes=100))
+    # Stopped reading as soon as the line outgrew the limit
+    assert stream.tell() < 200
+
+
+def test_json_array_elements(chunk, monkeypatch):
+    monkeypatch.setattr(request_body, 'READ_CHUNK', chunk)
+    records = [{'text': 'one'}, {'text': 'naïve résumé'}, 12345, [], 'two']
+    body = json.dumps(records, ensure_ascii=False).encode('utf-8')
+    assert list(iter_json_array(ChunkedStream(body, chunk))) == records
+    assert list(iter_json_array(io.BytesIO(b' [ ] '))) == []
+
+
+@pytest.mark.parametrize('body, message', [
+    (b'{"text": "a"}', 'Expected a JSON array'),
+    (b'[{"text": "a"} {"text": "b"}]', 'Expected ","'),
+    (b'[{"text": "a"},', 'Unexpected end'),
+    (b'[1] 2', 'Unexpected data'),
+    (b'[{"text": oops}]', 'Element 0'),
+    (b'["\xff"]', 'UTF-8'),
+])
+def test_json_array_errors(body, message):
+    with pytest.raises(BadRequest, match=message):
+        list(iter_json_array(io.BytesIO(body)))
+
+
+def test_json_array_oversized_element():
+    with pytest.raises(RequestEntityTooLarge, match='Element 1'):
+        list(iter_json_array(io.BytesIO(b'[1, "' + b'x' * 100 + b'"]'), max_record_bytes=50))
+
+
+def test_iter_records_picks_format():
+    assert list(iter_records(io.BytesIO(b'1\n2\n'), 'application/x-ndjson')) == [1, 2]
+    assert list(iter_records(io.BytesIO(b'[1, 2]'), 'application/json')) == [1, 2]
+
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
+
+
+def batch_lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_ndjson_and_array(client):
+    resume = 'Python developer with Flask and SQL experience building REST APIs for analytics teams.'
+    ndjson = '\n'.join(json.dumps(r) for r in [{'text': resume}, {'text': ''}])
+    lines = batch_lines(client.post('/api/resume/batch', data=ndjson, content_type='application/x-ndjson'))
+    assert 'analysis' in lines[0] and lines[1]['error'] == 'No resume text provided'
+    assert lines[-1] == {'done': True, 'analyzed': 1, 'failed': 1}
+
+    lines = batch_lines(client.post('/api/resume/batch', json=[{'text': resume, 'careerType': 'nontech'}]))
+    assert lines[-1] == {'done': True, 'analyzed': 1, 'failed': 0}
+
+
+def test_batch_reports_malformed_record(client):
+    lines = batch_lines(client.post('/api/resume/batch', data='{"text": "a"}\n{oops',
+                                    content_type='application/x-ndjson'))
+    assert lines[-2]['status'] == 400 and lines[-1]['done']
+
+
+def test_oversized_body_is_rejected_with_413(client):
+    limit = request_body.body_limit('analyze_resume')
+    response = client.post('/api/resume/analyze', json={'text': 'x' * limit})
+    assert response.status_code == 413
+    assert 'limited to' in response.get_json()['error']
+    assert client.post('/api/chat', json={'message': 'x' * request_body.DEFAULT_BODY_LIMIT}).status_code == 413
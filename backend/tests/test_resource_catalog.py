@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from resource_catalog import ResourceCatalog, search_links
+
+CURATED = {'skills': [
+    {'id': 'python', 'name': 'Python', 'aliases': ['py', 'python3'],
+     'resources': [{'title': 'Python course', 'url': 'https://example.com/python'}]},
+    {'id': 'git', 'name': 'Git', 'aliases': [],
+     'resources': [{'title': 'Git book', 'url': 'https://example.com/git'}]},
+    {'id': 'javascript', 'name': 'JavaScript', 'aliases': ['js'],
+     'resources': [{'title': 'JS guide', 'url': 'https://example.com/js'}]},
+]}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'resources.json'
+    path.write_text(json.dumps(CURATED), encoding='utf-8')
+    catalog = ResourceCatalog(str(path))
+    catalog.build([{'requiredSkills': [{'skill': 'Version Control (Git)'}, 'Stakeholder Management', 'Python']}])
+    return catalog
+
+
+@pytest.mark.parametrize('query, skill_id, match_type', [
+    ('Python', 'python', 'exact'),
+    ('  PY ', 'python', 'exact'),
+    ('java', 'javascript', 'prefix'),
+    ('pythn', 'python', 'fuzzy'),
+])
+def test_lookup(catalog, query, skill_id, match_type):
+    entry, found = catalog.lookup(query)
+    assert (entry['id'], found) == (skill_id, match_type)
+
+
+def test_short_or_unknown_queries_do_not_guess(catalog):
+    assert catalog.lookup('ja') == (None, None)
+    assert catalog.lookup('underwater basket weaving') == (None, None)
+    assert catalog.resources_for('underwater basket weaving') == search_links('underwater basket weaving')
+
+
+def test_role_skills_borrow_curated_links(catalog):
+    links = catalog.resources_for('version control (git)')
+    assert links[0]['url'] == 'https://example.com/git'
+    assert len(links) == 2 and 'coursera' in links[1]['url']
+    # Nothing curated to borrow: search links only
+    assert catalog.resources_for('Stakeholder Management') == search_links('Stakeholder Management')
+
+
+def test_non_exact_answers_are_memoized(catalog):
+    catalog.lookup('pythn')
+    catalog.lookup('pythn')
+    assert catalog.stats()['resolved'] == 1
+
+
+def test_version_changes_with_role_skills(catalog):
+    version = catalog.version
+    catalog.add_role_skills({'requiredSkills': ['Kubernetes']})
+    assert catalog.version != version
+    assert catalog.lookup('kubernetes')[1] == 'exact'
+    assert catalog.lookup('Stakeholder Management')[1] == 'exact'
+
+
+def test_curated_resources(catalog):
+    assert set(catalog.curated_resources()) == {'python', 'git', 'javascript'}
+
+
+def test_missing_file_still_indexes_role_skills(tmp_path):
+    catalog = ResourceCatalog(str(tmp_path / 'missing.json'))
+    catalog.build([{'requiredSkills': ['Excel']}])
+    assert catalog.lookup('excel')[0]['curated'] is False
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import resume_dedup
+from resume_dedup import SIMILAR_THRESHOLD, ResumeIndex, estimate_similarity, resume_signature, shingle_resume
+
+_WORDS = ('python sql spark airflow kafka docker kubernetes terraform aws gcp azure react node django flask '
+          'pandas numpy tableau excel agile scrum led built designed migrated reduced improved shipped owned '
+          'pipeline dashboard service platform latency cost revenue customers team project analytics').split()
+
+
+def make_resume(seed, words=600):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def edited(text, changes, seed=0):
+    """The same resume with `changes` words replaced"""
+    rng = random.Random(seed)
+    tokens = text.split()
+    for position in rng.sample(range(len(tokens)), changes):
+        tokens[position] = f'edit{position}'
+    return ' '.join(tokens)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ResumeIndex(str(tmp_path / 'resumes.db'))
+
+
+def test_signature_is_deterministic_and_dense():
+    signature = resume_signature(make_resume(1))
+    assert signature == resume_signature(make_resume(1))
+    assert len(signature) == resume_dedup.NUM_PERM
+    # A short resume leaves most slots empty before densification
+    short = resume_signature('python developer with flask')
+    assert resume_dedup._MAX_HASH not in short
+
+
+def test_similarity_tracks_jaccard():
+    a = make_resume(2)
+    b = edited(a, 30)
+    shingles_a, shingles_b = shingle_resume(a), shingle_resume(b)
+    jaccard = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+    assert estimate_similarity(resume_signature(a), resume_signature(b)) == pytest.approx(jaccard, abs=0.12)
+    assert estimate_similarity(resume_signature(a), resume_signature(make_resume(3))) < 0.1
+
+
+def test_find_duplicate_above_threshold_only(index):
+    original = make_resume(4)
+    index.add(original, 'tech', {'skills': ['python']})
+
+    found = index.find_duplicate(edited(original, 5), 'tech')
+    assert found is not None and found['similarity'] >= resume_dedup.DUPLICATE_THRESHOLD
+    assert found['analysis'] == {'skills': ['python']}
+    # Heavily rewritten: still similar, but not a duplicate
+    assert index.find_duplicate(edited(original, 40), 'tech') is None
+    assert index.find_similar(edited(original, 40), threshold=SIMILAR_THRESHOLD)
+
+
+def test_find_duplicate_respects_career_type(index):
+    original = make_resume(5)
+    index.add(original, 'tech', {'skills': []})
+    assert index.find_duplicate(original, 'government') is None
+
+
+def test_precomputed_signature_is_used(index, monkeypatch):
+    text = make_resume(6)
+    signature = resume_signature(text)
+    calls = []
+    monkeypatch.setattr(resume_dedup, 'resume_signature', lambda t: calls.append(t) or signature)
+    index.find_duplicate(text, 'tech', signature=signature)
+    index.add(text, 'tech', {}, signature=signature)
+    assert calls == []
+
+
+def test_rows_from_other_workers_are_synced(tmp_path):
+    path = str(tmp_path / 'resumes.db')
+    text = make_resume(7)
+    resume_id = ResumeIndex(path).add(text, 'tech', {'skills': ['sql']})
+    assert ResumeIndex(path).find_duplicate(text, 'tech')['resumeId'] == resume_id
+
@@ -0,0 +1,112 @@
+import io
+import time
+import zipfile
+import threading
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import resume_extract
+from resume_extract import CappedSpool, ExtractionError, ResumeExtractor, detect_type, extract_docx, extract_txt
+
+
+def txt(data):
+    return extract_txt(io.BytesIO(data), time.monotonic() + 5)
+
+
+@pytest.mark.parametrize('text, encoding', [
+    ('José Müller, Résumé\n', 'utf-8'),
+    ('José Müller, Résumé\n', 'utf-8-sig'),
+    ('José Müller, Résumé\n', 'utf-16'),
+    ('José Müller, Résumé\n', 'cp1252'),
+    ('Naïve “quotes” – €\n', 'cp1252'),
+])
+def test_txt_encodings(text, encoding):
+    assert txt(text.encode(encoding)) == text
+
+
+def test_utf16_needs_a_bom():
+    # Even-length Latin text without a BOM must not turn into CJK garbage
+    data = 'José Müller\n'.encode('cp1252')
+    assert len(data) % 2 == 0 and txt(data) == 'José Müller\n'
+
+
+def test_bytes_undefined_in_cp1252_fall_back_to_latin1():
+    assert txt(b'caf\xe9 \x81') == 'café \x81'
+
+
+def test_utf8_cut_mid_character(monkeypatch):
+    monkeypatch.setattr(resume_extract, 'MAX_TEXT_CHARS', 4)
+    # 16 bytes are read: 'x' and seven 'é', then half of the eighth
+    assert txt(('x' + 'é' * 20).encode('utf-8')) == 'xééé'
+
+
+def test_utf8_at_the_default_limit():
+    text = 'a' * (resume_extract.MAX_TEXT_CHARS * 4 - 1) + 'ü'
+    assert txt(text.encode('utf-8')) == 'a' * resume_extract.MAX_TEXT_CHARS
+
+
+def docx(*paragraphs):
+    ns = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    body = ''.join(f'<w:p><w:r><w:t>{p}</w:t></w:r></w:p>' for p in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', f'<w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>')
+    buffer.seek(0)
+    return buffer
+
+
+def test_docx_paragraphs():
+    assert extract_docx(docx('Jane Doe', 'Python, SQL'), time.monotonic() + 5) == 'Jane Doe\nPython, SQL'
+
+
+def test_zip_without_document_is_rejected():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('other.xml', '<x/>')
+    with pytest.raises(ExtractionError, match='Not a Word document'):
+        extract_docx(buffer, time.monotonic() + 5)
+
+
+def test_detect_type_prefers_magic_bytes():
+    assert detect_type(io.BytesIO(b'%PDF-1.7'), 'resume.txt') == 'pdf'
+    assert detect_type(docx('x'), 'resume') == 'docx'
+    assert detect_type(io.BytesIO(b'plain'), 'resume.md') == 'txt'
+    with pytest.raises(ExtractionError) as error:
+        detect_type(io.BytesIO(b'\x00\x01'), 'resume.exe')
+    assert error.value.status == 415
+
+
+def test_spool_stops_oversized_uploads():
+    spool = CappedSpool(max_bytes=10)
+    spool.write(b'x' * 10)
+    with pytest.raises(RequestEntityTooLarge):
+        spool.write(b'x')
+
+
+def test_busy_pool_turns_uploads_away(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setitem(resume_extract._EXTRACTORS, 'txt', lambda stream, deadline: release.wait(5) and 'text')
+    extractor = ResumeExtractor(workers=1, queue=0, timeout=5)
+    worker = threading.Thread(target=extractor.extract, args=(io.BytesIO(b'a'), 'a.txt'))
+    worker.start()
+    time.sleep(0.05)
+    with pytest.raises(ExtractionError) as error:
+        extractor.extract(io.BytesIO(b'b'), 'b.txt')
+    assert error.value.status == 503
+    release.set()
+    worker.join(5)
+    assert extractor.extract(io.BytesIO(b'c'), 'c.txt') == 'text'
+
+
+def test_slow_extraction_times_out(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setitem(resume_extract._EXTRACTORS, 'txt', lambda stream, deadline: release.wait(5) and 'text')
+    with pytest.raises(ExtractionError, match='too long'):
+        ResumeExtractor(workers=1, queue=0, timeout=0.1).extract(io.BytesIO(b'a'), 'a.txt')
+    release.set()
+
+
+def test_empty_text_is_rejected():
+    with pytest.raises(ExtractionError, match='No text'):
+        ResumeExtractor().extract(io.BytesIO(b'   \n'), 'blank.txt')
@@ -0,0 +1,75 @@
+import pytest
+
+from role_catalog import GAPS_PER_PLAN, RoleCatalog, role_career_types
+
+ROLES = [
+    {'title': 'Data Analyst', 'tags': ['data'],
+     'requiredSkills': [{'skill': 'SQL', 'weight': 3}, {'skill': 'Python', 'weight': 2}, {'skill': 'Excel'},
+                        {'skill': 'Tableau'}, {'skill': 'Statistics'}, {'skill': 'Communication'}]},
+    {'title': 'Marketing Manager', 'tags': ['nontech', 'marketing'], 'requiredSkills': [{'skill': 'SEO'}]},
+    {'title': 'Bank Clerk', 'tags': ['banking'], 'requiredSkills': [{'skill': 'Accounting'}]},
+    {'title': 'data analyst', 'tags': [], 'requiredSkills': []},
+]
+
+
+@pytest.fixture
+def catalog():
+    catalog = RoleCatalog()
+    catalog.load(ROLES, canonical_skill=str.lower, resources_for_skill=lambda name: [f'link for {name}'])
+    return catalog
+
+
+@pytest.mark.parametrize('role, types', [
+    (ROLES[0], {'tech'}),
+    (ROLES[1], {'nontech'}),
+    (ROLES[2], {'tech', 'government'}),
+    ({'title': 'Railway Officer', 'tags': ['government']}, {'government'}),
+])
+def test_career_types(role, types):
+    assert role_career_types(role) == types
+
+
+def test_entry_scoring_data(catalog):
+    entry = catalog.entry(ROLES[0])
+    assert entry['skills'][0] == ('sql', 3, 'SQL')
+    assert entry['total_weight'] == 9
+
+
+def test_roles_for_filters_and_memoizes(catalog):
+    assert catalog.roles_for('nontech', '') == [ROLES[1]]
+    assert catalog.roles_for('tech', 'data') == [ROLES[0]]
+    assert catalog.roles_for('tech', 'general') is catalog.roles_for('tech', '')
+
+
+def test_by_title_keeps_first_role(catalog):
+    assert catalog.by_title('DATA ANALYST') is ROLES[0]
+    assert catalog.by_title('Astronaut') is None
+
+
+def test_precomputed_plans_are_shared(catalog):
+    gaps = ['SQL', 'Python', 'Excel', 'Tableau', 'Statistics'][:GAPS_PER_PLAN]
+    plan = catalog.learning_plan(ROLES[0], gaps)
+    assert plan[0] == {'category': 'Sql', 'resources': ['link for SQL']}
+    assert catalog.learning_plan(ROLES[0], gaps) is plan
+    assert catalog.stats()['plan_hits'] == 2
+
+
+def test_other_gap_sets_are_memoized(catalog):
+    plan = catalog.learning_plan(ROLES[0], ['Communication', 'SQL'])
+    assert [item['category'] for item in plan] == ['Communication', 'Sql']
+    assert catalog.learning_plan(ROLES[0], ['Communication', 'SQL']) is plan
+    assert catalog.learning_plan({'title': 'Unknown'}, ['SQL']) is None
+
+
+def test_version_is_content_based(catalog):
+    version = catalog.version
+    catalog.load(ROLES, str.lower, lambda name: [])
+    assert catalog.version == version
+    catalog.load(ROLES[:2], str.lower, lambda name: [])
+    assert catalog.version != version
+
+
+def test_invalidate_forces_reload(catalog):
+    assert catalog.loaded
+    catalog.invalidate()
+    assert not catalog.loaded
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from shared_cache import DiskCache, LRUTTLCache, SQLiteBackend, TieredCache, decode, encode, make_key
+
+
+class FailingBackend:
+    name = 'failing'
+
+    def get(self, namespace, key):
+        raise OSError('down')
+
+    set = delete = clear = get
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'shared.db'))
+
+
+@pytest.mark.parametrize('value', [
+    {'roles': [{'title': 'Data Analyst', 'score': 0.5}], 'gaps': ('sql',)},
+    'x' * 5000,
+    None,
+])
+def test_encode_round_trip(value):
+    assert decode(encode(value)) == value
+
+
+def test_large_values_are_compressed():
+    assert encode('x' * 5000)[:1] == b'z'
+    assert encode('small')[:1] == b'm'
+    with pytest.raises(ValueError):
+        decode(b'?data')
+
+
+def test_make_key_is_stable():
+    assert make_key(['a', 'b'], 'tech') == make_key(('a', 'b'), 'tech')
+    assert make_key({'x': 1, 'y': 2}) == make_key({'y': 2, 'x': 1})
+    assert make_key('a', 'tech') != make_key('a', 'government')
+
+
+def test_lru_evicts_oldest_and_expires():
+    cache = LRUTTLCache(2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1
+    cache.set('d', 4, ttl=-1)
+    assert cache.get('d') is None
+
+
+def test_l2_hit_is_shared_between_workers(backend):
+    writer = TieredCache('ns', 10, 60, backend)
+    reader = TieredCache('ns', 10, 60, backend)
+    writer.set('k', {'v': 1})
+    assert reader.get('k') == {'v': 1}
+    assert reader.get('k') == {'v': 1}
+    assert reader.stats()['l2_hits'] == 1 and reader.stats()['l1_hits'] == 1
+    # Namespaces do not see each other's entries
+    assert TieredCache('other', 10, 60, backend).get('k') is None
+
+
+def test_l2_expiry_carries_over_to_l1(backend):
+    TieredCache('ns', 10, 60, backend).set('k', 'v', ttl=0.05)
+    reader = TieredCache('ns', 10, 60, backend)
+    assert reader.get('k') == 'v'
+    time.sleep(0.06)
+    assert reader.get('k') is None
+
+
+def test_pop_and_clear_reach_l2(backend):
+    cache = TieredCache('ns', 10, 60, backend)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.pop('a')
+    assert TieredCache('ns', 10, 60, backend).get('a') is None
+    cache.clear()
+    assert cache.get('b') is None
+    assert TieredCache('ns', 10, 60, backend).get('b') is None
+
+
+def test_l2_failures_are_misses():
+    cache = TieredCache('ns', 10, 60, FailingBackend())
+    cache.set('k', 'v')
+    assert cache.get('k') == 'v'
+    assert cache.get('missing') is None
+    stats = cache.stats()
+    assert stats['l2_errors'] == 2 and stats['misses'] == 1
+
+
+def test_disk_cache_expiry_and_delete(tmp_path):
+    store = DiskCache(str(tmp_path / 'disk.db'), table='jobs')
+    store.set('a', {'status': 'ready'}, 60)
+    store.set('b', {'status': 'pending'}, -1)
+    assert store.get('a') == {'status': 'ready'}
+    assert store.get('b') is None
+    store.delete('a')
+    store.purge_expired()
+    assert store.get('a') is None
@@ -0,0 +1,95 @@
+"""
+Offline job: pre-generate advice for the most common (role, skill gaps, career type) combinations.
+
+Candidates come from the analyze signature log first (most frequent first),
+then from the role catalog: for every role, the gap sets of a user who has
+none of its skills and of users who already have its first few skills.
+Advice is generated with Gemini when a key is configured (low priority, so
+live traffic keeps its quota) and with the deterministic generator otherwise;
+only Gemini advice is served by /api/analyze.
+
+Usage:
+    python warm_advice.py [--limit 100] [--delay 1.0] [--force]
+"""
+import time
+import argparse
+
+from app import (
+    get_roles_by_type_and_domain, score_role, get_gemini_advice, generate_skill_based_advice, is_gemini_available
+)
+from advice_warm_store import advice_warm_store, signature
+
+CAREER_TYPES = ('tech', 'nontech', 'government')
+GAPS_PER_ADVICE = 5
+
+
+def catalog_candidates():
+    """(role, gaps, career type) combinations derived from the role catalog"""
+    for career_type in CAREER_TYPES:
+        for role in get_roles_by_type_and_domain(career_type, ''):
+            missing = score_role([], role)['missing']
+            # Users typically already have the first skills of a role, so slide the gap window along the list
+            for start in range(0, max(1, len(missing) - GAPS_PER_ADVICE + 1)):
+                yield role, missing[start:start + GAPS_PER_ADVICE], career_type
+
+
+def logged_candidates(limit):
+    roles = {}
+    for career_type in CAREER_TYPES:
+        for role in get_roles_by_type_and_domain(career_type, ''):
+            roles[(role['title'].lower(), career_type)] = role
+    for title, gaps, career_type, _ in advice_warm_store.top_signatures(limit):
+        role = roles.get((title.lower(), career_type))
+        if role:
+            yield role, gaps, career_type
+
+
+def candidates(limit):
+    seen = set()
+    for role, gaps, career_type in list(logged_candidates(limit)) + list(catalog_candidates()):
+        sig = signature(role['title'], gaps, career_type)
+        if sig in seen or not gaps:
+            continue
+        seen.add(sig)
+        yield role, gaps, career_type
+        if len(seen) >= limit:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-generate advice for common role/gap combinations')
+    parser.add_argument('--limit', type=int, default=100, help='Number of combinations to warm')
+    parser.add_argument('--delay', type=float, default=1.0, help='Seconds between Gemini calls')
+    parser.add_argument('--force', action='store_true', help='Regenerate entries that are still fresh')
+    args = parser.parse_args()
+
+    use_gemini = is_gemini_available()
+    source = 'gemini' if use_gemini else 'local'
+    if not use_gemini:
+        print('No Gemini key configured - storing deterministic advice (not served while Gemini is available)')
+
+    stored = skipped = failed = 0
+    for role, gaps, career_type in candidates(args.limit):
+        if not args.force and advice_warm_store.has_fresh(role['title'], gaps, career_type, source):
+            skipped += 1
+            continue
+        # Served to every user with these gaps whatever else they know, so the advice must not claim any skills
+        user_skills = []
+        if use_gemini:
+            advice = get_gemini_advice(user_skills, role, gaps, career_type, priority='low', fallback=False)
+            time.sleep(args.delay)
+        else:
+            advice = generate_skill_based_advice(user_skills, role, gaps, career_type)
+        if not advice:
+            failed += 1
+            print(f"  failed: {role['title']} / {', '.join(gaps)}")
+            continue
+        advice_warm_store.put(role['title'], gaps, career_type, advice, source)
+        stored += 1
+        print(f"  stored: {role['title']} ({career_type}) / {', '.join(gaps)}")
+
+    print(f'Done: {stored} stored, {skipped} already fresh, {failed} failed')
+
+
+if __name__ == '__main__':
+    main()
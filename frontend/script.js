@@ -285,6 +285,7 @@ class CareerPathAI {
                 mode: this.currentMode,
                 careerType: this.selectedCareerType,
                 domain: this.selectedDomain,
+                adviceMode: 'deferred',
                 skills: []
             };
 
@@ -314,6 +315,9 @@ class CareerPathAI {
 
             this.analysisResults = await response.json();
             this.displayResults(this.analysisResults);
+            if (this.analysisResults.adviceStatus === 'pending' && this.analysisResults.adviceId) {
+                this.pollAIAdvice(this.analysisResults.adviceId);
+            }
 
         } catch (error) {
             this.showNotification(error.message, 'error');
@@ -323,20 +327,45 @@ class CareerPathAI {
         }
     }
 
+    // Deferred AI advice: the deterministic advice is shown first and replaced once Gemini is done
+    async pollAIAdvice(adviceId, attempts = 20, intervalMs = 1500) {
+        for (let i = 0; i < attempts; i++) {
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+            if (this.analysisResults?.adviceId !== adviceId) return; // a newer analysis replaced this one
+            try {
+                const response = await fetch(`/api/analyze/advice/${encodeURIComponent(adviceId)}`);
+                if (!response.ok) return;
+                const data = await response.json();
+                if (data.adviceStatus === 'ready' && data.aiAdvice) {
+                    this.analysisResults.aiAdvice = data.aiAdvice;
+                    this.analysisResults.adviceStatus = 'ready';
+                    this.displayAIAdvice(data.aiAdvice);
+                    return;
+                }
+                if (data.adviceStatus === 'failed') return;
+            } catch (error) {
+                return;
+            }
+        }
+    }
+
     async handleResumeFile(file) {
         if (!file) return;
         this.showNotification(`Analyzing ${file.name}...`, 'info');
         
-        // This is a mock analysis. In a real app, you would send the file to the backend.
-        // For this demo, we use a mock response based on the backend logic.
+        // Upload the file itself; the backend extracts the text (PDF, DOCX or TXT)
         try {
-            const mockText = "Experience with Python, JavaScript, and React. Managed projects using Agile. Also skilled in SQL and AWS.";
-            const response = await fetch('/api/resume/analyze', {
+            const formData = new FormData();
+            formData.append('file', file);
+            formData.append('careerType', this.selectedCareerType);
+            const response = await fetch('/api/resume/upload', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text: mockText, careerType: this.selectedCareerType })
+                body: formData
             });
-            if (!response.ok) throw new Error('Resume analysis failed.');
+            if (!response.ok) {
+                const error = await response.json().catch(() => ({}));
+                throw new Error(error.error || 'Resume analysis failed.');
+            }
 
             const data = await response.json();
             this.extractedSkills = data.skills || [];
@@ -905,18 +934,23 @@ class CareerPathAI {
         input.value = '';
         this.showTypingIndicator();
 
+        const payload = {
+            message: message,
+            context: {
+                careerType: this.selectedCareerType,
+                domain: this.selectedDomain,
+                skills: this.analysisResults?.userSkills || []
+            }
+        };
+
         try {
+            if (await this.streamChatResponse(payload)) return;
+
+            // Streaming unavailable before any text arrived - fall back to the blocking endpoint
             const response = await fetch('/api/chat', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    message: message,
-                    context: {
-                        careerType: this.selectedCareerType,
-                        domain: this.selectedDomain,
-                        skills: this.analysisResults?.userSkills || []
-                    }
-                })
+                body: JSON.stringify(payload)
             });
             if (!response.ok) throw new Error('Chat service is unavailable.');
             const data = await response.json();
@@ -927,6 +961,57 @@ class CareerPathAI {
             this.hideTypingIndicator();
         }
     }
+
+    // Reads Server-Sent Events from /api/chat/stream and renders tokens as they arrive.
+    // Returns false if nothing was rendered, so the caller can fall back to /api/chat.
+    async streamChatResponse(payload) {
+        let response;
+        try {
+            response = await fetch('/api/chat/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+                body: JSON.stringify(payload)
+            });
+        } catch (error) {
+            return false;
+        }
+        if (!response.ok || !response.body) return false;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let messageContent = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventName = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (eventName !== 'token' || !data) continue;
+
+                text += JSON.parse(data).text || '';
+                if (!messageContent) {
+                    this.hideTypingIndicator();
+                    messageContent = this.addMessageToChat(text, 'ai');
+                } else {
+                    this.renderMessageContent(messageContent, text);
+                }
+            }
+        }
+        return messageContent !== null;
+    }
     
     sendSuggestedMessage(message) {
         document.getElementById('chatInput').value = message;
@@ -942,7 +1027,18 @@ class CareerPathAI {
         // FIX: Securely render chat messages
         const messageContent = document.createElement('div');
         messageContent.className = 'message-content';
+        this.renderMessageContent(messageContent, message);
 
+        messageDiv.innerHTML = `<div class="message-avatar"><i class="fas ${avatar}"></i></div>`;
+        messageDiv.appendChild(messageContent);
+        
+        container.appendChild(messageDiv);
+        container.scrollTop = container.scrollHeight;
+        return messageContent;
+    }
+
+    renderMessageContent(messageContent, message) {
+        messageContent.replaceChildren();
         const paragraphs = message.split('\n').filter(p => p.trim() !== '');
         paragraphs.forEach(text => {
             const p = document.createElement('p');
@@ -950,10 +1046,7 @@ class CareerPathAI {
             messageContent.appendChild(p);
         });
 
-        messageDiv.innerHTML = `<div class="message-avatar"><i class="fas ${avatar}"></i></div>`;
-        messageDiv.appendChild(messageContent);
-        
-        container.appendChild(messageDiv);
+        const container = document.getElementById('chatMessages');
         container.scrollTop = container.scrollHeight;
     }
 